@@ -1,7 +1,7 @@
 from pydantic import BeforeValidator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
-from typing import Annotated, Optional
+from typing import Annotated, Dict, Optional
 
 
 def parse_cors(value: str) -> list[str]:
@@ -44,6 +44,71 @@ class Settings(BaseSettings):
     CORS_ALLOW_ORIGINS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = "*"
     SERVER_HOST: str = "http://localhost:8000"
     OPENALEX_EMAIL: Optional[str] = None
+    PAPER_STORE_ENABLED: bool = True
+    PAPER_STORE_PATH: str = "./project/paper_store.sqlite3"
+    PAPER_STORE_QUERY_TTL_DAYS: int = 30
+    # Token budget for each search / paper tool result pushed into chat history
+    TOOL_RESULT_TOKEN_BUDGET: int = 1200
+
+    # Per-kernel resource limits (None disables a limit). Memory is enforced via
+    # cgroup memory.max when KERNEL_CGROUP_ROOT is usable, else RLIMIT_DATA
+    KERNEL_MEMORY_LIMIT_MB: Optional[int] = None
+    KERNEL_CPU_TIME_LIMIT: Optional[int] = None
+    KERNEL_CPU_CORES: Optional[float] = None
+    KERNEL_FILE_SIZE_LIMIT_MB: Optional[int] = 1024
+    KERNEL_WALL_TIME_LIMIT: int = 300
+    # Per subtask wall-clock overrides in seconds, e.g. {"eda": 120, "ques1": 900}
+    KERNEL_SUBTASK_WALL_TIME: Dict[str, int] = {}
+    # Text kept per cell (head + tail) and hard cap on all output incl. images
+    KERNEL_MAX_OUTPUT_CHARS: Optional[int] = 200000
+    KERNEL_MAX_OUTPUT_BYTES: Optional[int] = 50 * 1024 * 1024
+    # Delegated cgroup v2 directory for memory / CPU isolation of kernels
+    KERNEL_CGROUP_ROOT: Optional[str] = None
+    # Checkpoint kernel variables after each successful subtask and restore
+    # them after kernel restarts; larger variables (MB) are not checkpointed
+    KERNEL_CHECKPOINT_ENABLED: bool = True
+    KERNEL_CHECKPOINT_MAX_VAR_MB: Optional[int] = 1024
+    # Opt-in reuse of outputs for repeated deterministic cells (or cell prefixes)
+    # while the kernel and the input data files are unchanged
+    KERNEL_EXECUTION_CACHE_ENABLED: bool = False
+    KERNEL_EXECUTION_CACHE_SIZE: int = 64
+    # Static checks (syntax, undefined names, missing packages) before running
+    # a cell; failures are returned without a kernel round-trip
+    KERNEL_PREFLIGHT_ENABLED: bool = True
+    # Convert uploaded .csv/.xlsx files once into a per-task cache (Arrow IPC
+    # when pyarrow is installed) read by the kernel-side load_data() helper;
+    # larger files (MB) are read directly
+    KERNEL_DATA_CACHE_ENABLED: bool = True
+    KERNEL_DATA_CACHE_MAX_MB: Optional[int] = 2048
+
+    # Package installation for pip_install, outside the kernel. Wheels are kept
+    # in PACKAGE_CACHE_DIR/wheels and shared by all tasks and executors.
+    PACKAGE_CACHE_DIR: str = "./project/package_cache"
+    # Python of the kernel environment (defaults to the current interpreter)
+    PACKAGE_PYTHON: Optional[str] = None
+    PACKAGE_INDEX_URL: Optional[str] = None
+    # Install only from the local wheel cache
+    PACKAGE_OFFLINE: bool = False
+    PACKAGE_INSTALL_TIMEOUT: int = 600
+
+    # Out-of-process code executor (python -m app.services.executor_service).
+    # When EXECUTOR_URLS is set, task code runs in executor kernels instead of
+    # kernels inside the API process.
+    EXECUTOR_URLS: Annotated[list[str] | str, BeforeValidator(parse_cors)] = ""
+    EXECUTOR_TOKEN: Optional[str] = None
+    # The executor sees the same work_dir paths (same host or shared volume);
+    # otherwise files are uploaded and generated files are synced back
+    EXECUTOR_SHARED_FS: bool = False
+    # Executor service side
+    EXECUTOR_WORK_ROOT: str = "./project/executor"
+    EXECUTOR_MAX_KERNELS: int = 8
+    EXECUTOR_IDLE_TIMEOUT: int = 3600
+
+    # Shared HTTP connection pool for search providers
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
 
     # Search Provider Configuration
     TAVILY_API_KEY: Optional[str] = None
@@ -57,6 +122,33 @@ class Settings(BaseSettings):
     SEARCH_FALLBACK_PROVIDERS: Annotated[
         list[str] | str, BeforeValidator(parse_cors)
     ] = "exa"
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_MAX_ENTRIES: int = 512
+    # Per search type freshness overrides in seconds, e.g. {"news": 600}
+    SEARCH_CACHE_TTLS: Dict[str, int] = {}
+    SEARCH_CACHE_STALE_FACTOR: float = 1.0
+    SEARCH_OPENALEX_ENABLED: bool = True
+    # Query all providers concurrently and fuse results for these search types
+    SEARCH_FANOUT_ENABLED: bool = True
+    SEARCH_FANOUT_TYPES: Annotated[list[str] | str, BeforeValidator(parse_cors)] = (
+        "research,academic"
+    )
+    SEARCH_FANOUT_DEADLINE: float = 8.0
+    # Reuse agent search results for near-duplicate queries (trigram and word
+    # Jaccard similarity, identical numbers); opt-in
+    SEARCH_SEMANTIC_DEDUP_ENABLED: bool = False
+    SEARCH_SEMANTIC_DEDUP_THRESHOLD: float = 0.7
+    SEARCH_SEMANTIC_DEDUP_MAX_ENTRIES: int = 256
+    # Background provider health probing (interval in seconds, jitter as a fraction)
+    SEARCH_HEALTH_PROBE_ENABLED: bool = True
+    SEARCH_HEALTH_PROBE_INTERVAL: float = 60.0
+    SEARCH_HEALTH_PROBE_JITTER: float = 0.2
+    SEARCH_HEALTH_PROBE_TIMEOUT: float = 10.0
+    # Page content retrieval: URLs per request, concurrent requests, timeout
+    SEARCH_CONTENT_BATCH_SIZE: int = 10
+    SEARCH_CONTENT_MAX_CONCURRENCY: int = 4
+    SEARCH_CONTENT_TIMEOUT: float = 15.0
+    SEARCH_CONTENT_CACHE_TTL: int = 24 * 3600
 
     model_config = SettingsConfigDict(
         env_file=".env.dev",
@@ -3,6 +3,7 @@ from app.config.setting import settings
 from app.utils.task_logger import TaskLogger
 from app.services.redis_manager import redis_manager
 from app.schemas.response import SystemMessage, InterpreterMessage
+from app.services.package_provisioner import InstallResult
 from app.tools.base_interpreter import BaseCodeInterpreter
 from app.tools.web_search_tool import WebSearchTool
 from app.core.llm.llm import LLM
@@ -10,6 +11,7 @@ from app.schemas.A2A import CoderToWriter
 from app.core.prompts import get_coder_prompt, get_reflection_prompt
 from app.utils.common_utils import get_current_files
 import json
+import shlex
 from app.core.functions import coder_tools
 
 # CoderAgent：负责代码生成和执行的Agent
@@ -44,7 +46,7 @@ class CoderAgent(Agent):  # 同样继承自Agent类
         await self.task_logger.info(
             f"{self.__class__.__name__}: Starting subtask: {subtask_title}"
         )
-        self.code_interpreter.add_section(subtask_title)
+        self.code_interpreter.begin_subtask(subtask_title)
 
         # 如果是第一次运行，则添加系统提示
         if self.is_first_run:
@@ -193,20 +195,21 @@ class CoderAgent(Agent):  # 同样继承自Agent类
 
                 elif tool_name == "pip_install":
                     packages = json.loads(tool_call.function.arguments)["packages"]
-                    pip_code = f"!pip install {packages}"
                     await self.task_logger.info(f"Installing packages: {packages}")
 
-                    (
-                        text_to_gpt,
-                        error_occurred,
-                        error_message,
-                    ) = await self.code_interpreter.execute_code(pip_code)
-
-                    result_msg = (
-                        f"Successfully installed: {packages}"
-                        if not error_occurred
-                        else f"Installation failed: {error_message}"
-                    )
+                    # 在内核之外安装，已安装的包立即返回
+                    try:
+                        package_list = shlex.split(packages)
+                    except ValueError as e:
+                        # 引号不匹配等无法解析的参数作为安装失败返回给模型
+                        install_result = InstallResult(
+                            failed=[packages], log=f"Could not parse packages: {e}"
+                        )
+                    else:
+                        install_result = await self.code_interpreter.install_packages(
+                            package_list
+                        )
+                    result_msg = install_result.summary()
                     await self.append_chat_history(
                         {
                             "role": "tool",
@@ -323,6 +326,8 @@ class CoderAgent(Agent):  # 同样继承自Agent类
             else:
                 # 没有工具调用，表示任务完成
                 await self.task_logger.info("No tool call detected, task is complete.")
+                # 保存检查点，内核重启后无需重新计算本子任务的结果
+                await self.code_interpreter.checkpoint()
                 return CoderToWriter(
                     coder_response=response.choices[0].message.content,
                     created_images=await self.code_interpreter.get_created_images(
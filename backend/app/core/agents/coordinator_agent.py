@@ -1,5 +1,5 @@
 from app.core.agents.agent import Agent
-from app.core.llm.llm import LLM
+from app.core.llm.llm import LLM, ManagedLLM
 from app.core.prompts import get_coordinator_prompt
 import json
 import re
@@ -29,9 +29,14 @@ class CoordinatorAgent(Agent):
         attempt = 0
         while attempt <= max_retries:
             try:
+                # 问题格式化为 JSON 属于低重要性调用，带提供商管理时优先使用低价提供商
+                options = (
+                    {"prefer_cheap": True} if isinstance(self.model, ManagedLLM) else {}
+                )
                 response = await self.model.chat(
                     history=self.chat_history,
                     agent_name=self.__class__.__name__,
+                    **options,
                 )
                 json_str = response.choices[0].message.content
 
@@ -85,129 +85,162 @@ class WriterAgent(Agent):
 
         footnotes = []
 
-        if (
-            hasattr(response.choices[0].message, "tool_calls")
-            and response.choices[0].message.tool_calls
-        ):
+        # 依次处理工具调用（如先 search_papers 再 get_result_details），直到模型给出正文；
+        # 超过 max_chat_turns 轮后不再提供工具，要求直接作答
+        tool_rounds = 0
+        while getattr(response.choices[0].message, "tool_calls", None):
             await self.task_logger.info("Tool call detected.")
-            tool_call = response.choices[0].message.tool_calls[0]
-            tool_id = tool_call.id
-
-            if tool_call.function.name == "search_papers":
-                await self.task_logger.info("Calling tool: search_papers")
-                await redis_manager.publish_message(
-                    self.task_id,
-                    SystemMessage(
-                        content=f"WriterAgent is calling {tool_call.function.name} tool."
-                    ),
-                )
+            error_response = await self._call_tool(response, footnotes)
+            if error_response is not None:
+                return error_response
+            tool_rounds += 1
+            tool_kwargs = (
+                {"tools": writer_tools, "tool_choice": "auto"}
+                if tool_rounds < self.max_chat_turns
+                else {}
+            )
+            response = await self.model.chat(
+                history=self.chat_history,
+                agent_name=self.__class__.__name__,
+                sub_title=sub_title,
+                **tool_kwargs,
+            )
+        response_content = response.choices[0].message.content
+        self.chat_history.append({"role": "assistant", "content": response_content})
+        await self.task_logger.info(f"{self.__class__.__name__}: Finished execution.")
+        return WriterResponse(response_content=response_content, footnotes=footnotes)
 
-                query = json.loads(tool_call.function.arguments)["query"]
+    async def _call_tool(self, response, footnotes: list) -> WriterResponse | None:
+        """
+        执行响应中的工具调用，并把调用与结果写入对话历史
 
-                await redis_manager.publish_message(
-                    self.task_id,
-                    WriterMessage(
-                        input={"query": query},
-                    ),
-                )
+        Returns:
+            工具失败、需要直接结束本次写作时返回的 WriterResponse，否则为 None
+        """
+        tool_call = response.choices[0].message.tool_calls[0]
+        tool_id = tool_call.id
+
+        if tool_call.function.name == "search_papers":
+            await self.task_logger.info("Calling tool: search_papers")
+            await redis_manager.publish_message(
+                self.task_id,
+                SystemMessage(
+                    content=f"WriterAgent is calling {tool_call.function.name} tool."
+                ),
+            )
+
+            query = json.loads(tool_call.function.arguments)["query"]
+
+            await redis_manager.publish_message(
+                self.task_id,
+                WriterMessage(
+                    input={"query": query},
+                ),
+            )
+
+            # 更新对话历史 - 添加助手的响应
+            await self.append_chat_history(response.choices[0].message.model_dump())
+            ic(response.choices[0].message.model_dump())
+
+            try:
+                papers = await self.scholar.search_papers(query)
+            except Exception as e:
+                error_msg = f"Failed to search papers: {str(e)}"
+                await self.task_logger.error(error_msg)
+                return WriterResponse(response_content=error_msg, footnotes=footnotes)
+            # 搜索结果已通过redis发送到前端
+            papers_str = self.scholar.papers_to_str(papers, query)
+            await self.task_logger.info(f"Paper search results:\n{papers_str}")
+            await self.append_chat_history(
+                {
+                    "role": "tool",
+                    "content": papers_str,
+                    "tool_call_id": tool_id,
+                    "name": "search_papers",
+                }
+            )
+        elif tool_call.function.name == "web_search":
+            await self.task_logger.info("Calling tool: web_search")
+            await redis_manager.publish_message(
+                self.task_id,
+                SystemMessage(
+                    content=f"WriterAgent is calling {tool_call.function.name} tool."
+                ),
+            )
+
+            # 解析参数
+            args = json.loads(tool_call.function.arguments)
+            query = args["query"]
+            search_type = args.get("search_type", "general")
+            provider = args.get("provider")
+            max_results = args.get("max_results", 10)
+
+            await redis_manager.publish_message(
+                self.task_id,
+                WriterMessage(
+                    input={"query": query, "search_type": search_type},
+                ),
+            )
 
-                # 更新对话历史 - 添加助手的响应
-                await self.append_chat_history(response.choices[0].message.model_dump())
-                ic(response.choices[0].message.model_dump())
+            # 更新对话历史 - 添加助手的响应
+            await self.append_chat_history(response.choices[0].message.model_dump())
+            ic(response.choices[0].message.model_dump())
 
-                try:
-                    papers = await self.scholar.search_papers(query)
-                except Exception as e:
-                    error_msg = f"Failed to search papers: {str(e)}"
+            try:
+                # 调用web搜索工具
+                search_result = await self.web_search_tool.search(
+                    query=query,
+                    search_type=search_type,
+                    provider=provider,
+                    max_results=max_results,
+                )
+
+                if search_result.error:
+                    error_msg = f"Web search failed: {search_result.error}"
                     await self.task_logger.error(error_msg)
                     return WriterResponse(
                         response_content=error_msg, footnotes=footnotes
                     )
-                # 搜索结果已通过redis发送到前端
-                papers_str = self.scholar.papers_to_str(papers)
-                await self.task_logger.info(f"Paper search results:\n{papers_str}")
+
+                search_content = search_result.result
+                await self.task_logger.info(f"Web search results:\n{search_content}")
                 await self.append_chat_history(
                     {
                         "role": "tool",
-                        "content": papers_str,
+                        "content": search_content,
                         "tool_call_id": tool_id,
-                        "name": "search_papers",
+                        "name": "web_search",
                     }
                 )
-            elif tool_call.function.name == "web_search":
-                await self.task_logger.info("Calling tool: web_search")
-                await redis_manager.publish_message(
-                    self.task_id,
-                    SystemMessage(
-                        content=f"WriterAgent is calling {tool_call.function.name} tool."
-                    ),
-                )
-
-                # 解析参数
-                args = json.loads(tool_call.function.arguments)
-                query = args["query"]
-                search_type = args.get("search_type", "general")
-                provider = args.get("provider")
-                max_results = args.get("max_results", 10)
-
-                await redis_manager.publish_message(
-                    self.task_id,
-                    WriterMessage(
-                        input={"query": query, "search_type": search_type},
-                    ),
-                )
+            except Exception as e:
+                error_msg = f"Web search failed: {str(e)}"
+                await self.task_logger.error(error_msg)
+                return WriterResponse(response_content=error_msg, footnotes=footnotes)
+        elif tool_call.function.name == "get_result_details":
+            await self.task_logger.info("Calling tool: get_result_details")
+            result_id = json.loads(tool_call.function.arguments)["result_id"]
 
-                # 更新对话历史 - 添加助手的响应
-                await self.append_chat_history(response.choices[0].message.model_dump())
-                ic(response.choices[0].message.model_dump())
-
-                try:
-                    # 调用web搜索工具
-                    search_result = await self.web_search_tool.search(
-                        query=query,
-                        search_type=search_type,
-                        provider=provider,
-                        max_results=max_results,
-                    )
-
-                    if search_result.error:
-                        error_msg = f"Web search failed: {search_result.error}"
-                        await self.task_logger.error(error_msg)
-                        return WriterResponse(
-                            response_content=error_msg, footnotes=footnotes
-                        )
-
-                    search_content = search_result.result
-                    await self.task_logger.info(
-                        f"Web search results:\n{search_content}"
-                    )
-                    await self.append_chat_history(
-                        {
-                            "role": "tool",
-                            "content": search_content,
-                            "tool_call_id": tool_id,
-                            "name": "web_search",
-                        }
-                    )
-                except Exception as e:
-                    error_msg = f"Web search failed: {str(e)}"
-                    await self.task_logger.error(error_msg)
-                    return WriterResponse(
-                        response_content=error_msg, footnotes=footnotes
-                    )
-                next_response = await self.model.chat(
-                    history=self.chat_history,
-                    tools=writer_tools,
-                    tool_choice="auto",
-                    agent_name=self.__class__.__name__,
-                    sub_title=sub_title,
-                )
-                response_content = next_response.choices[0].message.content
+            await self.append_chat_history(response.choices[0].message.model_dump())
+            details = await self.web_search_tool.get_result_details(result_id)
+            await self.append_chat_history(
+                {
+                    "role": "tool",
+                    "content": details.result or details.error,
+                    "tool_call_id": tool_id,
+                    "name": "get_result_details",
+                }
+            )
         else:
-            response_content = response.choices[0].message.content
-        self.chat_history.append({"role": "assistant", "content": response_content})
-        await self.task_logger.info(f"{self.__class__.__name__}: Finished execution.")
-        return WriterResponse(response_content=response_content, footnotes=footnotes)
+            await self.append_chat_history(response.choices[0].message.model_dump())
+            await self.append_chat_history(
+                {
+                    "role": "tool",
+                    "content": f"Unknown tool: {tool_call.function.name}",
+                    "tool_call_id": tool_id,
+                    "name": tool_call.function.name,
+                }
+            )
+        return None
 
     async def summarize(self) -> str:
         """
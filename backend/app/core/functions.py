@@ -1,3 +1,5 @@
+from app.tools.web_search_tool import WebSearchTool
+
 coder_tools = [
     {
         "type": "function",
@@ -23,7 +25,8 @@ coder_tools = [
         "type": "function",
         "function": {
             "name": "pip_install",
-            "description": "Install Python packages using pip. This function executes 'pip install' command for the specified packages. "
+            "description": "Install Python packages into the kernel environment with pip, outside the running kernel; installed packages can be imported right away without restarting. "
+            "Packages that are already installed return immediately. Pass package names or version specifiers only, no pip options. "
             "Note: Common packages like numpy, scipy, pandas, matplotlib, seaborn, scikit-learn, xgboost are already installed.",
             "strict": True,
             "parameters": {
@@ -166,4 +169,6 @@ writer_tools = [
             },
         },
     },
+    # 与 WebSearchTool 中的工具定义保持一致
+    WebSearchTool.get_result_details._tool_schema,
 ]
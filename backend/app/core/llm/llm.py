@@ -13,6 +13,8 @@ from litellm import acompletion
 import litellm
 from app.schemas.enums import AgentType
 from app.utils.track import agent_metrics
+from app.utils.budget_manager import budget_manager, BudgetDecision
+from app.utils.pricing import pricing_registry
 from icecream import ic
 from typing import TYPE_CHECKING
 
@@ -47,6 +49,7 @@ class LLM:
         top_p: float | None = None,  # 添加top_p参数,
         agent_name: AgentType = AgentType.SYSTEM,  # CoderAgent or WriterAgent
         sub_title: str | None = None,
+        max_tokens: int | None = None,  # 覆盖实例级的最大输出 token 数
     ) -> str:
         logger.info(f"subtitle是:{sub_title}")
 
@@ -67,8 +70,9 @@ class LLM:
             kwargs["tools"] = tools
             kwargs["tool_choice"] = tool_choice
 
-        if self.max_tokens:
-            kwargs["max_tokens"] = self.max_tokens
+        max_tokens = max_tokens or self.max_tokens
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
 
         if self.base_url:
             kwargs["base_url"] = self.base_url
@@ -242,6 +246,7 @@ class ManagedLLM(LLM):
         provider_manager: "ProviderManager",
         task_id: str,
         agent_name: str,
+        tenant: str = "default",
     ):
         # 使用第一个提供商初始化基类
         first_provider = (
@@ -259,7 +264,9 @@ class ManagedLLM(LLM):
 
         self.provider_manager = provider_manager
         self.agent_name = agent_name
+        self.tenant = tenant
         self.current_provider = first_provider
+        self._budget_warned = False
 
     async def chat(
         self,
@@ -271,25 +278,33 @@ class ManagedLLM(LLM):
         top_p: float | None = None,
         agent_name: AgentType = AgentType.SYSTEM,
         sub_title: str | None = None,
+        prefer_cheap: bool = False,
+        max_tokens: int | None = None,
     ) -> str:
         """
         带提供商管理和速率限制的聊天方法
 
         自动处理：
+        - 预算准入（预算接近耗尽时降级为低价提供商并限制输出长度）
         - 速率限制检查
         - 提供商故障转移
         - 重试逻辑
         """
-        # 估算 token 数量（简单估算：字符数 / 4）
-        estimated_tokens = 0
-        if history:
-            for msg in history:
-                content = msg.get("content", "")
-                if isinstance(content, str):
-                    estimated_tokens += len(content) // 4
+        estimated_tokens = self._estimate_tokens(history)
+
+        decision = await budget_manager.check(
+            self.task_id,
+            self.tenant,
+            estimated_tokens,
+            pricing_registry.estimate_cost(self.model, estimated_tokens),
+        )
+        if decision.degraded:
+            prefer_cheap = True
+            max_tokens = min(max_tokens or decision.max_tokens, decision.max_tokens)
+            await self._send_budget_warning(decision)
 
         # 尝试所有可用的提供商
-        exclude_providers = []
+        exclude_providers: set[str] = set()
         last_error = None
 
         for attempt in range(max_retries):
@@ -298,6 +313,7 @@ class ManagedLLM(LLM):
                 provider = await self.provider_manager.get_next_provider(
                     estimated_tokens=estimated_tokens,
                     exclude_providers=exclude_providers,
+                    prefer_cheap=prefer_cheap,
                 )
 
                 if not provider:
@@ -334,6 +350,7 @@ class ManagedLLM(LLM):
                         top_p=top_p,
                         agent_name=agent_name,
                         sub_title=sub_title,
+                        max_tokens=max_tokens,
                     )
 
                     # 记录成功
@@ -347,9 +364,14 @@ class ManagedLLM(LLM):
                         actual_tokens=actual_tokens,
                         estimated_tokens=estimated_tokens,
                     )
+                    await self._record_budget_usage(provider.model, response)
 
                     return response
 
+                except asyncio.CancelledError:
+                    # 请求被取消（客户端断开、超时）：归还探测名额后继续取消
+                    await self.provider_manager.release_provider(provider)
+                    raise
                 except Exception as e:
                     last_error = e
                     logger.error(
@@ -364,7 +386,7 @@ class ManagedLLM(LLM):
                     )
 
                     # 将此提供商加入排除列表
-                    exclude_providers.append(provider.get_identifier())
+                    exclude_providers.add(provider.identifier)
 
                     # 如果还有重试机会，继续
                     if attempt < max_retries - 1:
@@ -388,6 +410,111 @@ class ManagedLLM(LLM):
             raise last_error
         raise Exception("Failed to complete request after all retries")
 
+    async def simple_chat(self, history: list) -> str:
+        """
+        低重要性调用（如记忆总结）：优先使用低价提供商，不推送消息到前端
+
+        Args:
+            history: 构造好的历史记录
+
+        Returns:
+            str: 模型回复内容
+        """
+        estimated_tokens = self._estimate_tokens(history)
+        decision = await budget_manager.check(
+            self.task_id,
+            self.tenant,
+            estimated_tokens,
+            pricing_registry.estimate_cost(self.model, estimated_tokens),
+        )
+
+        provider = await self.provider_manager.get_next_provider(
+            estimated_tokens=estimated_tokens,
+            prefer_cheap=True,
+        )
+        managed = provider is not None
+        if not managed:
+            # 所有提供商都被限流时沿用当前提供商，保持原有行为
+            provider = self.current_provider
+
+        kwargs = {
+            "api_key": provider.api_key,
+            "model": provider.model,
+            "messages": history,
+            "stream": False,
+        }
+        if provider.base_url:
+            kwargs["base_url"] = provider.base_url
+        if decision.degraded:
+            kwargs["max_tokens"] = decision.max_tokens
+
+        try:
+            response = await acompletion(**kwargs)
+        except asyncio.CancelledError:
+            if managed:
+                await self.provider_manager.release_provider(provider)
+            raise
+        except Exception:
+            if managed:
+                await self.provider_manager.record_request_result(
+                    provider=provider, success=False
+                )
+            raise
+
+        if managed:
+            actual_tokens = 0
+            if getattr(response, "usage", None):
+                actual_tokens = response.usage.total_tokens
+            await self.provider_manager.record_request_result(
+                provider=provider,
+                success=True,
+                actual_tokens=actual_tokens,
+                estimated_tokens=estimated_tokens,
+            )
+        await self._record_budget_usage(provider.model, response)
+
+        return response.choices[0].message.content
+
+    @staticmethod
+    def _estimate_tokens(history: list | None) -> int:
+        """估算 token 数量（简单估算：字符数 / 4）"""
+        estimated_tokens = 0
+        if history:
+            for msg in history:
+                content = msg.get("content", "")
+                if isinstance(content, str):
+                    estimated_tokens += len(content) // 4
+        return estimated_tokens
+
+    async def _record_budget_usage(self, model: str, response):
+        """按实际 token 使用量和模型价格记录预算消耗"""
+        usage = getattr(response, "usage", None)
+        if not usage:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cost = pricing_registry.calculate_cost(model, prompt_tokens, completion_tokens)
+        await budget_manager.record_usage(
+            self.task_id,
+            self.tenant,
+            tokens=getattr(usage, "total_tokens", 0) or 0,
+            cost=cost,
+        )
+
+    async def _send_budget_warning(self, decision: BudgetDecision):
+        """预算降级时向前端发送一次提示"""
+        if self._budget_warned:
+            return
+        self._budget_warned = True
+        logger.warning(
+            f"Budget nearly exhausted for task {self.task_id} ({decision.reason}), "
+            f"{self.agent_name} switched to low-cost providers"
+        )
+        warning_msg = SystemMessage(
+            content=f"⚠️ 预算即将用尽（{decision.reason}），已切换到低价模型并限制输出长度"
+        )
+        await redis_manager.publish_message(self.task_id, warning_msg)
+
     async def _send_rate_limit_warning(self, provider_name: str, attempt: int):
         """发送速率限制警告消息到前端"""
         warning_msg = SystemMessage(
@@ -411,6 +538,10 @@ async def simple_chat(model: LLM, history: list) -> str:
     Returns:
         return_type: Description of the return value.
     """
+    # 带提供商管理的模型走低价路由
+    if isinstance(model, ManagedLLM):
+        return await model.simple_chat(history)
+
     kwargs = {
         "api_key": model.api_key,
         "model": model.model,
@@ -1,17 +1,23 @@
 from app.config.setting import settings
 from app.core.llm.llm import LLM, ManagedLLM
-from app.utils.config_loader import config_loader
-from app.utils.provider_manager import ProviderManager
+from app.utils.provider_registry import provider_registry
 from app.utils.log_util import logger
 
 
 class LLMFactory:
     task_id: str
     use_provider_manager: bool
+    tenant: str
 
-    def __init__(self, task_id: str, use_provider_manager: bool = True) -> None:
+    def __init__(
+        self,
+        task_id: str,
+        use_provider_manager: bool = True,
+        tenant: str = "default",
+    ) -> None:
         self.task_id = task_id
         self.use_provider_manager = use_provider_manager
+        self.tenant = tenant  # 租户标识，用于按租户统计预算
 
     def get_all_llms(self) -> tuple[LLM, LLM, LLM, LLM]:
         """获取所有 Agent 的 LLM 实例"""
@@ -64,30 +70,24 @@ class LLMFactory:
         return coordinator_llm, modeler_llm, coder_llm, writer_llm
 
     def _create_managed_llm(self, agent_name: str) -> ManagedLLM:
-        """创建带提供商管理的 LLM 实例"""
-        providers = config_loader.get_agent_providers(agent_name)
+        """创建带提供商管理的 LLM 实例
+
+        ProviderManager 来自进程级注册表，健康状态和速率限制窗口在任务之间共享。
+        """
+        provider_manager = provider_registry.get_agent_manager(agent_name)
 
         # 如果没有配置提供商，回退到环境变量配置
-        if not providers:
+        if provider_manager is None:
             logger.warning(
                 f"No providers configured for {agent_name}, falling back to settings"
             )
             return self._create_fallback_llm(agent_name)
 
-        rotation_strategy = config_loader.get_rotation_strategy(agent_name)
-        retry_config = config_loader.get_retry_config(agent_name)
-
-        provider_manager = ProviderManager(
-            providers=providers,
-            rotation_strategy=rotation_strategy,
-            auto_retry=retry_config["auto_retry"],
-            max_retries=retry_config["max_retries"],
-        )
-
         return ManagedLLM(
             provider_manager=provider_manager,
             task_id=self.task_id,
             agent_name=agent_name,
+            tenant=self.tenant,
         )
 
     def _create_fallback_llm(self, agent_name: str) -> ManagedLLM:
@@ -107,15 +107,13 @@ class LLMFactory:
             priority=1,
         )
 
-        provider_manager = ProviderManager(
-            providers=[provider],
-            rotation_strategy="round-robin",
-        )
+        provider_manager = provider_registry.get_fallback_manager(agent_name, provider)
 
         return ManagedLLM(
             provider_manager=provider_manager,
             task_id=self.task_id,
             agent_name=agent_name,
+            tenant=self.tenant,
         )
 
     @staticmethod
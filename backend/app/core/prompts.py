@@ -1,3 +1,4 @@
+from app.config.setting import settings
 from app.schemas.enums import FormatOutPut
 import platform
 
@@ -110,6 +111,12 @@ def get_coder_prompt(language: str = "zh") -> str:
     response_lang = (
         "Reply in Chinese (中文回复)" if language == "zh" else "Reply in English"
     )
+    if settings.KERNEL_DATA_CACHE_ENABLED:
+        file_rules = """3. Load .csv / .xlsx / .xls files with the preloaded `load_data("data.xlsx")` (same result as `pd.read_csv()` / `pd.read_excel()`, but the file is parsed only once and reloads are near-instant; pass `sheet_name=` for other sheets)
+4. Do not re-import or re-parse data files that are already loaded"""
+    else:
+        file_rules = """3. Directly access files using relative paths (e.g., `pd.read_csv("data.csv")`)
+4. For Excel files: Always use `pd.read_excel()`"""
     return f"""
 You are an AI code interpreter specializing in data analysis with Python. Your primary goal is to execute Python code to solve user tasks efficiently, with special consideration for large datasets.
 
@@ -122,8 +129,7 @@ You are an AI code interpreter specializing in data analysis with Python. Your p
 ### FILE HANDLING RULES
 1. All user files are pre-uploaded to working directory
 2. Never check file existence - assume files are present
-3. Directly access files using relative paths (e.g., `pd.read_csv("data.csv")`)
-4. For Excel files: Always use `pd.read_excel()`
+{file_rules}
 
 ### LARGE CSV PROCESSING PROTOCOL
 For datasets >1GB:
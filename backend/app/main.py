@@ -14,6 +14,10 @@ from app.routers import (
     rate_limit_router,
 )
 from app.utils.log_util import logger
+from app.services.openalex_client import openalex_client
+from app.services.http_session_manager import http_session_manager
+from app.tools.search.search_manager import search_manager
+from app.config.setting import settings
 from fastapi.staticfiles import StaticFiles
 from app.utils.cli import get_ascii_banner, center_cli_str
 
@@ -35,8 +39,14 @@ async def lifespan(app: FastAPI):
     os.makedirs(PROJECT_FOLDER, exist_ok=True)
     os.makedirs(WORK_DIR, exist_ok=True)  # 确保工作目录存在
 
+    if settings.SEARCH_HEALTH_PROBE_ENABLED:
+        search_manager.start_health_probe()
+
     yield
     logger.info("Stopping MathModelAgent")
+    await search_manager.close()
+    await openalex_client.close()
+    await http_session_manager.close()
 
 
 app = FastAPI(
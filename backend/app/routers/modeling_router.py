@@ -23,7 +23,7 @@ from icecream import ic
 from pydantic import BaseModel
 import litellm
 from app.config.setting import settings
-import requests
+from app.services.openalex_client import openalex_client
 from app.models.task_history import TaskHistoryItem, task_history_manager
 from app.utils.config_loader import save_model_config
 from typing import Any, Dict
@@ -278,12 +278,10 @@ async def validate_openalex_email(request: ValidateOpenalexEmailRequest):
     验证 OpenAlex Email 的有效性
     """
     try:
-        response = requests.get(
-            f"https://api.openalex.org/works?mailto={request.email}",
-            timeout=10,
+        response = await openalex_client.get(
+            "works", params={"per_page": 1}, email=request.email
         )
         logger.debug(f"OpenAlex Email 验证响应: {response}")
-        response.raise_for_status()
         return ValidateOpenalexEmailResponse(
             valid=True, message="✓ OpenAlex Email 验证成功"
         )
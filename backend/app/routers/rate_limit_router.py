@@ -2,49 +2,46 @@
 速率限制和提供商管理 API 路由
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 from app.utils.config_loader import config_loader
-from app.utils.provider_manager import ProviderManager
+from app.utils.provider_registry import provider_registry
 from app.utils.log_util import logger
 
 router = APIRouter(prefix="/api/rate-limit", tags=["rate-limit"])
 
 
 @router.get("/stats/{agent_name}")
-async def get_agent_rate_limit_stats(agent_name: str) -> Dict[str, Any]:
+async def get_agent_rate_limit_stats(
+    agent_name: str, refresh: bool = False
+) -> Dict[str, Any]:
     """
     获取指定 Agent 的速率限制统计信息
 
     Args:
         agent_name: Agent 名称（coordinator, modeler, coder, writer）
+        refresh: 是否跳过短时缓存的统计快照
 
     Returns:
         速率限制统计信息
     """
     try:
-        # 加载提供商配置
-        providers = config_loader.get_agent_providers(agent_name)
+        # 使用共享的提供商管理器，统计信息反映所有任务的实时状态
+        provider_manager = provider_registry.get_agent_manager(agent_name)
 
-        if not providers:
+        if provider_manager is None:
             return {
                 "agent_name": agent_name,
                 "providers": [],
                 "message": "No providers configured",
             }
 
-        # 创建临时的提供商管理器来获取统计信息
-        rotation_strategy = config_loader.get_rotation_strategy(agent_name)
-        provider_manager = ProviderManager(
-            providers=providers,
-            rotation_strategy=rotation_strategy,
-        )
-
-        stats = await provider_manager.get_all_stats()
+        stats = await provider_manager.get_all_stats(use_cache=not refresh)
 
         return {
             "agent_name": agent_name,
-            "rotation_strategy": rotation_strategy.value,
+            "rotation_strategy": provider_manager.rotation_strategy.value,
             "providers": stats,
         }
 
@@ -54,46 +51,44 @@ async def get_agent_rate_limit_stats(agent_name: str) -> Dict[str, Any]:
 
 
 @router.get("/stats")
-async def get_all_rate_limit_stats() -> Dict[str, Any]:
+async def get_all_rate_limit_stats(refresh: bool = False) -> Dict[str, Any]:
     """
     获取所有 Agent 的速率限制统计信息
 
+    各 Agent 的统计并发读取，每个 Agent 只需一次 Redis 往返。
+
+    Args:
+        refresh: 是否跳过短时缓存的统计快照
+
     Returns:
         所有 Agent 的速率限制统计信息
     """
-    try:
-        agents = ["coordinator", "modeler", "coder", "writer"]
-        all_stats = {}
-
-        for agent_name in agents:
-            try:
-                providers = config_loader.get_agent_providers(agent_name)
-
-                if not providers:
-                    all_stats[agent_name] = {
-                        "providers": [],
-                        "message": "No providers configured",
-                    }
-                    continue
-
-                rotation_strategy = config_loader.get_rotation_strategy(agent_name)
-                provider_manager = ProviderManager(
-                    providers=providers,
-                    rotation_strategy=rotation_strategy,
-                )
-
-                stats = await provider_manager.get_all_stats()
-
-                all_stats[agent_name] = {
-                    "rotation_strategy": rotation_strategy.value,
-                    "providers": stats,
+
+    async def _agent_stats(agent_name: str) -> Dict[str, Any]:
+        try:
+            provider_manager = provider_registry.get_agent_manager(agent_name)
+
+            if provider_manager is None:
+                return {
+                    "providers": [],
+                    "message": "No providers configured",
                 }
 
-            except Exception as e:
-                logger.error(f"Failed to get stats for {agent_name}: {e}")
-                all_stats[agent_name] = {"error": str(e)}
+            stats = await provider_manager.get_all_stats(use_cache=not refresh)
+
+            return {
+                "rotation_strategy": provider_manager.rotation_strategy.value,
+                "providers": stats,
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to get stats for {agent_name}: {e}")
+            return {"error": str(e)}
 
-        return all_stats
+    try:
+        agents = provider_registry.AGENTS
+        results = await asyncio.gather(*(_agent_stats(agent) for agent in agents))
+        return dict(zip(agents, results))
 
     except Exception as e:
         logger.error(f"Failed to get all rate limit stats: {e}")
@@ -101,19 +96,23 @@ async def get_all_rate_limit_stats() -> Dict[str, Any]:
 
 
 @router.post("/reload-config")
-async def reload_config() -> Dict[str, str]:
+async def reload_config() -> Dict[str, Any]:
     """
     重新加载配置文件
 
+    同时刷新共享的提供商管理器，未变化的 API Key 保留健康状态和速率限制窗口。
+
     Returns:
         操作结果
     """
     try:
         config_loader.reload()
+        configured_agents = provider_registry.reload()
         return {
             "status": "success",
             "message": "Configuration reloaded successfully",
             "current_config": config_loader.current_config_name,
+            "configured_agents": configured_agents,
         }
     except Exception as e:
         logger.error(f"Failed to reload config: {e}")
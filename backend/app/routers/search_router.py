@@ -1,5 +1,7 @@
+import json
 from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any, Optional
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Dict, Any, Optional
 from app.schemas.search import (
     SearchRequest,
     SearchResponse,
@@ -7,6 +9,8 @@ from app.schemas.search import (
     SearchProvider,
     SearchError,
 )
+from app.services.http_session_manager import http_session_manager
+from app.tools.search.query_index import query_index
 from app.tools.search.search_manager import search_manager
 from app.config.setting import settings
 from app.utils.log_util import get_logger
@@ -42,6 +46,105 @@ async def perform_web_search(request: SearchRequest):
         )
 
 
+@router.post("/web/stream")
+async def stream_web_search(request: SearchRequest):
+    """
+    Perform a web search and stream results as NDJSON
+
+    Fan-out searches first emit a ``partial`` line per provider as soon as it
+    answers. Every search then emits a ``meta`` line for the final (fused)
+    response, one ``result`` line per result and a final ``done`` line (or an
+    ``error`` line). Raw page content is not fetched; request it
+    per result from ``/search/web/raw``.
+    """
+    return StreamingResponse(_stream_search(request), media_type="application/x-ndjson")
+
+
+async def _stream_search(request: SearchRequest) -> AsyncIterator[str]:
+    # Skip provider raw content so large pages never sit in server memory
+    lazy_request = request.model_copy(update={"include_content": False})
+    response = None
+    try:
+        async for kind, event in search_manager.search_stream(lazy_request):
+            if kind == "final":
+                response = event
+                continue
+            yield _ndjson(
+                {
+                    "type": "partial",
+                    "provider": event.provider.value,
+                    "search_time": event.search_time,
+                    "results": [_result_data(result) for result in event.results],
+                }
+            )
+    except SearchError as e:
+        logger.error(f"Search error: {e.message}")
+        yield _ndjson(
+            {
+                "type": "error",
+                "message": e.message,
+                "provider": e.provider,
+                "error_code": e.error_code,
+            }
+        )
+        return
+    except Exception as e:
+        logger.error(f"Unexpected search error: {str(e)}")
+        yield _ndjson(
+            {"type": "error", "message": "Internal search error", "error": str(e)}
+        )
+        return
+
+    yield _ndjson(
+        {
+            "type": "meta",
+            "query": response.query,
+            "provider": response.provider.value,
+            "total_results": response.total_results,
+            "search_time": response.search_time,
+            "metadata": response.metadata,
+        }
+    )
+    for index, result in enumerate(response.results):
+        yield _ndjson(
+            {"type": "result", "index": index, "result": _result_data(result)}
+        )
+    yield _ndjson({"type": "done", "count": len(response.results)})
+
+
+def _result_data(result) -> Dict[str, Any]:
+    data = result.model_dump(mode="json")
+    data["metadata"].pop("raw_content", None)
+    return data
+
+
+def _ndjson(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False, default=str) + "\n"
+
+
+@router.get("/web/raw")
+async def get_raw_content(url: str, provider: Optional[SearchProvider] = None):
+    """
+    Get raw page content for a single search result on demand
+    """
+    try:
+        content_map = await search_manager.get_content([url], provider)
+    except SearchError as e:
+        logger.error(f"Content retrieval error: {e.message}")
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": e.message,
+                "provider": e.provider,
+                "error_code": e.error_code,
+            },
+        )
+    content = content_map.get(url)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Content not available")
+    return {"url": url, "content": content}
+
+
 @router.post("/content", response_model=Dict[str, str])
 async def get_web_content(request: Dict[str, List[str]]):
     """
@@ -105,12 +208,14 @@ async def find_similar_pages(request: Dict[str, Any]):
 
 
 @router.get("/status")
-async def get_search_provider_status(provider: Optional[SearchProvider] = None):
+async def get_search_provider_status(
+    provider: Optional[SearchProvider] = None, refresh: bool = False
+):
     """
-    Get status of search providers
+    Get status of search providers (from the background probe unless refresh)
     """
     try:
-        status = await search_manager.get_provider_status(provider)
+        status = await search_manager.get_provider_status(provider, refresh=refresh)
         return status
     except Exception as e:
         logger.error(f"Status check error: {str(e)}")
@@ -200,8 +305,8 @@ async def test_search_provider(request: Dict[str, SearchProvider]):
                 "message": f"Provider {provider.value} is not configured or available",
             }
 
-        # Get provider status as a connectivity test
-        status = await search_manager.get_provider_status(provider)
+        # Run a live health check as a connectivity test
+        status = await search_manager.get_provider_status(provider, refresh=True)
 
         return {
             "success": status.available,
@@ -216,13 +321,13 @@ async def test_search_provider(request: Dict[str, SearchProvider]):
 
 
 @router.get("/health")
-async def search_health_check():
+async def search_health_check(refresh: bool = False):
     """
-    Overall search system health check
+    Overall search system health check (from the background probe unless refresh)
     """
     try:
         providers = search_manager.get_available_providers()
-        statuses = await search_manager.get_provider_status()
+        statuses = await search_manager.get_provider_status(refresh=refresh)
 
         healthy_providers = []
         unhealthy_providers = []
@@ -246,6 +351,9 @@ async def search_health_check():
             "total_providers": len(providers),
             "healthy_providers": healthy_providers,
             "unhealthy_providers": unhealthy_providers,
+            "cache": search_manager.cache.get_stats() if search_manager.cache else None,
+            "http": http_session_manager.get_all_metrics(),
+            "semantic_dedup": query_index.get_stats(),
             "message": f"Search system is {'healthy' if overall_health else 'unhealthy'}",
         }
     except Exception as e:
@@ -9,6 +9,7 @@ class SearchProvider(str, Enum):
 
     TAVILY = "tavily"
     EXA = "exa"
+    OPENALEX = "openalex"
 
 
 class SearchType(str, Enum):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Any, Optional
 
 
@@ -6,3 +6,15 @@ class ToolResult(BaseModel):
     success: bool
     message: Optional[str] = None
     data: Optional[Any] = None
+    # Fields used by agent-facing tools such as WebSearchTool
+    result: Optional[str] = None
+    error: Optional[str] = None
+    metadata: Optional[Any] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _default_success(cls, values: Any) -> Any:
+        """Infer success from the absence of an error when not given"""
+        if isinstance(values, dict) and "success" not in values:
+            values = {**values, "success": values.get("error") is None}
+        return values
@@ -0,0 +1,451 @@
+"""
+独立代码执行器服务
+
+在 API 进程之外托管 Jupyter 内核，用户代码再重也不会占用 API 进程的 CPU 和事件循环。
+可以与后端部署在同一台机器，也可以部署到多台独立主机上横向扩展：
+
+    EXECUTOR_TOKEN=<token> python -m app.services.executor_service --host 0.0.0.0 --port 8100
+
+RPC 协议（JSON over HTTP，Bearer token 鉴权；未设置 EXECUTOR_TOKEN 时只能监听回环地址）：
+- GET    /health                        服务状态与内核数量
+- POST   /kernels                       创建内核 {"work_dir"?, "limits"?} -> {"kernel_id", "work_dir"}
+- POST   /kernels/{id}/execute          执行代码 {"code", "timeout"?, "max_output_chars"?, "max_output_bytes"?}
+                                        -> {"outputs": [[标记, 内容]], "files": [...], "timed_out"}
+                                        图片输出已写入工作目录，内容为相对路径
+- POST   /kernels/{id}/interrupt        中断执行
+- POST   /kernels/{id}/restart          重启内核
+- DELETE /kernels/{id}                  关闭内核
+- PUT    /kernels/{id}/files/{path}     上传文件到内核工作目录
+- GET    /kernels/{id}/files/{path}     下载内核工作目录中的文件
+- POST   /packages                      安装包到内核环境 {"packages": [...]} -> InstallResult
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import os
+import queue
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiohttp import web
+from jupyter_client.manager import AsyncKernelManager
+from app.config.setting import settings
+from app.services.package_provisioner import PackageProvisioner, package_provisioner
+from app.tools.kernel_checkpoint import restore_code
+from app.tools.kernel_data import CACHE_DIR as DATA_CACHE_DIR
+from app.tools.kernel_limits import ResourceLimits, cgroup_limiter
+from app.tools.kernel_messages import (
+    IMAGE_TRACKING_CODE,
+    NAMESPACE_TRACKING_CODE,
+    OutputCollector,
+)
+from app.utils.log_util import logger
+
+
+class KernelSession:
+    """执行器中的一个内核及其工作目录"""
+
+    def __init__(
+        self, kernel_id: str, work_dir: str, limits: Optional[ResourceLimits] = None
+    ):
+        self.kernel_id = kernel_id
+        self.work_dir = work_dir
+        self.limits = limits or ResourceLimits()
+        self.km: Optional[AsyncKernelManager] = None
+        self.kc = None
+        self.last_used = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._files: Dict[str, float] = {}
+
+    async def start(self):
+        """启动内核（工作目录即内核的当前目录）"""
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.km = AsyncKernelManager(kernel_name="python3")
+        await self.km.start_kernel(cwd=self.work_dir)
+        self.kc = self.km.client()
+        self.kc.start_channels()
+        await self.kc.wait_for_ready(timeout=60)
+        await self._setup_kernel()
+        self._files = self._snapshot()
+
+    async def _setup_kernel(self):
+        """为内核设置 rlimit 与图片 / 命名空间跟踪钩子，并在可用时加入 cgroup"""
+        pid = getattr(getattr(self.km.provisioner, "process", None), "pid", None)
+        cgroup = None
+        if isinstance(pid, int):
+            cgroup = cgroup_limiter.attach(f"kernel-{self.kernel_id}", pid, self.limits)
+        await self._execute(
+            self.limits.setup_code(memory_in_cgroup=cgroup is not None)
+            + IMAGE_TRACKING_CODE
+            + NAMESPACE_TRACKING_CODE,
+            60,
+            OutputCollector(self.work_dir),
+        )
+
+    async def execute(
+        self,
+        code: str,
+        timeout: float,
+        max_output_chars: Optional[int] = None,
+        max_output_bytes: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        执行代码，同一内核上的请求串行执行
+
+        Args:
+            code: 代码
+            timeout: 最长执行时间（秒），超时后中断内核
+            max_output_chars: 保留的文本输出字符数
+            max_output_bytes: 输出总大小硬上限，超出时中断执行
+
+        Returns:
+            dict: outputs（[(标记, 内容)]）、files（新增或修改的文件）、timed_out
+        """
+        async with self._lock:
+            self.last_used = time.monotonic()
+            collector = OutputCollector(
+                self.work_dir, max_output_chars, max_output_bytes
+            )
+            timed_out = await self._execute(code, timeout, collector)
+            outputs = collector.outputs()
+            if timed_out:
+                outputs.append(
+                    (
+                        "error",
+                        f"WallTimeLimitExceeded: execution exceeded {timeout} s and was interrupted",
+                    )
+                )
+            if not await self.km.is_alive():
+                name = f"kernel-{self.kernel_id}"
+                reason = (
+                    "killed by the cgroup OOM killer"
+                    if cgroup_limiter.oom_killed(name)
+                    else "exited unexpectedly"
+                )
+                logger.error(f"内核 {self.kernel_id} 已退出，重启")
+                await self.km.restart_kernel(now=True)
+                await self.kc.wait_for_ready(timeout=60)
+                await self._setup_kernel()
+                message = f"KernelDied: kernel process {reason}"
+                if settings.KERNEL_CHECKPOINT_ENABLED:
+                    # 内核以工作目录为当前目录重启，直接从检查点恢复变量
+                    restored = OutputCollector(self.work_dir)
+                    await self._execute(restore_code(), 300, restored)
+                    message += "".join(
+                        f"\n{text.strip()}"
+                        for mark, text in restored.outputs()
+                        if mark == "stdout"
+                    )
+                outputs.append(("error", message))
+
+            self.last_used = time.monotonic()
+            return {
+                "outputs": outputs,
+                "files": self._changed_files(),
+                "timed_out": timed_out,
+            }
+
+    async def _execute(
+        self, code: str, timeout: float, collector: OutputCollector
+    ) -> bool:
+        """运行代码并将输出送入 collector，返回是否超时"""
+        msg_id = self.kc.execute(code)
+        deadline = time.monotonic() + timeout
+        timed_out = False
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and not timed_out:
+                logger.error(f"内核 {self.kernel_id} 执行超时（{timeout} 秒），中断")
+                timed_out = True
+                await self.km.interrupt_kernel()
+                # 中断后再等待内核回到 idle
+                deadline = time.monotonic() + 10
+                continue
+            if remaining <= 0:
+                break
+            try:
+                msg = await self.kc.get_iopub_msg(timeout=min(1.0, remaining))
+            except queue.Empty:
+                # 内核进程退出（如被 OOM killer 杀死）时不会再有消息
+                if not await self.km.is_alive():
+                    break
+                continue
+            if msg["parent_header"].get("msg_id") != msg_id:
+                continue
+            output_exceeded = collector.exceeded
+            collector.add(msg)
+            if collector.exceeded and not output_exceeded:
+                # 超出输出硬上限：中断执行，继续读取消息直到 idle
+                logger.error(f"内核 {self.kernel_id} 输出超出上限，中断")
+                await self.km.interrupt_kernel()
+            if (
+                msg["msg_type"] == "status"
+                and msg["content"].get("execution_state") == "idle"
+            ):
+                break
+
+        return timed_out
+
+    async def restart(self):
+        async with self._lock:
+            await self.km.restart_kernel()
+            await self.kc.wait_for_ready(timeout=60)
+            await self._setup_kernel()
+
+    async def interrupt(self):
+        await self.km.interrupt_kernel()
+
+    async def shutdown(self):
+        if self.kc is not None:
+            self.kc.stop_channels()
+        if self.km is not None:
+            await self.km.shutdown_kernel(now=True)
+        cgroup_limiter.remove(f"kernel-{self.kernel_id}")
+
+    def resolve(self, relative: str) -> str:
+        """将相对路径解析到工作目录内，拒绝越界路径"""
+        root = os.path.realpath(self.work_dir)
+        path = os.path.realpath(os.path.join(root, relative))
+        if os.path.commonpath([root, path]) != root or path == root:
+            raise web.HTTPBadRequest(text=f"Invalid path: {relative}")
+        return path
+
+    def _snapshot(self) -> Dict[str, float]:
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(self.work_dir):
+            # 数据缓存只供内核自身读取，不回传
+            dirnames[:] = [d for d in dirnames if d != DATA_CACHE_DIR]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    files[os.path.relpath(path, self.work_dir)] = os.path.getmtime(path)
+                except OSError:
+                    continue
+        return files
+
+    def _changed_files(self) -> list[str]:
+        current = self._snapshot()
+        changed = [
+            path for path, mtime in current.items() if self._files.get(path) != mtime
+        ]
+        self._files = current
+        return sorted(changed)
+
+
+KernelFactory = Callable[[str, str, ResourceLimits], Awaitable[KernelSession]]
+
+
+async def _start_kernel(
+    kernel_id: str, work_dir: str, limits: ResourceLimits
+) -> KernelSession:
+    session = KernelSession(kernel_id, work_dir, limits)
+    await session.start()
+    return session
+
+
+class ExecutorService:
+    """托管多个内核的执行器服务"""
+
+    def __init__(
+        self,
+        work_root: str = "./project/executor",  # 未指定工作目录时的根目录
+        max_kernels: int = 8,  # 同时存活的内核数上限
+        idle_timeout: float = 3600,  # 空闲内核的回收时间（秒）
+        token: Optional[str] = None,  # 鉴权 token
+        kernel_factory: KernelFactory = _start_kernel,
+        provisioner: Optional[PackageProvisioner] = None,  # 包安装服务
+    ):
+        self.work_root = work_root
+        self.max_kernels = max_kernels
+        self.idle_timeout = idle_timeout
+        self.token = token
+        self.kernel_factory = kernel_factory
+        self.provisioner = provisioner or package_provisioner
+        self.kernels: Dict[str, KernelSession] = {}
+        self._starting = 0  # 正在启动、已占用容量的内核数
+        self._reaper: Optional[asyncio.Task] = None
+
+    def create_app(self) -> web.Application:
+        app = web.Application(
+            middlewares=[self._auth_middleware], client_max_size=1024**3
+        )
+        app.router.add_get("/health", self.health)
+        app.router.add_post("/kernels", self.create_kernel)
+        app.router.add_post("/kernels/{kernel_id}/execute", self.execute)
+        app.router.add_post("/kernels/{kernel_id}/interrupt", self.interrupt)
+        app.router.add_post("/kernels/{kernel_id}/restart", self.restart)
+        app.router.add_delete("/kernels/{kernel_id}", self.delete_kernel)
+        app.router.add_put("/kernels/{kernel_id}/files/{path:.+}", self.put_file)
+        app.router.add_get("/kernels/{kernel_id}/files/{path:.+}", self.get_file)
+        app.router.add_post("/packages", self.install_packages)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    @web.middleware
+    async def _auth_middleware(self, request: web.Request, handler):
+        if self.token and request.path != "/health":
+            if request.headers.get("Authorization") != f"Bearer {self.token}":
+                raise web.HTTPUnauthorized(text="Invalid executor token")
+        return await handler(request)
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "status": "ok",
+                "kernels": len(self.kernels),
+                "max_kernels": self.max_kernels,
+            }
+        )
+
+    async def create_kernel(self, request: web.Request) -> web.Response:
+        body = await request.json() if request.can_read_body else {}
+        if len(self.kernels) + self._starting >= self.max_kernels:
+            raise web.HTTPServiceUnavailable(text="Executor is at capacity")
+        kernel_id = uuid.uuid4().hex
+        work_dir = body.get("work_dir") or os.path.join(self.work_root, kernel_id)
+        work_dir = os.path.abspath(work_dir)
+
+        # 客户端可以收紧限制，未指定的项使用执行器自身的配置
+        limits = ResourceLimits.from_settings()
+        for key, value in (body.get("limits") or {}).items():
+            if hasattr(limits, key):
+                setattr(limits, key, _tighten(getattr(limits, key), value))
+
+        # 启动内核前先占用容量，避免并发创建超过 max_kernels
+        self._starting += 1
+        try:
+            session = await self.kernel_factory(kernel_id, work_dir, limits)
+        finally:
+            self._starting -= 1
+        self.kernels[kernel_id] = session
+        logger.info(f"执行器创建内核 {kernel_id}，工作目录 {work_dir}")
+        return web.json_response({"kernel_id": kernel_id, "work_dir": work_dir})
+
+    async def execute(self, request: web.Request) -> web.Response:
+        session = self._get_session(request)
+        body = await request.json()
+        # 与创建内核时相同，单次执行只能收紧内核的限制
+        limits = session.limits
+        result = await session.execute(
+            body["code"],
+            float(_tighten(limits.wall_time, body.get("timeout") or None)),
+            _tighten(limits.max_output_chars, body.get("max_output_chars")),
+            _tighten(limits.max_output_bytes, body.get("max_output_bytes")),
+        )
+        return web.json_response(result)
+
+    async def interrupt(self, request: web.Request) -> web.Response:
+        await self._get_session(request).interrupt()
+        return web.json_response({"status": "ok"})
+
+    async def restart(self, request: web.Request) -> web.Response:
+        await self._get_session(request).restart()
+        return web.json_response({"status": "ok"})
+
+    async def install_packages(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        result = await self.provisioner.install(list(body.get("packages") or []))
+        return web.json_response(result.to_dict())
+
+    async def delete_kernel(self, request: web.Request) -> web.Response:
+        session = self._get_session(request)
+        self.kernels.pop(session.kernel_id, None)
+        await session.shutdown()
+        logger.info(f"执行器关闭内核 {session.kernel_id}")
+        return web.json_response({"status": "ok"})
+
+    async def put_file(self, request: web.Request) -> web.Response:
+        session = self._get_session(request)
+        path = session.resolve(request.match_info["path"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            async for chunk in request.content.iter_chunked(1 << 16):
+                f.write(chunk)
+        return web.json_response({"status": "ok"})
+
+    async def get_file(self, request: web.Request) -> web.StreamResponse:
+        session = self._get_session(request)
+        path = session.resolve(request.match_info["path"])
+        if not os.path.isfile(path):
+            raise web.HTTPNotFound(text=f"File not found: {request.match_info['path']}")
+        return web.FileResponse(path)
+
+    async def shutdown_all(self):
+        """关闭所有内核"""
+        sessions = list(self.kernels.values())
+        self.kernels.clear()
+        for session in sessions:
+            try:
+                await session.shutdown()
+            except Exception as e:
+                logger.warning(f"关闭内核 {session.kernel_id} 失败: {e}")
+
+    def _get_session(self, request: web.Request) -> KernelSession:
+        kernel_id = request.match_info["kernel_id"]
+        session = self.kernels.get(kernel_id)
+        if session is None:
+            raise web.HTTPNotFound(text=f"Unknown kernel: {kernel_id}")
+        return session
+
+    async def _reap_idle(self):
+        """定期回收空闲内核"""
+        while True:
+            await asyncio.sleep(max(1.0, min(60.0, self.idle_timeout / 2)))
+            now = time.monotonic()
+            for kernel_id, session in list(self.kernels.items()):
+                if now - session.last_used > self.idle_timeout:
+                    logger.info(f"回收空闲内核 {kernel_id}")
+                    self.kernels.pop(kernel_id, None)
+                    await session.shutdown()
+
+    async def _on_startup(self, app: web.Application):
+        self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _on_cleanup(self, app: web.Application):
+        if self._reaper is not None:
+            self._reaper.cancel()
+        await self.shutdown_all()
+
+
+def _tighten(current, requested):
+    """客户端只能收紧限制：未指定时沿用 current，current 为 None（不限制）时采用 requested"""
+    if requested is None:
+        return current
+    return requested if current is None else min(current, requested)
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MathModelAgent code executor")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    if not settings.EXECUTOR_TOKEN and not _is_loopback(args.host):
+        # 执行器可以运行任意代码，对外监听时必须鉴权
+        parser.error(
+            f"refusing to listen on {args.host} without EXECUTOR_TOKEN; "
+            "set a token or bind to a loopback address"
+        )
+
+    service = ExecutorService(
+        work_root=settings.EXECUTOR_WORK_ROOT,
+        max_kernels=settings.EXECUTOR_MAX_KERNELS,
+        idle_timeout=settings.EXECUTOR_IDLE_TIMEOUT,
+        token=settings.EXECUTOR_TOKEN,
+    )
+    web.run_app(service.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
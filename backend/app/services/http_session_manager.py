@@ -0,0 +1,180 @@
+"""
+共享 HTTP 会话管理
+
+所有搜索提供商共用一个 aiohttp.ClientSession 及其连接池：
+- 按主机限制连接数，缓存 DNS 解析结果，保持 keep-alive 连接复用
+- 会话由 FastAPI lifespan 在关闭时统一释放
+- 通过 aiohttp TraceConfig 统计每个提供商的新建 / 复用连接数，并记录请求耗时
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+import aiohttp
+from app.config.setting import settings
+from app.utils.log_util import logger
+
+
+@dataclass
+class HttpMetrics:
+    """单个提供商的 HTTP 指标"""
+
+    requests: int = 0
+    errors: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=100))
+
+    @property
+    def average_latency(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+    @property
+    def p95_latency(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    @property
+    def reuse_ratio(self) -> Optional[float]:
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": self.reuse_ratio,
+            "average_latency": self.average_latency,
+            "p95_latency": self.p95_latency,
+        }
+
+
+class HttpSessionManager:
+    """进程内共享的 aiohttp 会话"""
+
+    def __init__(
+        self,
+        max_connections: int = 100,  # 连接池总连接数
+        max_connections_per_host: int = 10,  # 每个主机的连接数
+        dns_cache_ttl: int = 300,  # DNS 缓存时间（秒）
+        keepalive_timeout: float = 30.0,  # 空闲连接保持时间（秒）
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._metrics: Dict[str, HttpMetrics] = {}
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """获取共享会话（首次调用时创建）"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # 会话绑定事件循环，循环变化时（如测试中）关闭旧会话后重新创建
+            await self._close_stale_session()
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[self._build_trace_config()]
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        """关闭共享会话及其连接池"""
+        if self._session is not None and not self._session.closed:
+            try:
+                await self._session.close()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP session: {e}")
+        self._session = None
+        self._loop = None
+
+    async def _close_stale_session(self):
+        """关闭属于其他事件循环的旧会话，释放其连接池"""
+        session, loop = self._session, self._loop
+        self._session = None
+        self._loop = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running():
+            # 旧循环仍在其他线程中运行，由它自己关闭会话
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        try:
+            # 关闭连接池中的连接；旧循环已关闭时等待可能失败，连接仍会被关闭
+            await session.close()
+        except Exception as e:
+            logger.debug(f"Closing HTTP session of a stale event loop failed: {e}")
+
+    def record_request(self, name: str, latency: float, error: bool = False):
+        """
+        记录一次请求
+
+        Args:
+            name: 提供商名称
+            latency: 请求耗时（秒）
+            error: 请求是否失败
+        """
+        metrics = self._get_metrics(name)
+        metrics.requests += 1
+        metrics.latencies.append(latency)
+        if error:
+            metrics.errors += 1
+
+    def get_metrics(self, name: str) -> HttpMetrics:
+        """获取提供商的指标"""
+        return self._get_metrics(name)
+
+    def get_all_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有提供商的指标"""
+        return {name: metrics.to_dict() for name, metrics in self._metrics.items()}
+
+    def reset_metrics(self):
+        """清空指标"""
+        self._metrics.clear()
+
+    def _get_metrics(self, name: str) -> HttpMetrics:
+        if name not in self._metrics:
+            self._metrics[name] = HttpMetrics()
+        return self._metrics[name]
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """按请求的 trace_request_ctx["provider"] 统计连接新建 / 复用"""
+        trace_config = aiohttp.TraceConfig()
+
+        def provider_of(context) -> str:
+            request_ctx = context.trace_request_ctx or {}
+            return request_ctx.get("provider", "default")
+
+        async def on_connection_create_end(session, context, params):
+            self._get_metrics(provider_of(context)).connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self._get_metrics(provider_of(context)).connections_reused += 1
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+
+# 全局 HTTP 会话管理器
+http_session_manager = HttpSessionManager(
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    max_connections_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+    dns_cache_ttl=settings.HTTP_DNS_CACHE_TTL,
+    keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+)
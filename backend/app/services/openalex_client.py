@@ -0,0 +1,153 @@
+"""
+OpenAlex API 异步客户端
+
+所有 OpenAlex 请求共享同一个 keep-alive 连接池，并遵循礼貌池（polite pool）规则：
+- 请求携带 mailto 参数和包含邮箱的 User-Agent
+- 限制并发请求数，且全局请求速率不超过每秒 10 次
+- 遇到 429 / 5xx / 网络错误时按指数退避重试（优先使用 Retry-After）
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+import httpx
+from app.utils.log_util import logger
+
+
+class OpenAlexClient:
+    """共享连接池的 OpenAlex 客户端"""
+
+    BASE_URL = "https://api.openalex.org"
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        max_concurrency: int = 5,  # 同时进行的请求数
+        min_interval: float = 0.1,  # 相邻请求的最小间隔（礼貌池上限为 10 次/秒）
+        max_retries: int = 3,  # 最大重试次数
+        backoff_base: float = 0.5,  # 指数退避的基础延迟（秒）
+        max_backoff: float = 8.0,  # 单次退避的最大延迟（秒）
+        timeout: float = 10.0,  # 单次请求超时（秒）
+        transport: Optional[httpx.AsyncBaseTransport] = None,  # 测试时注入
+    ):
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._transport = transport
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        email: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        发送 GET 请求并返回 JSON 结果
+
+        Args:
+            path: API 路径（如 "works"）
+            params: 查询参数
+            email: 礼貌池邮箱
+
+        Returns:
+            Dict[str, Any]: 响应 JSON
+
+        Raises:
+            httpx.HTTPStatusError: 重试后仍返回错误状态码
+            httpx.TransportError: 重试后仍无法连接
+        """
+        params = dict(params or {})
+        if email:
+            params["mailto"] = email
+        headers = {
+            "User-Agent": f"OpenAlexScholar/1.0 (mailto:{email})"
+            if email
+            else "OpenAlexScholar/1.0"
+        }
+
+        client = self._get_client()
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                await self._throttle()
+                try:
+                    response = await client.get(
+                        path.lstrip("/"), params=params, headers=headers
+                    )
+                except httpx.TransportError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+                    logger.warning(
+                        f"OpenAlex request failed: {e}, retrying in {delay:.2f}s "
+                        f"({attempt + 1}/{self.max_retries})"
+                    )
+                else:
+                    if (
+                        response.status_code not in self.RETRY_STATUS_CODES
+                        or attempt >= self.max_retries
+                    ):
+                        response.raise_for_status()
+                        return response.json()
+                    delay = self._retry_after(response) or self._backoff(attempt)
+                    logger.warning(
+                        f"OpenAlex returned {response.status_code}, retrying in "
+                        f"{delay:.2f}s ({attempt + 1}/{self.max_retries})"
+                    )
+
+            # 退避期间释放并发名额
+            await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable")
+
+    async def close(self):
+        """关闭连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def _throttle(self):
+        """保证相邻请求之间至少间隔 min_interval 秒"""
+        async with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now += wait
+            self._next_slot = now + self.min_interval
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.max_backoff, self.backoff_base * (2**attempt))
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return min(self.max_backoff, max(0.0, float(value)))
+        except ValueError:
+            return None
+
+
+# 全局 OpenAlex 客户端
+openalex_client = OpenAlexClient()
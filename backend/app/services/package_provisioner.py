@@ -0,0 +1,322 @@
+"""
+包安装服务
+
+CoderAgent 的 pip_install 不再在内核中执行 !pip install，而是由本服务在内核进程之外安装到
+内核所用的 Python 环境：
+- 已安装包索引：需求已满足时立即返回，不启动 pip
+- 共享 wheel 目录（PACKAGE_CACHE_DIR/wheels）：先尝试只从本地 wheel 安装（无需联网），
+  否则联网下载为 wheel 存入该目录后再安装，之后任何任务、任何共享该目录的执行器都可离线安装
+- 同一时间一个环境只运行一个安装任务，相同请求合并为同一个任务
+- 基础环境（numpy、pandas、scikit-learn 等）随镜像预装；离线部署前可预先下载额外的包：
+
+    python -m app.services.package_provisioner warm pulp networkx
+    python -m app.services.package_provisioner warm -r requirements-extra.txt
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+from app.config.setting import settings
+from app.utils.log_util import logger
+
+# 列出环境中已安装的分发包 {规范化名称: 版本}
+_LIST_DISTRIBUTIONS = (
+    "import json, importlib.metadata as m\n"
+    "print(json.dumps({d.metadata['Name']: d.version for d in m.distributions() if d.metadata['Name']}))"
+)
+
+
+@dataclass
+class InstallResult:
+    """一次安装请求的结果"""
+
+    installed: list[str] = field(default_factory=list)
+    already_satisfied: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    log: str = ""  # 失败时 pip 输出的末尾部分
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def summary(self) -> str:
+        parts = []
+        if self.installed:
+            parts.append(f"Successfully installed: {' '.join(self.installed)}")
+        if self.already_satisfied:
+            parts.append(f"Already installed: {' '.join(self.already_satisfied)}")
+        if self.failed:
+            parts.append(f"Installation failed: {' '.join(self.failed)}")
+            if self.log:
+                parts.append(self.log)
+        return "\n".join(parts) or "Nothing to install"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InstallResult":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+class PackageProvisioner:
+    """在指定 Python 环境中安装包，带已安装索引与共享 wheel 目录"""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        python: Optional[str] = None,
+        index_url: Optional[str] = None,
+        offline: bool = False,
+        timeout: float = 600,
+    ):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.wheel_dir = os.path.join(self.cache_dir, "wheels")
+        self.python = python or sys.executable
+        self.index_url = index_url
+        self.offline = offline
+        self.timeout = timeout
+        self._installed: Optional[Dict[str, str]] = None
+        self._lock = asyncio.Lock()
+        self._jobs: Dict[tuple, asyncio.Task] = {}
+        self._use_uv: Optional[bool] = None
+
+    async def install(self, packages: list[str]) -> InstallResult:
+        """
+        安装包，已满足的需求直接返回
+
+        Args:
+            packages: 需求说明，如 ["pulp", "networkx>=3"]；不接受 pip 选项
+
+        Returns:
+            InstallResult
+        """
+        result = InstallResult()
+        requirements = []
+        for package in packages:
+            if package.startswith("-"):
+                result.failed.append(package)
+                result.log = "pip options are not allowed, pass package names only"
+                continue
+            try:
+                requirements.append(Requirement(package))
+            except InvalidRequirement as e:
+                result.failed.append(package)
+                result.log = str(e)
+
+        missing = []
+        installed = await self.installed_packages()
+        for requirement in requirements:
+            if self._satisfied(requirement, installed):
+                result.already_satisfied.append(str(requirement))
+            else:
+                missing.append(requirement)
+        if not missing:
+            return result
+
+        # 相同请求合并为同一个安装任务
+        key = tuple(sorted(str(requirement) for requirement in missing))
+        job = self._jobs.get(key)
+        if job is None:
+            job = asyncio.create_task(self._install(missing))
+            self._jobs[key] = job
+            job.add_done_callback(lambda _: self._jobs.pop(key, None))
+        job_result = await asyncio.shield(job)
+        result.installed += job_result.installed
+        result.already_satisfied += job_result.already_satisfied
+        result.failed += job_result.failed
+        result.log = job_result.log or result.log
+        return result
+
+    async def installed_packages(self, refresh: bool = False) -> Dict[str, str]:
+        """环境中已安装的包 {规范化名称: 版本}，缓存到下次安装"""
+        if self._installed is None or refresh:
+            code, output = await self._exec([self.python, "-c", _LIST_DISTRIBUTIONS])
+            try:
+                packages = (
+                    json.loads(output.strip().splitlines()[-1]) if code == 0 else {}
+                )
+            except (ValueError, IndexError):
+                packages = {}
+            if not packages:
+                logger.warning(f"读取 {self.python} 已安装的包失败: {output[-500:]}")
+            self._installed = {canonicalize_name(k): v for k, v in packages.items()}
+        return self._installed
+
+    async def warm(self, packages: list[str]) -> bool:
+        """将包及其依赖下载为 wheel 存入共享目录，供离线安装（使用 uv 时安装并保存在 uv 缓存中）"""
+        code, output = await self._download(packages)
+        if code != 0:
+            logger.error(f"预下载失败: {output[-2000:]}")
+        return code == 0
+
+    async def _install(self, requirements: list[Requirement]) -> InstallResult:
+        async with self._lock:
+            # 等待锁期间其他任务可能已安装了这些包
+            installed = await self.installed_packages()
+            pending = [r for r in requirements if not self._satisfied(r, installed)]
+            result = InstallResult(
+                already_satisfied=[str(r) for r in requirements if r not in pending]
+            )
+            if not pending:
+                return result
+            specs = [str(requirement) for requirement in pending]
+            logger.info(f"安装包: {specs}")
+            await self._uv()
+
+            # 先只从本地 wheel 目录安装，失败再联网下载到 wheel 目录
+            code, output = await self._exec(self._install_command(specs))
+            if code != 0 and not self.offline:
+                code, output = await self._download(specs)
+                if code == 0:
+                    code, output = await self._exec(self._install_command(specs))
+
+            installed = await self.installed_packages(refresh=True)
+            for requirement in pending:
+                if code == 0 and self._satisfied(requirement, installed):
+                    result.installed.append(str(requirement))
+                else:
+                    result.failed.append(str(requirement))
+            if result.failed:
+                result.log = output[-2000:]
+                logger.error(f"安装失败 {result.failed}: {result.log}")
+            return result
+
+    @staticmethod
+    def _satisfied(requirement: Requirement, installed: Dict[str, str]) -> bool:
+        if requirement.marker is not None and not requirement.marker.evaluate():
+            return True
+        version = installed.get(canonicalize_name(requirement.name))
+        if version is None or requirement.extras:
+            return False
+        return requirement.specifier.contains(version, prereleases=True)
+
+    async def _uv(self) -> bool:
+        """环境中没有 pip 时（如 uv 创建的虚拟环境）改用 uv pip"""
+        if self._use_uv is None:
+            code, _ = await self._exec([self.python, "-m", "pip", "--version"])
+            self._use_uv = code != 0 and shutil.which("uv") is not None
+        return self._use_uv
+
+    def _install_command(self, specs: list[str]) -> list[str]:
+        """只从本地 wheel 目录安装的命令"""
+        if self._use_uv:
+            return [
+                "uv",
+                "pip",
+                "install",
+                "--python",
+                self.python,
+                "--cache-dir",
+                os.path.join(self.cache_dir, "uv"),
+                "--find-links",
+                self.wheel_dir,
+                "--offline",
+                *specs,
+            ]
+        return [
+            self.python,
+            "-m",
+            "pip",
+            "install",
+            "--disable-pip-version-check",
+            "--no-index",
+            "--find-links",
+            self.wheel_dir,
+            *specs,
+        ]
+
+    async def _download(self, specs: list[str]) -> tuple[int, str]:
+        """联网下载需求及其依赖的 wheel 到共享目录（已有的 wheel 直接复用）"""
+        os.makedirs(self.wheel_dir, exist_ok=True)
+        index = ["--index-url", self.index_url] if self.index_url else []
+        if await self._uv():
+            # uv 没有 pip wheel，联网安装后下载的包保存在共享的 uv 缓存中
+            command = [
+                "uv",
+                "pip",
+                "install",
+                "--python",
+                self.python,
+                "--cache-dir",
+                os.path.join(self.cache_dir, "uv"),
+                "--find-links",
+                self.wheel_dir,
+                *index,
+                *specs,
+            ]
+        else:
+            command = [
+                self.python,
+                "-m",
+                "pip",
+                "wheel",
+                "--disable-pip-version-check",
+                "--cache-dir",
+                os.path.join(self.cache_dir, "pip"),
+                "--wheel-dir",
+                self.wheel_dir,
+                "--find-links",
+                self.wheel_dir,
+                *index,
+                *specs,
+            ]
+        return await self._exec(command)
+
+    async def _exec(self, command: list[str]) -> tuple[int, str]:
+        """在子进程中运行命令，返回 (退出码, 合并的输出)"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+        except OSError as e:
+            return 1, str(e)
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return 1, f"Timed out after {self.timeout} s: {' '.join(command)}"
+        return process.returncode, stdout.decode(errors="replace")
+
+
+# 全局包安装服务（内核使用当前 Python 环境，可通过 PACKAGE_PYTHON 指定）
+package_provisioner = PackageProvisioner(
+    cache_dir=settings.PACKAGE_CACHE_DIR,
+    python=settings.PACKAGE_PYTHON,
+    index_url=settings.PACKAGE_INDEX_URL,
+    offline=settings.PACKAGE_OFFLINE,
+    timeout=settings.PACKAGE_INSTALL_TIMEOUT,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预下载包到共享 wheel 目录")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    warm = subparsers.add_parser("warm", help="下载包及其依赖的 wheel")
+    warm.add_argument("packages", nargs="*")
+    warm.add_argument("-r", "--requirement", help="requirements 文件")
+    args = parser.parse_args()
+
+    packages = list(args.packages)
+    if args.requirement:
+        with open(args.requirement) as f:
+            packages += [
+                line.strip()
+                for line in f
+                if line.strip() and not line.lstrip().startswith("#")
+            ]
+    sys.exit(0 if asyncio.run(package_provisioner.warm(packages)) else 1)
+
+
+if __name__ == "__main__":
+    main()
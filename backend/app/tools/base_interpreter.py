@@ -1,27 +1,85 @@
 # base_interpreter.py
 import abc
+import asyncio
+import base64
+import json
+import os
 import re
+from dataclasses import dataclass, replace
+from typing import Optional
+from app.config.setting import settings
+from app.tools.code_preflight import (
+    PreflightIssue,
+    check_names,
+    check_syntax,
+    find_spec_code,
+    format_issues,
+    imported_modules,
+    is_stdlib,
+)
+from app.tools.execution_cache import ExecutionCache
+from app.tools.kernel_checkpoint import CHECKPOINT_DIR, checkpoint_code, restore_code
+from app.tools.kernel_limits import LimitViolation, ResourceLimits, detect_violation
+from app.tools.kernel_namespaces import DEFAULT_NAMESPACE, namespace_code
 from app.tools.notebook_serializer import NotebookSerializer
+from app.services.package_provisioner import InstallResult, package_provisioner
 from app.services.redis_manager import redis_manager
 from app.utils.log_util import logger
 from app.schemas.response import (
     OutputItem,
     InterpreterMessage,
+    ResultModel,
+    StdErrModel,
+    SystemMessage,
+    StepMessage,
 )
 
 
+@dataclass
+class CreatedImage:
+    """内核上报的新写入图片"""
+
+    path: str  # 相对工作目录的路径
+    section: Optional[str]
+    cell: int  # 第几次 execute_code 调用
+
+
 class BaseCodeInterpreter(abc.ABC):
     def __init__(
         self,
         task_id: str,
         work_dir: str,
         notebook_serializer: NotebookSerializer,
+        limits: Optional[ResourceLimits] = None,
     ):
         self.task_id = task_id
         self.work_dir = work_dir
         self.notebook_serializer = notebook_serializer
         self.section_output: dict[str, dict[str, list[str]]] = {}
-        self.last_created_images = set()
+        self.current_section: Optional[str] = None
+        self.execution_count = 0
+        # section -> 该 section 中内核上报的图片（按写入顺序）
+        self.created_images: dict[str, list[CreatedImage]] = {}
+        self._reported_images: dict[str, int] = {}
+        self.base_limits = limits or ResourceLimits.from_settings()
+        self.limits = self.base_limits
+        self.last_violation: Optional[LimitViolation] = None
+        # 内核命名空间中的名字（每次执行后由内核上报），未知时为 None
+        self.kernel_names: Optional[set[str]] = None
+        # 已确认内核中可以导入的包
+        self.available_modules: set[str] = set()
+        self.preflight_failures = 0
+        self.execution_cache: Optional[ExecutionCache] = (
+            ExecutionCache(work_dir, settings.KERNEL_EXECUTION_CACHE_SIZE)
+            if settings.KERNEL_EXECUTION_CACHE_ENABLED
+            else None
+        )
+        # 内核中的执行命名空间与检查点目录（NamespaceInterpreter 覆盖）
+        self.namespace = DEFAULT_NAMESPACE
+        self.checkpoint_dir = CHECKPOINT_DIR
+        # 同一内核上的执行串行进行；active_namespace 为内核当前所处的命名空间
+        self.kernel_lock = asyncio.Lock()
+        self.active_namespace = DEFAULT_NAMESPACE
 
     @abc.abstractmethod
     async def initialize(self):
@@ -34,19 +92,276 @@ class BaseCodeInterpreter(abc.ABC):
         ...
 
     @abc.abstractmethod
-    async def execute_code(self, code: str) -> tuple[str, bool, str]:
-        """执行一段代码，返回 (输出文本, 是否出错, 错误信息)"""
+    async def _run_code(self, code: str) -> list[tuple[str, str]]:
+        """在内核中运行代码，返回 [(输出标记, 内容)]"""
         ...
 
+    async def execute_code(self, code: str) -> tuple[str, bool, str]:
+        logger.info(f"执行代码: {code}")
+        self.execution_count += 1
+        #  添加代码到notebook
+        self.notebook_serializer.add_code_cell_to_notebook(code)
+
+        text_to_gpt: list[str] = []
+        content_to_display: list[OutputItem] | None = []
+        error_occurred: bool = False
+        error_message: str = ""
+
+        # 发送步骤消息：开始执行代码
+        await redis_manager.publish_message(
+            self.task_id,
+            StepMessage(
+                step_name="开始执行代码",
+                step_type="tool",
+                status="processing",
+                content="开始执行代码",
+                details={"tool": "execute_code"},
+            ),
+        )
+        await redis_manager.publish_message(
+            self.task_id,
+            SystemMessage(content="开始执行代码"),
+        )
+        # 执行 Python 代码
+        logger.info("开始执行代码...")
+        preflight_error = await self._preflight(code)
+        if preflight_error is not None:
+            # 静态检查未通过，不执行代码
+            execution = [("error", preflight_error)]
+        else:
+            execution = await self._run_cached(code)
+        logger.info("代码执行完成")
+
+        # 发送步骤消息：代码执行完成
+        await redis_manager.publish_message(
+            self.task_id,
+            StepMessage(
+                step_name="代码执行完成",
+                step_type="tool",
+                status="completed",
+                content="代码执行完成",
+                details={"tool": "execute_code"},
+            ),
+        )
+        await redis_manager.publish_message(
+            self.task_id,
+            SystemMessage(content="代码执行完成"),
+        )
+
+        for mark, out_str in execution:
+            if mark == "created_file":
+                # 内核上报的新图片，归属当前 section 和本次执行
+                section = self.current_section or ""
+                self.created_images.setdefault(section, []).append(
+                    CreatedImage(out_str, self.current_section, self.execution_count)
+                )
+
+            elif mark in ("stdout", "execute_result_text", "display_text"):
+                text_to_gpt.append(self._truncate_text(f"[{mark}]\n{out_str}"))
+                #  添加text到notebook
+                content_to_display.append(
+                    ResultModel(type="result", format="text", msg=out_str)
+                )
+                self.notebook_serializer.add_code_cell_output_to_notebook(out_str)
+
+            elif mark in (
+                "execute_result_png",
+                "execute_result_jpeg",
+                "display_png",
+                "display_jpeg",
+            ):
+                # 图片已由输出收集器写入工作目录，这里只按需读取一次
+                text_to_gpt.append(f"[{mark} 图片已生成，已保存为 {out_str}]")
+                image = self._read_image(out_str)
+                if image is None:
+                    continue
+                mime_type, image_format = (
+                    ("image/png", "png") if "png" in mark else ("image/jpeg", "jpeg")
+                )
+
+                #  添加image到notebook
+                self.notebook_serializer.add_image_to_notebook(image, mime_type)
+                content_to_display.append(
+                    ResultModel(type="result", format=image_format, msg=image)
+                )
+
+            elif mark == "error":
+                error_occurred = True
+                error_message = self.delete_color_control_char(out_str)
+                error_message = self._truncate_text(error_message)
+                logger.error(f"执行错误: {error_message}")
+                text_to_gpt.append(error_message)
+                #  添加error到notebook
+                self.notebook_serializer.add_code_cell_error_to_notebook(out_str)
+                content_to_display.append(StdErrModel(msg=out_str))
+
+        # 资源限制触发时以结构化错误返回
+        self.last_violation = detect_violation(execution, self.limits)
+        if self.last_violation is not None:
+            # 内核可能已重启或执行被中断，缓存的内核状态不再可信
+            self.reset_kernel_state()
+            error_occurred = True
+            error_message = self.last_violation.to_error_message()
+            logger.error(f"触发资源限制: {error_message}")
+            text_to_gpt.append(error_message)
+
+        logger.info(f"text_to_gpt: {text_to_gpt}")
+        combined_text = "\n".join(text_to_gpt)
+
+        await self._push_to_websocket(content_to_display)
+
+        return (
+            combined_text,
+            error_occurred,
+            error_message,
+        )
+
+    async def _run(self, code: str) -> list[tuple[str, str]]:
+        """在本解释器的命名空间中运行代码，并记录内核上报的命名空间"""
+        async with self._kernel_owner().kernel_lock:
+            await self._enter_namespace()
+            raw = await self._run_code(code)
+        outputs = []
+        for mark, text in raw:
+            if mark == "namespace":
+                self.kernel_names = set(json.loads(text))
+            else:
+                outputs.append((mark, text))
+        return outputs
+
+    def _kernel_owner(self) -> "BaseCodeInterpreter":
+        """持有内核的解释器"""
+        return self
+
+    async def _enter_namespace(self):
+        """子命名空间执行过代码后，切回默认命名空间"""
+        if self.active_namespace != DEFAULT_NAMESPACE:
+            await self._run_code(namespace_code(DEFAULT_NAMESPACE))
+            self.active_namespace = DEFAULT_NAMESPACE
+
+    async def _run_cached(self, code: str) -> list[tuple[str, str]]:
+        """运行代码，启用执行缓存时跳过已执行过且未失效的代码（整个单元或前缀）"""
+        if self.execution_cache is None:
+            return await self._run(code)
+        hit = self.execution_cache.lookup(code)
+        if hit is None:
+            outputs = await self._run(code)
+        else:
+            cached, remainder = hit
+            outputs = cached + (await self._run(remainder) if remainder else [])
+        self.execution_cache.record(code, outputs)
+        return outputs
+
+    async def _preflight(self, code: str) -> Optional[str]:
+        """
+        执行前的静态检查，发现问题时返回结构化错误
+
+        检查语法、内核命名空间中不存在的名字（命名空间未知时跳过）和未安装的包
+        """
+        if not settings.KERNEL_PREFLIGHT_ENABLED:
+            return None
+        tree, issues = check_syntax(code)
+        if tree is not None:
+            if self.kernel_names is not None:
+                issues += check_names(tree, self.kernel_names)
+            issues += await self._check_modules(imported_modules(tree))
+        if not issues:
+            return None
+        self.preflight_failures += 1
+        logger.warning(f"静态检查未通过（第 {self.preflight_failures} 次）: {issues}")
+        return format_issues(issues)
+
+    async def _check_modules(self, modules: dict[str, int]) -> list[PreflightIssue]:
+        """在内核中确认导入的包可用，只查询尚未确认过的第三方包"""
+        unknown = [
+            module
+            for module in modules
+            if module not in self.available_modules and not is_stdlib(module)
+        ]
+        if not unknown:
+            return []
+        found: dict[str, bool] = {}
+        for mark, text in await self._run(find_spec_code(unknown)):
+            if mark == "stdout":
+                try:
+                    found.update(json.loads(text.strip().splitlines()[-1]))
+                except (ValueError, IndexError):
+                    logger.warning(f"解析包检查结果失败: {text}")
+        # 查询失败的包按可用处理，交给内核执行时报错
+        self.available_modules.update(m for m in unknown if found.get(m, True))
+        return [
+            PreflightIssue(
+                "missing_module",
+                modules[module],
+                f"ModuleNotFoundError: No module named '{module}'",
+            )
+            for module in unknown
+            if not found.get(module, True)
+        ]
+
+    async def install_packages(self, packages: list[str]) -> InstallResult:
+        """在内核之外安装包，已安装的包立即返回；安装后内核无需重启即可导入"""
+        result = await self._install(packages)
+        if result.installed:
+            await self._run("import importlib\nimportlib.invalidate_caches()")
+        logger.info(f"安装包 {packages}: {result.summary()}")
+        return result
+
+    async def _install(self, packages: list[str]) -> InstallResult:
+        """安装到内核所在主机的环境，远程内核需覆盖"""
+        return await package_provisioner.install(packages)
+
+    def reset_kernel_state(self):
+        """内核重启后调用：清空执行缓存，命名空间变为未知"""
+        self.kernel_names = None
+        if self.execution_cache is not None:
+            self.execution_cache.clear()
+
+    async def checkpoint(self) -> list[tuple[str, str]]:
+        """子任务成功后将内核变量保存为检查点，供内核重启或迁移后恢复"""
+        if not settings.KERNEL_CHECKPOINT_ENABLED:
+            return []
+        outputs = await self._run(
+            checkpoint_code(
+                self.current_section,
+                settings.KERNEL_CHECKPOINT_MAX_VAR_MB,
+                self.checkpoint_dir,
+            )
+        )
+        logger.info(f"保存内核检查点: {outputs}")
+        return outputs
+
+    async def restore_checkpoint(self) -> list[tuple[str, str]]:
+        """从工作目录中的检查点恢复内核变量，没有检查点时不做任何事"""
+        if not settings.KERNEL_CHECKPOINT_ENABLED:
+            return []
+        outputs = await self._run(restore_code(self.checkpoint_dir))
+        if outputs:
+            logger.info(f"从检查点恢复内核变量: {outputs}")
+        return outputs
+
     @abc.abstractmethod
     async def cleanup(self):
         """清理资源，比如关闭沙箱或内核"""
         ...
 
-    @abc.abstractmethod
     async def get_created_images(self, section: str) -> list[str]:
-        """获取当前 section 创建的图片列表"""
-        ...
+        """获取当前 section 上次调用以来新创建的图片（相对工作目录的路径）"""
+        images = self.created_images.get(section, [])
+        start = self._reported_images.get(section, 0)
+        self._reported_images[section] = len(images)
+        new_images = [image.path for image in images[start:]]
+        logger.info(f"新创建的图片列表: {new_images}")
+        return new_images
+
+    def _read_image(self, relative: str) -> Optional[str]:
+        """读取输出收集器保存的图片，返回 base64"""
+        try:
+            with open(os.path.join(self.work_dir, relative), "rb") as f:
+                return base64.b64encode(f.read()).decode()
+        except OSError as e:
+            logger.warning(f"读取图片输出 {relative} 失败: {e}")
+            return None
 
     async def _push_to_websocket(self, content_to_display: list[OutputItem] | None):
         logger.info("执行结果已推送到WebSocket")
@@ -60,6 +375,15 @@ class BaseCodeInterpreter(abc.ABC):
             agent_msg,
         )
 
+    def begin_subtask(self, subtask: str) -> None:
+        """开始子任务：之后的执行归属该 section，并按子任务配置调整墙钟时间"""
+        self.add_section(subtask)
+        self.current_section = subtask
+        wall_time = settings.KERNEL_SUBTASK_WALL_TIME.get(
+            subtask, self.base_limits.wall_time
+        )
+        self.limits = replace(self.base_limits, wall_time=wall_time)
+
     def add_section(self, section_name: str) -> None:
         """确保添加的section结构正确"""
 
@@ -0,0 +1,161 @@
+# code_preflight.py
+# 执行前的静态检查：语法错误、未定义的名字、未安装的包。
+# 这些错误不必等内核执行一遍才发现，直接以结构化错误返回给 CoderAgent。
+import ast
+import builtins
+import json
+import sys
+from dataclasses import asdict, dataclass
+from typing import Optional
+from IPython.core.inputtransformer2 import TransformerManager
+from app.tools.execution_cache import scope_nodes
+
+# 内核中由 IPython 注入、不在 builtins 里的名字
+IPYTHON_NAMES = {"get_ipython", "display", "In", "Out", "exit", "quit"}
+
+# 会动态创建变量的调用，出现时不检查未定义的名字
+DYNAMIC_NAME_CALLS = {"exec", "eval", "globals", "locals", "vars", "__import__"}
+
+
+@dataclass
+class PreflightIssue:
+    """一个静态检查问题"""
+
+    kind: str  # syntax / undefined_name / missing_module
+    line: Optional[int]
+    detail: str
+
+
+HINTS = {
+    "syntax": "Fix the syntax error and resubmit the whole cell.",
+    "undefined_name": "Define or import these names in this cell; variables from earlier cells exist only if that cell ran successfully.",
+    "missing_module": "The package is not installed in the kernel: install it with the pip_install tool or use an available library.",
+}
+
+
+def format_issues(issues: list[PreflightIssue]) -> str:
+    """结构化错误信息，与资源限制错误的格式一致"""
+    payload = json.dumps([asdict(issue) for issue in issues], ensure_ascii=False)
+    hints = " ".join(dict.fromkeys(HINTS[issue.kind] for issue in issues))
+    return f"PreflightError (code was not executed): {payload}\nHint: {hints}"
+
+
+def to_python(code: str) -> str:
+    """将 IPython 语法（!pip、%magic）转换为 Python 代码"""
+    return TransformerManager().transform_cell(code)
+
+
+def check_syntax(code: str) -> tuple[Optional[ast.Module], list[PreflightIssue]]:
+    try:
+        return ast.parse(to_python(code)), []
+    except SyntaxError as e:
+        text = (e.text or "").rstrip()
+        detail = f"{type(e).__name__}: {e.msg}" + (f"\n    {text}" if text else "")
+        return None, [PreflightIssue("syntax", e.lineno, detail)]
+
+
+def check_names(tree: ast.Module, namespace: set[str]) -> list[PreflightIssue]:
+    """
+    检查顶层作用域中使用但既未在单元中绑定、也不在内核命名空间中的名字
+
+    只检查顶层作用域（函数体中的名字可能在调用前才定义）；单元中出现
+    from x import *、exec / globals 等动态创建变量的写法或 IPython 魔法命令时不检查。
+    以 _ 开头的名字（IPython 的 _、_1 等输出历史，以及内核不上报的私有变量）不检查。
+    """
+    bound = set(IPYTHON_NAMES) | set(dir(builtins)) | namespace
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and any(
+            alias.name == "*" for alias in node.names
+        ):
+            return []
+        if isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else None
+            attr = func.attr if isinstance(func, ast.Attribute) else None
+            if name in DYNAMIC_NAME_CALLS or attr in (
+                "run_line_magic",
+                "run_cell_magic",
+            ):
+                return []
+        bound.update(_bound_names(node))
+
+    missing: dict[str, int] = {}
+    for statement in tree.body:
+        for node in scope_nodes(statement):
+            if (
+                isinstance(node, ast.Name)
+                and isinstance(node.ctx, ast.Load)
+                and node.id not in bound
+                and not node.id.startswith("_")
+            ):
+                missing.setdefault(node.id, node.lineno)
+    return [
+        PreflightIssue(
+            "undefined_name", line, f"NameError: name '{name}' is not defined"
+        )
+        for name, line in sorted(missing.items(), key=lambda item: item[1])
+    ]
+
+
+def imported_modules(tree: ast.Module) -> dict[str, int]:
+    """
+    单元导入的顶层包 {包名: 行号}
+
+    try 块中的导入（通常带有 ImportError 回退）和相对导入不检查。
+    """
+    guarded = {
+        id(node)
+        for try_node in ast.walk(tree)
+        if isinstance(try_node, (ast.Try, ast.TryStar))
+        for statement in try_node.body
+        for node in ast.walk(statement)
+    }
+    modules: dict[str, int] = {}
+    for node in ast.walk(tree):
+        if id(node) in guarded:
+            continue
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            modules.setdefault(name.split(".")[0], node.lineno)
+    return modules
+
+
+def is_stdlib(module: str) -> bool:
+    return module in sys.stdlib_module_names or module in sys.builtin_module_names
+
+
+def find_spec_code(modules: list[str]) -> str:
+    """在内核中检查包是否可导入的代码，输出 {包名: 是否可用} 的 JSON"""
+    return (
+        "def __mma_find_specs(names):\n"
+        "    import importlib.util, json\n"
+        "    print(json.dumps({name: importlib.util.find_spec(name) is not None for name in names}))\n"
+        f"__mma_find_specs({modules!r})\n"
+        "del __mma_find_specs\n"
+    )
+
+
+def _bound_names(node: ast.AST) -> list[str]:
+    """节点在任意作用域中绑定的名字"""
+    if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+        return [node.id]
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return [(alias.asname or alias.name).split(".")[0] for alias in node.names]
+    if isinstance(node, ast.arg):
+        return [node.arg]
+    if isinstance(node, (ast.Global, ast.Nonlocal)):
+        return list(node.names)
+    if isinstance(node, ast.ExceptHandler) and node.name:
+        return [node.name]
+    if isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+        return [node.name]
+    if isinstance(node, ast.MatchMapping) and node.rest:
+        return [node.rest]
+    return []
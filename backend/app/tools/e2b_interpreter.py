@@ -61,6 +61,9 @@ class E2BCodeInterpreter(BaseCodeInterpreter):
     async def execute_code(self, code: str) -> tuple[str, bool, str]:  # type: ignore[override]
         raise RuntimeError("E2B 远程解释器未实现，无法执行代码。")
 
+    async def _run_code(self, code: str) -> list[tuple[str, str]]:  # type: ignore[override]
+        raise RuntimeError("E2B 远程解释器未实现，无法执行代码。")
+
     async def cleanup(self) -> None:  # type: ignore[override]
         # 占位实现：无实际资源需要清理
         logger.info("E2BCodeInterpreter.cleanup 调用（占位实现）。")
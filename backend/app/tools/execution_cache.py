@@ -0,0 +1,279 @@
+# execution_cache.py
+# 代码单元执行结果缓存（可选）：CoderAgent 重试时常常重复提交相同的代码，
+# 或以相同的导入 / 数据加载代码开头。命中时直接返回缓存输出，只执行新增的部分。
+import ast
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from app.utils.log_util import logger
+
+# 参与指纹计算的输入数据文件
+DATA_EXTENSIONS = (
+    ".csv",
+    ".xlsx",
+    ".xls",
+    ".json",
+    ".txt",
+    ".parquet",
+    ".feather",
+    ".h5",
+    ".mat",
+    ".npy",
+    ".npz",
+)
+
+
+# 原地修改调用者的常见方法（启发式，用于判断单元是否改写了已有对象）
+MUTATING_METHODS = {
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "update",
+    "sort",
+    "setdefault",
+    "add",
+    "discard",
+    "fit",
+    "partial_fit",
+    "set_index",
+    "reset_index",
+}
+
+
+@dataclass
+class CellEffects:
+    """代码单元对内核命名空间的影响"""
+
+    writes: set[str]  # 绑定、重新绑定或原地修改的顶层变量
+    reads: set[str]  # 读取的单元外变量（含函数体内引用的名字）
+    pure: bool  # 只依赖单元自身定义的状态，重复执行结果相同
+
+
+@dataclass
+class CachedCell:
+    """一次成功执行的代码单元"""
+
+    outputs: list[tuple[str, str]]
+    writes: set[str]
+    reads: set[str]
+    fingerprint: str  # 执行完成后的数据文件指纹
+
+
+class ExecutionCache:
+    """
+    按代码哈希缓存成功执行的代码单元
+
+    只缓存确定性的单元：没有错误输出，能解析为 Python 代码，并且不重新绑定或原地修改
+    单元外已有的变量（如 df = df.dropna()、df["c"] = ...、x += 1）。之后执行的单元
+    改写了缓存单元定义或读取的变量时该条目失效（如缓存 print(df.describe()) 后执行
+    df = df.dropna()）；数据文件（mtime / 大小）变化后失效；
+    内核重启、触发资源限制或执行无法解析的代码（魔法命令）时整体清空。
+
+    新单元以某个已缓存单元的完整代码开头（按语句边界）时跳过这段前缀，
+    只执行其余代码：前缀定义的变量仍在内核中。
+    """
+
+    def __init__(self, work_dir: str, max_entries: int = 64):
+        self.work_dir = work_dir
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedCell]" = OrderedDict()
+        self.hits = 0
+
+    def lookup(self, code: str) -> Optional[tuple[list[tuple[str, str]], str]]:
+        """
+        查找可复用的缓存
+
+        Returns:
+            (缓存输出, 仍需执行的代码)，整个单元命中时剩余代码为空；未命中返回 None
+        """
+        if not self._entries:
+            return None
+        fingerprint = self.fingerprint()
+        lines = code.splitlines()
+        for end, remainder_start in reversed(_split_points(code)):
+            key = _hash("\n".join(lines[:end]))
+            entry = self._entries.get(key)
+            if entry is None or entry.fingerprint != fingerprint:
+                continue
+            self._entries.move_to_end(key)
+            self.hits += 1
+            remainder = "\n".join(lines[remainder_start:]).strip()
+            logger.info(f"代码缓存命中（前 {end} 行），剩余代码 {len(remainder)} 字符")
+            # 图片已在首次执行时上报，不重复记录
+            outputs = [item for item in entry.outputs if item[0] != "created_file"]
+            return outputs, remainder
+        return None
+
+    def record(self, code: str, outputs: list[tuple[str, str]]):
+        """每次执行后调用：失效写入或读取了被改写变量的条目，并缓存成功的确定性单元"""
+        effects = analyze_cell(code)
+        if effects is None:
+            self.clear()
+            return
+        stale = [
+            key
+            for key, entry in self._entries.items()
+            if (entry.writes | entry.reads) & effects.writes
+        ]
+        for key in stale:
+            del self._entries[key]
+        if not effects.pure or any(mark == "error" for mark, _ in outputs):
+            return
+        key = _hash(code)
+        self._entries[key] = CachedCell(
+            list(outputs), effects.writes, effects.reads, self.fingerprint()
+        )
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        if self._entries:
+            logger.info("内核状态已重置，清空代码缓存")
+        self._entries.clear()
+
+    def fingerprint(self) -> str:
+        """工作目录中输入数据文件的指纹（路径、大小、mtime），跳过隐藏目录"""
+        digest = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(self.work_dir):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for filename in sorted(filenames):
+                if not filename.lower().endswith(DATA_EXTENSIONS):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                relative = os.path.relpath(path, self.work_dir)
+                digest.update(
+                    f"{relative}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode()
+                )
+        return digest.hexdigest()
+
+
+def analyze_cell(code: str) -> Optional[CellEffects]:
+    """分析代码单元写入和读取的顶层变量，以及是否只依赖自身定义的状态；无法解析时返回 None"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    defined: set[str] = set()
+    writes: set[str] = set()
+    reads: set[str] = set()
+    pure = True
+    for statement in tree.body:
+        if isinstance(statement, (ast.Global, ast.Nonlocal)):
+            pure = False
+        nodes = list(scope_nodes(statement))
+        # 推导式的循环变量属于推导式自己的作用域
+        local = {
+            node.id
+            for comp in nodes
+            if isinstance(
+                comp, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+            )
+            for generator in comp.generators
+            for node in ast.walk(generator.target)
+            if isinstance(node, ast.Name)
+        }
+        loaded, stored, mutated, augmented = set(), set(), set(), set()
+        for node in nodes:
+            if isinstance(node, ast.Name):
+                (loaded if isinstance(node.ctx, ast.Load) else stored).add(node.id)
+            elif isinstance(node, (ast.Subscript, ast.Attribute)) and isinstance(
+                node.ctx, (ast.Store, ast.Del)
+            ):
+                mutated.add(_root_name(node))
+            elif isinstance(node, ast.AugAssign):
+                augmented.add(_root_name(node.target))
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+                inplace = any(
+                    kw.arg == "inplace"
+                    and isinstance(kw.value, ast.Constant)
+                    and kw.value.value is True
+                    for kw in node.keywords
+                )
+                if inplace or node.func.attr in MUTATING_METHODS:
+                    mutated.add(_root_name(node.func.value))
+        # 函数 / 类 / lambda 体内的引用也算读取（保守估计，调用时才真正读取）
+        reads |= (
+            {
+                node.id
+                for node in ast.walk(statement)
+                if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+            }
+            - local
+            - defined
+        )
+        loaded -= local
+        stored -= local
+        mutated.discard(None)
+        augmented.discard(None)
+        # df = df.dropna() / df["c"] = ... / x += 1：改写了单元外已有的变量
+        if (loaded & stored) - defined or (mutated - stored) - defined:
+            pure = False
+        if augmented - defined:
+            pure = False
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            stored.add(statement.name)
+        elif isinstance(statement, (ast.Import, ast.ImportFrom)):
+            stored.update(
+                (alias.asname or alias.name).split(".")[0] for alias in statement.names
+            )
+        defined |= stored
+        writes |= stored | mutated | augmented
+    return CellEffects(writes, reads, pure)
+
+
+def scope_nodes(statement: ast.AST):
+    """遍历顶层作用域内的节点，不进入函数、类和 lambda 的函数体"""
+    stack = [statement]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+        ):
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+
+
+def _root_name(node: ast.AST) -> Optional[str]:
+    while isinstance(node, (ast.Subscript, ast.Attribute, ast.Call)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _split_points(code: str) -> list[tuple[int, int]]:
+    """
+    按顶层语句划分的前缀位置 [(前缀结束行, 剩余代码起始行)]，均为 0 起始的行切片边界
+
+    同一行上的多条语句（a = 1; b = 2）之间不能切分。
+    """
+    try:
+        body = ast.parse(code).body
+    except SyntaxError:
+        return []
+    points = []
+    for current, following in zip(body, body[1:] + [None]):
+        end = current.end_lineno
+        if following is None:
+            points.append((end, end))
+            continue
+        start = min(
+            [following.lineno]
+            + [d.lineno for d in getattr(following, "decorator_list", [])]
+        )
+        if start > end:
+            points.append((end, start - 1))
+    return points
+
+
+def _hash(code: str) -> str:
+    normalized = "\n".join(line.rstrip() for line in code.strip().splitlines())
+    return hashlib.sha256(normalized.encode()).hexdigest()
@@ -0,0 +1,225 @@
+import os
+import time
+from typing import Any, Optional
+from urllib.parse import quote
+import aiohttp
+from app.config.setting import settings
+from app.services.http_session_manager import http_session_manager
+from app.services.package_provisioner import InstallResult
+from app.tools.base_interpreter import BaseCodeInterpreter
+from app.tools.kernel_data import CACHE_DIR as DATA_CACHE_DIR, data_helpers_code
+from app.tools.kernel_limits import ResourceLimits
+from app.tools.notebook_serializer import NotebookSerializer
+from app.utils.log_util import logger
+
+
+class ExecutorError(Exception):
+    """执行器服务请求失败"""
+
+
+class ExecutorCodeInterpreter(BaseCodeInterpreter):
+    """在独立执行器服务（app.services.executor_service）的内核中执行代码
+
+    API 进程只发起异步 HTTP 请求，CPU 密集的用户代码运行在执行器的内核进程里。
+    配置多个执行器地址时，选择当前内核数最少的一个。
+    """
+
+    def __init__(
+        self,
+        task_id: str,
+        work_dir: str,
+        notebook_serializer: NotebookSerializer,
+        executor_urls: Optional[list[str]] = None,
+        token: Optional[str] = None,
+        shared_fs: Optional[bool] = None,
+        limits: Optional[ResourceLimits] = None,
+    ):
+        super().__init__(task_id, work_dir, notebook_serializer, limits)
+        urls = executor_urls if executor_urls is not None else settings.EXECUTOR_URLS
+        self.executor_urls = [url.rstrip("/") for url in urls if url]
+        self.token = token if token is not None else settings.EXECUTOR_TOKEN
+        self.shared_fs = (
+            shared_fs if shared_fs is not None else settings.EXECUTOR_SHARED_FS
+        )
+        self.base_url: Optional[str] = None
+        self.kernel_id: Optional[str] = None
+        self.remote_work_dir: Optional[str] = None
+
+    async def initialize(self):
+        """选择执行器并创建内核，非共享文件系统时上传工作目录"""
+        if not self.executor_urls:
+            raise ExecutorError("未配置执行器地址 EXECUTOR_URLS")
+
+        os.makedirs(self.work_dir, exist_ok=True)
+        last_error: Optional[Exception] = None
+        for base_url in await self._rank_executors():
+            try:
+                body = {"limits": self.base_limits.to_dict()}
+                if self.shared_fs:
+                    body["work_dir"] = os.path.abspath(self.work_dir)
+                data = await self._request(
+                    "POST", f"{base_url}/kernels", json=body, timeout=120
+                )
+            except ExecutorError as e:
+                logger.warning(f"执行器 {base_url} 创建内核失败: {e}")
+                last_error = e
+                continue
+            self.base_url = base_url
+            self.kernel_id = data["kernel_id"]
+            self.remote_work_dir = data["work_dir"]
+            break
+        else:
+            raise ExecutorError(f"所有执行器均不可用: {last_error}")
+
+        logger.info(f"使用执行器 {self.base_url}，内核 {self.kernel_id}")
+        if not self.shared_fs:
+            await self._upload_work_dir()
+        await self._pre_execute_code()
+        # 迁移到新执行器或沿用已有工作目录时，从检查点恢复变量
+        await self.restore_checkpoint()
+
+    async def _pre_execute_code(self):
+        init_code = (
+            f"import os\n"
+            f"work_dir = r'{self.remote_work_dir}'\n"
+            f"os.makedirs(work_dir, exist_ok=True)\n"
+            f"os.chdir(work_dir)\n"
+            f"print('当前工作目录:', os.getcwd())\n"
+        )
+        if settings.KERNEL_DATA_CACHE_ENABLED:
+            init_code += data_helpers_code(settings.KERNEL_DATA_CACHE_MAX_MB)
+        await self._run_code(init_code)
+
+    async def _run_code(self, code: str) -> list[tuple[str, str]]:
+        try:
+            data = await self._request(
+                "POST",
+                self._kernel_url("execute"),
+                json={
+                    "code": code,
+                    "timeout": self.limits.wall_time,
+                    "max_output_chars": self.limits.max_output_chars,
+                    "max_output_bytes": self.limits.max_output_bytes,
+                },
+                # 执行器负责超时中断，这里多留出中断和回传的时间
+                timeout=self.limits.wall_time + 30,
+            )
+        except ExecutorError as e:
+            logger.error(f"执行器执行代码失败: {e}")
+            return [("error", f"ExecutorError: {e}")]
+
+        if data.get("timed_out"):
+            logger.error(f"代码执行超时（超过 {self.limits.wall_time} 秒），已中断")
+        if not self.shared_fs:
+            await self._download_files(data.get("files", []))
+        return [tuple(item) for item in data["outputs"]]
+
+    async def _install(self, packages: list[str]) -> InstallResult:
+        """由执行器安装到其内核环境"""
+        try:
+            data = await self._request(
+                "POST",
+                f"{self.base_url}/packages",
+                json={"packages": packages},
+                timeout=settings.PACKAGE_INSTALL_TIMEOUT * 2 + 60,
+            )
+        except ExecutorError as e:
+            return InstallResult(failed=list(packages), log=f"ExecutorError: {e}")
+        return InstallResult.from_dict(data)
+
+    async def interrupt(self):
+        """中断正在执行的代码"""
+        await self._request("POST", self._kernel_url("interrupt"), timeout=30)
+
+    async def restart(self):
+        """重启执行器中的内核"""
+        await self._request("POST", self._kernel_url("restart"), timeout=120)
+        self.reset_kernel_state()
+        await self._pre_execute_code()
+        await self.restore_checkpoint()
+
+    async def cleanup(self):
+        if self.kernel_id is None:
+            return
+        try:
+            await self._request("DELETE", self._kernel_url(), timeout=30)
+            logger.info(f"关闭执行器内核 {self.kernel_id}")
+        except ExecutorError as e:
+            logger.warning(f"关闭执行器内核失败: {e}")
+        self.kernel_id = None
+
+    async def _rank_executors(self) -> list[str]:
+        """按当前负载（内核数 / 上限）排序执行器，不可达的排在最后"""
+        loads = {}
+        for base_url in self.executor_urls:
+            try:
+                health = await self._request("GET", f"{base_url}/health", timeout=5)
+                loads[base_url] = health["kernels"] / max(1, health["max_kernels"])
+            except ExecutorError:
+                loads[base_url] = float("inf")
+        return sorted(self.executor_urls, key=lambda url: loads[url])
+
+    async def _upload_work_dir(self):
+        for dirpath, dirnames, filenames in os.walk(self.work_dir):
+            # 数据缓存由执行器内核自行生成
+            dirnames[:] = [d for d in dirnames if d != DATA_CACHE_DIR]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                relative = os.path.relpath(path, self.work_dir)
+                with open(path, "rb") as f:
+                    await self._request(
+                        "PUT", self._file_url(relative), data=f, timeout=300
+                    )
+        logger.info(f"已上传工作目录到执行器内核 {self.kernel_id}")
+
+    async def _download_files(self, files: list[str]):
+        """将执行中新增或修改的文件回传到本地工作目录"""
+        for relative in files:
+            path = os.path.join(self.work_dir, relative)
+            try:
+                content = await self._request(
+                    "GET", self._file_url(relative), timeout=300, raw=True
+                )
+            except ExecutorError as e:
+                logger.warning(f"回传文件 {relative} 失败: {e}")
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(content)
+
+    def _kernel_url(self, action: str = "") -> str:
+        url = f"{self.base_url}/kernels/{self.kernel_id}"
+        return f"{url}/{action}" if action else url
+
+    def _file_url(self, relative: str) -> str:
+        return self._kernel_url(f"files/{quote(relative.replace(os.sep, '/'))}")
+
+    async def _request(
+        self, method: str, url: str, timeout: float, raw: bool = False, **kwargs
+    ) -> Any:
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        session = await http_session_manager.get_session()
+        start_time = time.time()
+        error = False
+        try:
+            async with session.request(
+                method,
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                trace_request_ctx={"provider": "executor"},
+                **kwargs,
+            ) as response:
+                if response.status >= 400:
+                    error = True
+                    raise ExecutorError(
+                        f"HTTP {response.status}: {await response.text()}"
+                    )
+                return await response.read() if raw else await response.json()
+        except (aiohttp.ClientError, TimeoutError) as e:
+            error = True
+            raise ExecutorError(str(e) or type(e).__name__) from e
+        finally:
+            http_session_manager.record_request(
+                "executor", time.time() - start_time, error=error
+            )
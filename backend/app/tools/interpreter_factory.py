@@ -1,6 +1,7 @@
 # interpreter_factory.py
 from typing import Literal
 from app.tools.e2b_interpreter import E2BCodeInterpreter
+from app.tools.executor_interpreter import ExecutorCodeInterpreter
 from app.tools.local_interpreter import LocalCodeInterpreter
 from app.tools.notebook_serializer import NotebookSerializer
 from app.config.setting import settings
@@ -8,21 +9,32 @@ from app.utils.log_util import logger
 
 
 async def create_interpreter(
-    kind: Literal["remote", "local"] = "local",
+    kind: Literal["remote", "local", "executor"] = "local",
     *,
     task_id: str,
     work_dir: str,
     notebook_serializer: NotebookSerializer,
     timeout=3000,
 ):
-    if not settings.E2B_API_KEY:
+    if any(settings.EXECUTOR_URLS):
+        logger.info("使用独立执行器服务")
+        kind = "executor"
+    elif not settings.E2B_API_KEY:
         logger.info("默认使用本地解释器")
         kind = "local"
     else:
         logger.info("使用远程解释器")
         kind = "remote"
 
-    if kind == "remote":
+    if kind == "executor":
+        interp: ExecutorCodeInterpreter = ExecutorCodeInterpreter(
+            task_id=task_id,
+            work_dir=work_dir,
+            notebook_serializer=notebook_serializer,
+        )
+        await interp.initialize()
+        return interp
+    elif kind == "remote":
         interp: E2BCodeInterpreter = await E2BCodeInterpreter.create(
             task_id=task_id,
             work_dir=work_dir,
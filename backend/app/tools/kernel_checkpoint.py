@@ -0,0 +1,139 @@
+# kernel_checkpoint.py
+# 内核变量检查点：子任务成功后把用户变量序列化到工作目录，
+# 内核重启、被杀死或迁移到其他执行器后从检查点恢复，不必重新计算。
+# 本地解释器与独立执行器服务共用。
+from typing import Optional
+
+# 检查点目录（相对工作目录），非共享文件系统时随工作目录一起上传 / 回传
+CHECKPOINT_DIR = ".checkpoints"
+
+
+def checkpoint_code(
+    section: Optional[str],
+    max_var_mb: Optional[int] = None,
+    directory: str = CHECKPOINT_DIR,
+) -> str:
+    """
+    在内核中保存检查点的代码
+
+    保存用户命名空间中所有可序列化的变量：pandas DataFrame 优先写为 parquet
+    （需要 pyarrow），其余使用 cloudpickle（未安装时退回 pickle，跳过在内核中定义的函数和类）。
+    模块只记录别名（如 pd -> pandas），恢复时重新导入。单个变量序列化后超过
+    max_var_mb 时跳过。文件先写临时文件再替换，清单最后写入，中途失败不会破坏上一个检查点。
+    """
+    max_bytes = max_var_mb * 1024 * 1024 if max_var_mb else None
+    return (
+        "def __mma_checkpoint(directory, section, max_bytes):\n"
+        "    import json, os, pickle, types\n"
+        "    from IPython import get_ipython\n"
+        "    try:\n"
+        "        import cloudpickle as pickler\n"
+        "    except ImportError:\n"
+        "        pickler = pickle\n"
+        "    ip = get_ipython()\n"
+        "    hidden = set(ip.user_ns_hidden)\n"
+        "    os.makedirs(directory, exist_ok=True)\n"
+        "    variables, modules, skipped = {}, {}, []\n"
+        "    for name, value in list(ip.user_ns.items()):\n"
+        "        if name.startswith('_') or name in hidden:\n"
+        "            continue\n"
+        "        if isinstance(value, types.ModuleType):\n"
+        "            modules[name] = value.__name__\n"
+        "            continue\n"
+        "        if (\n"
+        "            pickler is pickle\n"
+        "            and isinstance(value, (types.FunctionType, type))\n"
+        "            and value.__module__ == '__main__'\n"
+        "        ):\n"
+        "            skipped.append(name)\n"
+        "            continue\n"
+        "        path = os.path.join(directory, name)\n"
+        "        fmt = None\n"
+        "        if type(value).__module__.startswith('pandas') and hasattr(value, 'to_parquet'):\n"
+        "            try:\n"
+        "                value.to_parquet(path + '.tmp')\n"
+        "                fmt = 'parquet'\n"
+        "            except Exception:\n"
+        "                pass\n"
+        "        if fmt is None:\n"
+        "            try:\n"
+        "                with open(path + '.tmp', 'wb') as f:\n"
+        "                    pickler.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)\n"
+        "                fmt = 'pkl'\n"
+        "            except Exception:\n"
+        "                pass\n"
+        "        if fmt is None or (max_bytes and os.path.getsize(path + '.tmp') > max_bytes):\n"
+        "            if os.path.exists(path + '.tmp'):\n"
+        "                os.remove(path + '.tmp')\n"
+        "            skipped.append(name)\n"
+        "            continue\n"
+        "        filename = f'{name}.{fmt}'\n"
+        "        os.replace(path + '.tmp', os.path.join(directory, filename))\n"
+        "        variables[name] = {'file': filename, 'format': fmt}\n"
+        "    manifest = {'section': section, 'variables': variables, 'modules': modules}\n"
+        "    with open(os.path.join(directory, 'manifest.json.tmp'), 'w') as f:\n"
+        "        json.dump(manifest, f)\n"
+        "    os.replace(\n"
+        "        os.path.join(directory, 'manifest.json.tmp'),\n"
+        "        os.path.join(directory, 'manifest.json'),\n"
+        "    )\n"
+        "    keep = {entry['file'] for entry in variables.values()} | {'manifest.json'}\n"
+        "    for filename in os.listdir(directory):\n"
+        "        if filename not in keep:\n"
+        "            os.remove(os.path.join(directory, filename))\n"
+        '    print(f\'Checkpoint saved: {", ".join(variables) or "(none)"}\')\n'
+        "    if skipped:\n"
+        "        print(f'Not checkpointed: {\", \".join(skipped)}')\n"
+        f"__mma_checkpoint({directory!r}, {section!r}, {max_bytes!r})\n"
+        "del __mma_checkpoint\n"
+    )
+
+
+def restore_code(directory: str = CHECKPOINT_DIR) -> str:
+    """
+    在内核中从检查点恢复变量的代码
+
+    没有检查点时不输出任何内容；单个变量恢复失败不影响其他变量。
+    """
+    return (
+        "def __mma_restore(directory):\n"
+        "    import importlib, json, os, pickle\n"
+        "    from IPython import get_ipython\n"
+        "    path = os.path.join(directory, 'manifest.json')\n"
+        "    if not os.path.exists(path):\n"
+        "        return\n"
+        "    with open(path) as f:\n"
+        "        manifest = json.load(f)\n"
+        "    ns = get_ipython().user_ns\n"
+        "    restored, imported, failed = [], [], []\n"
+        "    for name, module in manifest.get('modules', {}).items():\n"
+        "        try:\n"
+        "            ns[name] = importlib.import_module(module)\n"
+        "        except Exception:\n"
+        "            failed.append(name)\n"
+        "            continue\n"
+        "        imported.append(name)\n"
+        "    for name, entry in manifest.get('variables', {}).items():\n"
+        "        file = os.path.join(directory, entry['file'])\n"
+        "        try:\n"
+        "            if entry['format'] == 'parquet':\n"
+        "                import pandas\n"
+        "                ns[name] = pandas.read_parquet(file)\n"
+        "            else:\n"
+        "                with open(file, 'rb') as f:\n"
+        "                    ns[name] = pickle.load(f)\n"
+        "        except Exception:\n"
+        "            failed.append(name)\n"
+        "            continue\n"
+        "        restored.append(name)\n"
+        "    section = manifest.get('section') or '-'\n"
+        "    print(\n"
+        "        f'Restored from checkpoint (after subtask {section}): '\n"
+        '        f\'{", ".join(restored) or "(none)"}; \'\n'
+        '        f\'modules: {", ".join(imported) or "(none)"}\'\n'
+        "    )\n"
+        "    if failed:\n"
+        "        print(f'Could not restore: {\", \".join(failed)} (recompute these)')\n"
+        f"__mma_restore({directory!r})\n"
+        "del __mma_restore\n"
+    )
@@ -0,0 +1,216 @@
+# kernel_data.py
+# 内核中的数据加载辅助函数。本模块的源码由解释器在初始化时注入内核（模块名 mma_data），
+# 只依赖标准库、pandas 和可选的 pyarrow，不能导入 app 中的任何模块。
+#
+# 上传的 .csv / .xlsx / .xls 文件只解析一次，转换结果保存在工作目录的 .data_cache 中：
+# - 安装了 pyarrow 时保存为 Arrow IPC 文件，load_data 通过内存映射读取，
+#   同一主机上的多个内核共享操作系统页缓存，zero_copy=True 时数据直接留在映射内存中
+# - 否则（或列名不全是字符串、含 Arrow 无法表示的混合类型列时）保存为 pickle，
+#   结果与 pandas 直接读取完全相同，仍然省去 CSV / Excel 解析
+# 源文件的大小或修改时间变化后自动重新转换；内核重启后直接复用。
+import hashlib
+import json
+import os
+
+CACHE_DIR = ".data_cache"
+SOURCE_EXTENSIONS = (".csv", ".xlsx", ".xls")
+CSV_ENCODINGS = ("utf-8-sig", "gb18030")
+
+_state = {"work_dir": os.getcwd(), "max_bytes": None}
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _read_source(path):
+    """用 pandas 读取源文件，返回 {工作表名: DataFrame}，CSV 的工作表名为空字符串"""
+    import pandas as pd
+
+    if path.lower().endswith(".csv"):
+        for encoding in CSV_ENCODINGS:
+            try:
+                return {"": pd.read_csv(path, encoding=encoding)}
+            except UnicodeDecodeError:
+                continue
+        return {"": pd.read_csv(path, encoding_errors="replace")}
+    return pd.read_excel(path, sheet_name=None)
+
+
+def _paths(path):
+    """源文件对应的缓存文件前缀与元数据文件路径"""
+    path = os.path.abspath(path)
+    relative = os.path.relpath(path, _state["work_dir"])
+    digest = hashlib.sha1(relative.encode()).hexdigest()[:10]
+    prefix = os.path.join(
+        _state["work_dir"], CACHE_DIR, f"{os.path.basename(path)}-{digest}"
+    )
+    return path, prefix, prefix + ".json"
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _cached(path):
+    """源文件未变化时返回缓存元数据"""
+    path, _, meta_path = _paths(path)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("stamp") == _stamp(path) else None
+
+
+def convert(path):
+    """
+    将源文件转换为缓存文件，返回元数据
+
+    每个工作表单独选择格式：Arrow 只用于列名全为字符串且可无损转换的表，其余使用 pickle。
+    文件先写入临时文件再替换，多个内核同时转换同一文件也不会读到不完整的缓存。
+    """
+    path, prefix, meta_path = _paths(path)
+    stamp = _stamp(path)
+    frames = _read_source(path)
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+    pa = _arrow()
+    sheets = {}
+    for index, (sheet, frame) in enumerate(frames.items()):
+        table = None
+        if pa and all(isinstance(column, str) for column in frame.columns):
+            try:
+                table = pa.Table.from_pandas(frame)
+            except Exception:
+                table = None
+        target = f"{prefix}.{index}.{'pkl' if table is None else 'arrow'}"
+        temporary = f"{target}.{os.getpid()}.tmp"
+        if table is None:
+            frame.to_pickle(temporary)
+        else:
+            with pa.OSFile(temporary, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        os.replace(temporary, target)
+        sheets[str(sheet)] = os.path.basename(target)
+    meta = {"stamp": stamp, "sheets": sheets}
+    temporary = f"{meta_path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(temporary, meta_path)
+    return meta
+
+
+def prepare_cache(work_dir=".", max_mb=None):
+    """转换工作目录中尚未缓存或已变化的数据文件（跳过隐藏目录和超过 max_mb 的文件）"""
+    _state["work_dir"] = os.path.abspath(work_dir)
+    _state["max_bytes"] = max_mb * 1024 * 1024 if max_mb else None
+    converted, failed = [], []
+    for dirpath, dirnames, filenames in os.walk(_state["work_dir"]):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if not filename.lower().endswith(SOURCE_EXTENSIONS) or _cached(path):
+                continue
+            if _state["max_bytes"] and os.path.getsize(path) > _state["max_bytes"]:
+                continue
+            try:
+                convert(path)
+            except Exception as e:
+                failed.append(f"{filename} ({type(e).__name__}: {e})")
+                continue
+            converted.append(os.path.relpath(path, _state["work_dir"]))
+    if converted:
+        print(f"Cached data files: {', '.join(converted)}")
+    if failed:
+        print(f"Could not cache: {'; '.join(failed)}")
+    return converted
+
+
+def _read_direct(path, sheet_name=0, **read_kwargs):
+    import pandas as pd
+
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path, **read_kwargs)
+    return pd.read_excel(path, sheet_name=sheet_name, **read_kwargs)
+
+
+def load_data(path, sheet_name=0, zero_copy=False, **read_kwargs):
+    """
+    读取上传的 .csv / .xlsx / .xls 文件，结果与 pd.read_csv / pd.read_excel 相同，但只解析一次
+
+    Args:
+        path: 文件路径（相对当前目录）
+        sheet_name: Excel 工作表，序号、名称或 None（返回所有工作表的 dict）
+        zero_copy: 使用 Arrow 缓存时，数据保留在内存映射中（列类型为 pandas ArrowDtype）
+        read_kwargs: 其他 pandas 读取参数（如 usecols、dtype、encoding），指定时直接读取源文件
+    """
+    import pandas as pd
+
+    too_large = _state["max_bytes"] and os.path.getsize(path) > _state["max_bytes"]
+    if read_kwargs or too_large or not path.lower().endswith(SOURCE_EXTENSIONS):
+        return _read_direct(path, sheet_name, **read_kwargs)
+
+    meta = _cached(path)
+    if meta is None:
+        try:
+            meta = convert(path)
+        except Exception:
+            # 无法缓存时直接读取（真正的读取错误由 pandas 抛出）
+            return _read_direct(path, sheet_name)
+
+    sheets = meta["sheets"]
+    if sheet_name is None:
+        names = list(sheets)
+    elif isinstance(sheet_name, int):
+        names = [list(sheets)[sheet_name]]
+    else:
+        names = [str(sheet_name)]
+        if names[0] not in sheets:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    _, prefix, _ = _paths(path)
+    directory = os.path.dirname(prefix)
+    frames = {}
+    for name in names:
+        cache_file = os.path.join(directory, sheets[name])
+        if cache_file.endswith(".arrow"):
+            pa = _arrow()
+            source = pa.memory_map(cache_file, "r")
+            table = pa.ipc.open_file(source).read_all()
+            frames[name] = table.to_pandas(
+                types_mapper=pd.ArrowDtype if zero_copy else None
+            )
+        else:
+            frames[name] = pd.read_pickle(cache_file)
+    return frames if sheet_name is None else frames[names[0]]
+
+
+def data_helpers_code(max_mb=None) -> str:
+    """
+    在内核中注入本模块（mma_data）、提供 load_data 并转换工作目录中数据文件的代码
+
+    load_data 记入 user_ns_hidden，不会被检查点保存。需在切换到工作目录之后执行。
+    """
+    with open(__file__, encoding="utf-8") as f:
+        source = f.read()
+    return (
+        "def __mma_data_helpers(source, max_mb):\n"
+        "    import sys, types\n"
+        "    from IPython import get_ipython\n"
+        "    module = types.ModuleType('mma_data')\n"
+        "    exec(compile(source, 'mma_data', 'exec'), module.__dict__)\n"
+        "    sys.modules['mma_data'] = module\n"
+        "    ip = get_ipython()\n"
+        "    ip.user_ns['load_data'] = module.load_data\n"
+        "    ip.user_ns_hidden['load_data'] = module.load_data\n"
+        "    module.prepare_cache('.', max_mb)\n"
+        f"__mma_data_helpers({source!r}, {max_mb!r})\n"
+        "del __mma_data_helpers\n"
+    )
@@ -0,0 +1,218 @@
+# kernel_limits.py
+# 内核资源限制：内存 / CPU / 文件大小（rlimit）、CPU 配额与内存上限（cgroups v2）、
+# 单次执行的墙钟时间与输出大小。本地解释器与独立执行器服务共用。
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+from app.config.setting import settings
+from app.utils.log_util import logger
+
+
+@dataclass
+class ResourceLimits:
+    """单个内核的资源限制，None 表示不限制"""
+
+    memory_mb: Optional[int] = None  # 内存上限（memory.max，不可用时 RLIMIT_DATA）
+    cpu_seconds: Optional[int] = None  # 内核累计 CPU 时间（RLIMIT_CPU）
+    cpu_cores: Optional[float] = None  # CPU 配额，单位为核（cpu.max）
+    file_size_mb: Optional[int] = None  # 单个文件大小上限（RLIMIT_FSIZE）
+    wall_time: float = 300  # 单次执行的墙钟时间（秒）
+    max_output_chars: Optional[int] = None  # 单次执行保留的文本输出字符数
+    max_output_bytes: Optional[int] = None  # 单次执行的输出总大小（含图片），超出即中断
+
+    @classmethod
+    def from_settings(cls) -> "ResourceLimits":
+        """按配置构建限制"""
+        return cls(
+            memory_mb=settings.KERNEL_MEMORY_LIMIT_MB,
+            cpu_seconds=settings.KERNEL_CPU_TIME_LIMIT,
+            cpu_cores=settings.KERNEL_CPU_CORES,
+            file_size_mb=settings.KERNEL_FILE_SIZE_LIMIT_MB,
+            wall_time=settings.KERNEL_WALL_TIME_LIMIT,
+            max_output_chars=settings.KERNEL_MAX_OUTPUT_CHARS,
+            max_output_bytes=settings.KERNEL_MAX_OUTPUT_BYTES,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ResourceLimits":
+        fields = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in (data or {}).items() if k in fields})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def setup_code(self, memory_in_cgroup: bool = False) -> str:
+        """
+        在内核中执行的 rlimit 设置代码
+
+        硬限制同时下调，用户代码无法再放开。超出 CPU 时间时抛出
+        CPUTimeLimitExceeded，超出文件大小时写入失败（EFBIG），而不是直接杀死内核。
+        内存由 cgroup 的 memory.max 限制时（memory_in_cgroup）不再设置 rlimit；否则使用
+        RLIMIT_DATA（堆与匿名映射），而不是 RLIMIT_AS：后者限制的是虚拟地址空间，
+        多线程 BLAS、xgboost 等预留的大块地址会在实际占用远低于上限时失败。
+        """
+        mb = 1024 * 1024
+        memory = (
+            self.memory_mb * mb if self.memory_mb and not memory_in_cgroup else None
+        )
+        limits = {
+            "RLIMIT_DATA": memory,
+            "RLIMIT_FSIZE": self.file_size_mb * mb if self.file_size_mb else None,
+        }
+        return (
+            "def __mma_apply_limits(limits, cpu_seconds):\n"
+            "    try:\n"
+            "        import resource, signal\n"
+            "    except ImportError:\n"
+            "        return\n"
+            "    def cap(name, soft, hard):\n"
+            "        kind = getattr(resource, name)\n"
+            "        current = resource.getrlimit(kind)[1]\n"
+            "        if current != resource.RLIM_INFINITY:\n"
+            "            soft, hard = min(soft, current), min(hard, current)\n"
+            "        resource.setrlimit(kind, (soft, hard))\n"
+            "    for name, value in limits.items():\n"
+            "        if value:\n"
+            "            cap(name, value, value)\n"
+            "    if limits.get('RLIMIT_FSIZE'):\n"
+            "        signal.signal(signal.SIGXFSZ, signal.SIG_IGN)\n"
+            "    if cpu_seconds:\n"
+            "        class CPUTimeLimitExceeded(RuntimeError):\n"
+            "            pass\n"
+            "        def on_xcpu(signum, frame):\n"
+            "            raise CPUTimeLimitExceeded(\n"
+            "                f'CPU time limit of {cpu_seconds} s exceeded'\n"
+            "            )\n"
+            "        signal.signal(signal.SIGXCPU, on_xcpu)\n"
+            "        cap('RLIMIT_CPU', cpu_seconds, cpu_seconds + 10)\n"
+            f"__mma_apply_limits({limits!r}, {self.cpu_seconds!r})\n"
+            "del __mma_apply_limits\n"
+        )
+
+
+@dataclass
+class LimitViolation:
+    """资源限制触发记录，以结构化错误返回给 CoderAgent"""
+
+    kind: str  # memory / cpu / file_size / wall_time / output / killed
+    limit: Any
+    detail: str
+
+    HINTS = {
+        "memory": "Reduce memory use: load only needed columns, use smaller dtypes, process data in chunks, avoid large cartesian merges.",
+        "cpu": "The kernel's CPU budget is used up: vectorize loops, sample the data, or lower iteration counts.",
+        "file_size": "Write smaller files: save summaries or compressed formats instead of full dumps.",
+        "wall_time": "Execution took too long and was interrupted: optimize the algorithm or work on a subset first.",
+        "output": "The cell produced too much output and was interrupted: print summaries (head(), describe()) instead of full data and avoid plotting in loops.",
+        "killed": "The kernel was killed (usually out of memory) and restarted; variables saved at the last checkpoint were restored, anything computed after it must be recomputed.",
+    }
+
+    def to_error_message(self) -> str:
+        payload = {"kind": self.kind, "limit": self.limit, "detail": self.detail}
+        return (
+            f"ResourceLimitExceeded: {json.dumps(payload, ensure_ascii=False)}\n"
+            f"Hint: {self.HINTS.get(self.kind, '')}"
+        )
+
+
+def detect_violation(
+    outputs: list[tuple[str, str]], limits: ResourceLimits
+) -> Optional[LimitViolation]:
+    """根据执行输出判断是否触发了资源限制"""
+    for mark, text in outputs:
+        if mark != "error":
+            continue
+        if "MemoryError" in text:
+            return LimitViolation("memory", _mb(limits.memory_mb), _last_line(text))
+        if "CPUTimeLimitExceeded" in text:
+            return LimitViolation("cpu", f"{limits.cpu_seconds} s", _last_line(text))
+        if "File too large" in text:
+            return LimitViolation(
+                "file_size", _mb(limits.file_size_mb), _last_line(text)
+            )
+        if text.startswith("WallTimeLimitExceeded"):
+            return LimitViolation("wall_time", f"{limits.wall_time} s", text)
+        if text.startswith("OutputLimitExceeded"):
+            return LimitViolation("output", f"{limits.max_output_bytes} bytes", text)
+        if text.startswith("KernelDied"):
+            return LimitViolation("killed", _mb(limits.memory_mb), text)
+    return None
+
+
+def _mb(value: Optional[int]) -> Optional[str]:
+    return f"{value} MB" if value else None
+
+
+def _last_line(text: str) -> str:
+    lines = [line for line in text.strip().splitlines() if line.strip()]
+    return lines[-1] if lines else text
+
+
+class CgroupLimiter:
+    """cgroups v2 内核隔离
+
+    root 为已委派给当前用户的 cgroup v2 目录（需开启 memory / cpu 控制器）。
+    每个内核一个子 cgroup：memory.max 超限由内核 OOM killer 只杀死该内核，
+    cpu.max 限制可用核数。不可用时静默退回 rlimit。
+    """
+
+    def __init__(self, root: Optional[str]):
+        self.root = root
+
+    def available(self) -> bool:
+        return bool(
+            self.root
+            and os.path.isfile(os.path.join(self.root, "cgroup.controllers"))
+            and os.access(self.root, os.W_OK)
+        )
+
+    def attach(self, name: str, pid: int, limits: ResourceLimits) -> Optional[str]:
+        """为进程创建 cgroup 并写入限制，返回 cgroup 路径"""
+        if not self.available():
+            return None
+        path = os.path.join(self.root, name)
+        try:
+            os.makedirs(path, exist_ok=True)
+            if limits.memory_mb:
+                self._write(path, "memory.max", str(limits.memory_mb * 1024 * 1024))
+                self._write(path, "memory.swap.max", "0")
+            if limits.cpu_cores:
+                period = 100000
+                self._write(
+                    path, "cpu.max", f"{int(limits.cpu_cores * period)} {period}"
+                )
+            self._write(path, "cgroup.procs", str(pid))
+        except OSError as e:
+            logger.warning(f"配置 cgroup {path} 失败，退回 rlimit: {e}")
+            return None
+        return path
+
+    def oom_killed(self, name: str) -> bool:
+        """该 cgroup 是否发生过 OOM kill"""
+        try:
+            with open(os.path.join(self.root, name, "memory.events")) as f:
+                for line in f:
+                    key, _, value = line.partition(" ")
+                    if key == "oom_kill" and int(value) > 0:
+                        return True
+        except (OSError, TypeError, ValueError):
+            pass
+        return False
+
+    def remove(self, name: str):
+        if not self.root:
+            return
+        try:
+            os.rmdir(os.path.join(self.root, name))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write(path: str, filename: str, value: str):
+        with open(os.path.join(path, filename), "w") as f:
+            f.write(value)
+
+
+# 全局 cgroup 限制器（KERNEL_CGROUP_ROOT 未配置时不可用）
+cgroup_limiter = CgroupLimiter(settings.KERNEL_CGROUP_ROOT)
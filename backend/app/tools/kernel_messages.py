@@ -0,0 +1,287 @@
+# kernel_messages.py
+# Jupyter iopub 消息的流式收集，本地解释器与独立执行器服务共用
+import base64
+import binascii
+import json
+import os
+import re
+import uuid
+from collections import deque
+from typing import Optional
+from app.utils.log_util import logger
+
+ANSI_ESCAPE = re.compile(r"(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]")
+
+# 图片输出落盘目录（相对工作目录）
+OUTPUT_DIR = ".outputs"
+
+# 单条错误信息保留的最大字符数（保留末尾，异常信息在最后）
+MAX_ERROR_CHARS = 20000
+
+# 内核上报新写入文件使用的 MIME 类型
+FILES_MIME = "application/vnd.mathmodelagent.files+json"
+
+# 内核侧图片跟踪：包装 Figure.savefig / PIL Image.save 记录写入的图片，
+# 在 post_run_cell 中以 FILES_MIME 发布，路径相对内核当前目录
+IMAGE_TRACKING_CODE = f"""
+def __mma_track_images():
+    import os
+    from IPython import get_ipython
+    from IPython.display import publish_display_data
+
+    ip = get_ipython()
+    if ip is None or getattr(ip, "_mma_image_tracking", False):
+        return
+    ip._mma_image_tracking = True
+    extensions = (".png", ".jpg", ".jpeg", ".svg", ".pdf", ".gif", ".webp")
+    written = []
+
+    def wrap(cls, name):
+        original = getattr(cls, name)
+
+        def tracked(self, fp, *args, **kwargs):
+            result = original(self, fp, *args, **kwargs)
+            if isinstance(fp, (str, os.PathLike)):
+                path = os.path.abspath(os.fspath(fp))
+                if path.lower().endswith(extensions):
+                    written.append(path)
+            return result
+
+        setattr(cls, name, tracked)
+
+    try:
+        from matplotlib.figure import Figure
+        wrap(Figure, "savefig")
+    except ImportError:
+        pass
+    try:
+        from PIL.Image import Image
+        wrap(Image, "save")
+    except ImportError:
+        pass
+
+    def report(result):
+        if not written:
+            return
+        cwd = os.getcwd()
+        paths = [
+            os.path.relpath(path, cwd) if path.startswith(cwd + os.sep) else path
+            for path in dict.fromkeys(written)
+        ]
+        written.clear()
+        publish_display_data({{"{FILES_MIME}": {{"images": paths}}}})
+
+    ip.events.register("post_run_cell", report)
+
+
+__mma_track_images()
+del __mma_track_images
+"""
+
+# 内核上报当前命名空间（变量名）使用的 MIME 类型
+NAMESPACE_MIME = "application/vnd.mathmodelagent.namespace+json"
+
+# 内核侧命名空间跟踪：每次执行后上报用户命名空间中的名字，供执行前的静态检查使用
+NAMESPACE_TRACKING_CODE = f"""
+def __mma_track_namespace():
+    from IPython import get_ipython
+    from IPython.display import publish_display_data
+
+    ip = get_ipython()
+    if ip is None or getattr(ip, "_mma_namespace_tracking", False):
+        return
+    ip._mma_namespace_tracking = True
+
+    def report(result):
+        names = sorted(name for name in ip.user_ns if not name.startswith("_"))
+        publish_display_data({{"{NAMESPACE_MIME}": {{"names": names}}}})
+
+    ip.events.register("post_run_cell", report)
+
+
+__mma_track_namespace()
+del __mma_track_namespace
+"""
+
+# (消息类型, MIME 类型) -> 输出标记
+_DATA_MARKS = {
+    "execute_result": {
+        "text/plain": "execute_result_text",
+        "text/html": "execute_result_html",
+        "image/png": "execute_result_png",
+        "image/jpeg": "execute_result_jpeg",
+    },
+    "display_data": {
+        "text/plain": "display_text",
+        "text/html": "display_html",
+        "image/png": "display_png",
+        "image/jpeg": "display_jpeg",
+    },
+}
+
+
+def is_image_mark(mark: str) -> bool:
+    return mark.endswith(("_png", "_jpeg"))
+
+
+class OutputCollector:
+    """
+    流式收集一次执行的输出
+
+    消息到达时立即处理，不保留原始 iopub 消息：
+    - 文本保留开头部分，超出 max_output_chars 一半后进入环形缓冲区，只保留最后一半
+    - 图片立即解码写入工作目录下的 OUTPUT_DIR，输出中只保留相对路径
+    - 所有输出（含图片）累计超过 max_output_bytes 时标记 exceeded，之后的输出全部丢弃，
+      由调用方中断内核
+    """
+
+    def __init__(
+        self,
+        work_dir: str,
+        max_output_chars: Optional[int] = None,
+        max_output_bytes: Optional[int] = None,
+    ):
+        self.work_dir = work_dir
+        self.max_output_bytes = max_output_bytes
+        self._head_limit = max_output_chars // 2 if max_output_chars else None
+        self._tail_limit = (
+            max_output_chars - self._head_limit if max_output_chars else 0
+        )
+        self._head: list[list[str]] = []
+        self._head_chars = 0
+        self._tail: deque[list[str]] = deque()
+        self._tail_chars = 0
+        self._dropped_chars = 0
+        self._errors: list[str] = []
+        self._prefix = uuid.uuid4().hex[:8]
+        self.images: list[str] = []
+        self.created_files: list[str] = []
+        self.namespace: Optional[list[str]] = None
+        self.total_bytes = 0
+        self.exceeded = False
+
+    def add(self, iopub_msg: dict):
+        """处理一条 iopub 消息"""
+        msg_type = iopub_msg["msg_type"]
+        content = iopub_msg["content"]
+        if msg_type == "stream":
+            if content.get("name") == "stdout":
+                self._add_text("stdout", content["text"])
+        elif msg_type in _DATA_MARKS:
+            data = content.get("data", {})
+            if FILES_MIME in data:
+                # 内核上报的新图片文件，不作为显示输出
+                for path in data[FILES_MIME].get("images", []):
+                    self.created_files.append(path)
+                return
+            if NAMESPACE_MIME in data:
+                self.namespace = data[NAMESPACE_MIME].get("names", [])
+                return
+            for mime, mark in _DATA_MARKS[msg_type].items():
+                if mime not in data:
+                    continue
+                if is_image_mark(mark):
+                    self._add_image(mark, data[mime])
+                else:
+                    self._add_text(mark, data[mime])
+        elif msg_type == "error":
+            # 返回清理后的错误信息
+            if "traceback" in content:
+                output = ANSI_ESCAPE.sub("", "\n".join(content["traceback"]))
+                self._errors.append(output[-MAX_ERROR_CHARS:])
+
+    def outputs(self) -> list[tuple[str, str]]:
+        """
+        按 [(输出标记, 内容)] 返回收集结果
+
+        图片内容为相对工作目录的路径；created_file 为内核上报的新写入图片文件；
+        namespace 为执行后内核命名空间中的名字（JSON 列表）
+        """
+        outputs = [(mark, text) for mark, text in self._head]
+        if self._dropped_chars:
+            outputs.append(
+                ("stdout", f"[输出已截断：中间 {self._dropped_chars} 字符已丢弃]")
+            )
+        outputs.extend((mark, text) for mark, text in self._tail)
+        if self.exceeded:
+            outputs.append(
+                (
+                    "error",
+                    f"OutputLimitExceeded: cell output exceeded {self.max_output_bytes} bytes and was interrupted",
+                )
+            )
+        outputs.extend(("created_file", path) for path in self.created_files)
+        outputs.extend(("error", error) for error in self._errors)
+        if self.namespace is not None:
+            outputs.append(("namespace", json.dumps(self.namespace)))
+        return outputs
+
+    def _count(self, size: int) -> bool:
+        """累计输出大小，超出硬上限后返回 False"""
+        if self.exceeded:
+            return False
+        self.total_bytes += size
+        if self.max_output_bytes and self.total_bytes > self.max_output_bytes:
+            self.exceeded = True
+            return False
+        return True
+
+    def _add_text(self, mark: str, text: str):
+        if not self._count(len(text)):
+            return
+        if self._head_limit is None or self._head_chars < self._head_limit:
+            room = (
+                len(text)
+                if self._head_limit is None
+                else self._head_limit - self._head_chars
+            )
+            self._append(self._head, mark, text[:room])
+            self._head_chars += min(room, len(text))
+            text = text[room:]
+            if not text:
+                return
+
+        # 环形缓冲区：只保留最后 _tail_limit 个字符
+        if len(text) > self._tail_limit:
+            self._dropped_chars += len(text) - self._tail_limit
+            text = text[len(text) - self._tail_limit :]
+        self._append(self._tail, mark, text)
+        self._tail_chars += len(text)
+        while self._tail_chars > self._tail_limit:
+            excess = self._tail_chars - self._tail_limit
+            first = self._tail[0]
+            if len(first[1]) <= excess:
+                self._tail.popleft()
+                self._tail_chars -= len(first[1])
+                self._dropped_chars += len(first[1])
+            else:
+                first[1] = first[1][excess:]
+                self._tail_chars -= excess
+                self._dropped_chars += excess
+
+    @staticmethod
+    def _append(buffer, mark: str, text: str):
+        # 连续的 stdout 合并为一条
+        if buffer and buffer[-1][0] == mark == "stdout":
+            buffer[-1][1] += text
+        else:
+            buffer.append([mark, text])
+
+    def _add_image(self, mark: str, data: str):
+        try:
+            raw = base64.b64decode(data)
+        except (binascii.Error, ValueError) as e:
+            logger.warning(f"图片输出解码失败，已忽略: {e}")
+            return
+        if not self._count(len(raw)):
+            return
+        extension = "png" if mark.endswith("_png") else "jpg"
+        relative = os.path.join(
+            OUTPUT_DIR, f"{self._prefix}-{len(self.images) + 1}.{extension}"
+        )
+        path = os.path.join(self.work_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(raw)
+        self.images.append(relative)
+        self._head.append([mark, relative])
@@ -0,0 +1,82 @@
+# kernel_namespaces.py
+# 同一内核中的多个执行命名空间：并行子任务共享一个内核进程（科学计算库只导入一次），
+# 变量互不覆盖。切换时把当前命名空间的用户变量暂存到内核中，换入目标命名空间的变量，
+# 只移动引用，不复制数据。隐藏的名字（load_data 等内置辅助函数）与以 _ 开头的名字为共享。
+import re
+
+# 默认命名空间（解释器自身）
+DEFAULT_NAMESPACE = ""
+
+# 内核首次进入某个命名空间时输出的标记（命名空间在内核重启后丢失时可据此发现）
+NAMESPACE_CREATED = "[mma] namespace created"
+
+_VALID_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+_STATE = (
+    "    from IPython import get_ipython\n"
+    "    ip = get_ipython()\n"
+    "    state = getattr(ip, '_mma_namespaces', None)\n"
+    "    if state is None:\n"
+    "        state = ip._mma_namespaces = {'active': '', 'stash': {}, 'known': {''}}\n"
+    "    hidden = ip.user_ns_hidden\n"
+    "    def take():\n"
+    "        names = [n for n in ip.user_ns if n not in hidden and not n.startswith('_')]\n"
+    "        return {n: ip.user_ns.pop(n) for n in names}\n"
+)
+
+
+def validate_namespace(name: str) -> str:
+    if not _VALID_NAME.match(name):
+        raise ValueError(f"无效的命名空间名称: {name!r}（只允许字母、数字、_ 和 -）")
+    return name
+
+
+def namespace_code(name: str, inherit: bool = False) -> str:
+    """
+    在内核中切换到命名空间 name 的代码，命名空间不存在时创建
+
+    inherit 为 True 时，新命名空间以默认命名空间中变量的引用开始（重新赋值互不影响，
+    原地修改可变对象对双方可见）。
+    """
+    return (
+        "def __mma_namespace(name, inherit):\n"
+        + _STATE
+        + "    if name not in state['known']:\n"
+        "        state['known'].add(name)\n"
+        "        if inherit:\n"
+        "            default = state['stash'].get('')\n"
+        "            if state['active'] == '':\n"
+        "                default = {\n"
+        "                    n: v for n, v in ip.user_ns.items()\n"
+        "                    if n not in hidden and not n.startswith('_')\n"
+        "                }\n"
+        "            state['stash'][name] = dict(default or {})\n"
+        f"        print({NAMESPACE_CREATED!r}, name)\n"
+        "    if state['active'] == name:\n"
+        "        return\n"
+        "    state['stash'][state['active']] = take()\n"
+        "    ip.user_ns.update(state['stash'].pop(name, {}))\n"
+        "    state['active'] = name\n"
+        f"__mma_namespace({name!r}, {inherit!r})\n"
+        "del __mma_namespace\n"
+    )
+
+
+def drop_namespace_code(name: str) -> str:
+    """在内核中删除命名空间 name 及其变量的代码，当前处于该命名空间时切回默认命名空间"""
+    return (
+        "def __mma_drop_namespace(name):\n"
+        + _STATE
+        + "    if name == '' or name not in state['known']:\n"
+        "        return\n"
+        "    if state['active'] == name:\n"
+        "        take()\n"
+        "        ip.user_ns.update(state['stash'].pop('', {}))\n"
+        "        state['active'] = ''\n"
+        "    state['stash'].pop(name, None)\n"
+        "    state['known'].discard(name)\n"
+        "    import gc\n"
+        "    gc.collect()\n"
+        f"__mma_drop_namespace({name!r})\n"
+        "del __mma_drop_namespace\n"
+    )
@@ -1,18 +1,21 @@
+from typing import Optional
+from app.config.setting import settings
 from app.tools.base_interpreter import BaseCodeInterpreter
+from app.tools.kernel_checkpoint import restore_code
+from app.tools.kernel_data import data_helpers_code
+from app.tools.kernel_limits import ResourceLimits, cgroup_limiter
+from app.tools.kernel_messages import (
+    IMAGE_TRACKING_CODE,
+    NAMESPACE_TRACKING_CODE,
+    OutputCollector,
+)
 from app.tools.notebook_serializer import NotebookSerializer
 import jupyter_client
 from app.utils.log_util import logger
+import asyncio
 import os
 import queue
 import time
-from app.services.redis_manager import redis_manager
-from app.schemas.response import (
-    OutputItem,
-    ResultModel,
-    StdErrModel,
-    SystemMessage,
-    StepMessage,
-)
 
 
 class LocalCodeInterpreter(BaseCodeInterpreter):
@@ -21,8 +24,9 @@ class LocalCodeInterpreter(BaseCodeInterpreter):
         task_id: str,
         work_dir: str,
         notebook_serializer: NotebookSerializer,
+        limits: Optional[ResourceLimits] = None,
     ):
-        super().__init__(task_id, work_dir, notebook_serializer)
+        super().__init__(task_id, work_dir, notebook_serializer, limits)
         self.km, self.kc = None, None
         self.interrupt_signal = False
 
@@ -34,8 +38,27 @@ class LocalCodeInterpreter(BaseCodeInterpreter):
             kernel_name="python3"
         )
         self._pre_execute_code()
+        # 沿用同一工作目录时（如任务恢复），从已有检查点恢复变量
+        await self.restore_checkpoint()
+
+    @property
+    def _cgroup_name(self) -> str:
+        return f"kernel-{self.task_id}"
+
+    def _setup_kernel(self):
+        """为内核设置 rlimit 与图片 / 命名空间跟踪钩子，并在可用时加入 cgroup"""
+        pid = getattr(getattr(self.km.provisioner, "process", None), "pid", None)
+        cgroup = None
+        if isinstance(pid, int):
+            cgroup = cgroup_limiter.attach(self._cgroup_name, pid, self.base_limits)
+        self.execute_code_(
+            self.base_limits.setup_code(memory_in_cgroup=cgroup is not None)
+            + IMAGE_TRACKING_CODE
+            + NAMESPACE_TRACKING_CODE
+        )
 
     def _pre_execute_code(self):
+        self._setup_kernel()
         init_code = (
             f"import os\n"
             f"work_dir = r'{self.work_dir}'\n"
@@ -54,114 +77,25 @@ class LocalCodeInterpreter(BaseCodeInterpreter):
             # f"mpl.rcParams['ytick.labelsize'] = 10\n"
             # # 设置DPI以获得更清晰的显示
         )
+        if settings.KERNEL_DATA_CACHE_ENABLED:
+            init_code += data_helpers_code(settings.KERNEL_DATA_CACHE_MAX_MB)
         self.execute_code_(init_code)
 
-    async def execute_code(self, code: str) -> tuple[str, bool, str]:
-        logger.info(f"执行代码: {code}")
-        #  添加代码到notebook
-        self.notebook_serializer.add_code_cell_to_notebook(code)
-
-        text_to_gpt: list[str] = []
-        content_to_display: list[OutputItem] | None = []
-        error_occurred: bool = False
-        error_message: str = ""
-
-        # 发送步骤消息：开始执行代码
-        await redis_manager.publish_message(
-            self.task_id,
-            StepMessage(
-                step_name="开始执行代码",
-                step_type="tool",
-                status="processing",
-                content="开始执行代码",
-                details={"tool": "execute_code"},
-            ),
-        )
-        await redis_manager.publish_message(
-            self.task_id,
-            SystemMessage(content="开始执行代码"),
-        )
-        # 执行 Python 代码
-        logger.info("开始在本地执行代码...")
-        execution = self.execute_code_(code)
-        logger.info("代码执行完成")
-
-        # 发送步骤消息：代码执行完成
-        await redis_manager.publish_message(
-            self.task_id,
-            StepMessage(
-                step_name="代码执行完成",
-                step_type="tool",
-                status="completed",
-                content="代码执行完成",
-                details={"tool": "execute_code"},
-            ),
-        )
-        await redis_manager.publish_message(
-            self.task_id,
-            SystemMessage(content="代码执行完成"),
-        )
-
-        for mark, out_str in execution:
-            if mark in ("stdout", "execute_result_text", "display_text"):
-                text_to_gpt.append(self._truncate_text(f"[{mark}]\n{out_str}"))
-                #  添加text到notebook
-                content_to_display.append(
-                    ResultModel(type="result", format="text", msg=out_str)
-                )
-                self.notebook_serializer.add_code_cell_output_to_notebook(out_str)
-
-            elif mark in (
-                "execute_result_png",
-                "execute_result_jpeg",
-                "display_png",
-                "display_jpeg",
-            ):
-                # 图片已保存为base64格式，供后续引用
-                text_to_gpt.append(f"[{mark} 图片已生成，内容为 base64，未展示]")
-
-                #  添加image到notebook
-                if "png" in mark:
-                    self.notebook_serializer.add_image_to_notebook(out_str, "image/png")
-                    content_to_display.append(
-                        ResultModel(type="result", format="png", msg=out_str)
-                    )
-                else:
-                    self.notebook_serializer.add_image_to_notebook(
-                        out_str, "image/jpeg"
-                    )
-                    content_to_display.append(
-                        ResultModel(type="result", format="jpeg", msg=out_str)
-                    )
-
-            elif mark == "error":
-                error_occurred = True
-                error_message = self.delete_color_control_char(out_str)
-                error_message = self._truncate_text(error_message)
-                logger.error(f"执行错误: {error_message}")
-                text_to_gpt.append(error_message)
-                #  添加error到notebook
-                self.notebook_serializer.add_code_cell_error_to_notebook(out_str)
-                content_to_display.append(StdErrModel(msg=out_str))
-
-        logger.info(f"text_to_gpt: {text_to_gpt}")
-        combined_text = "\n".join(text_to_gpt)
-
-        await self._push_to_websocket(content_to_display)
-
-        return (
-            combined_text,
-            error_occurred,
-            error_message,
-        )
+    async def _run_code(self, code: str) -> list[tuple[str, str]]:
+        # 内核消息循环是阻塞的，放到线程中执行，避免阻塞事件循环
+        return await asyncio.to_thread(self.execute_code_, code)
 
     def execute_code_(self, code) -> list[tuple[str, str]]:
         msg_id = self.kc.execute(code)
         logger.info(f"执行代码（消息ID: {msg_id}）: {code}")
         # Get the output of the code
-        msg_list = []
-        max_wait_time = 300  # 最大等待时间（秒）
+        collector = OutputCollector(
+            self.work_dir, self.limits.max_output_chars, self.limits.max_output_bytes
+        )
+        max_wait_time = self.limits.wall_time  # 最大等待时间（秒）
         start_time = time.time()
+        timed_out = False
+        kernel_died = False
         timeout_count = 0
         max_timeout_count = 5  # 连续超时最大次数
 
@@ -169,6 +103,7 @@ class LocalCodeInterpreter(BaseCodeInterpreter):
             # 检查是否超过最大等待时间
             if time.time() - start_time > max_wait_time:
                 logger.error(f"代码执行超时（超过 {max_wait_time} 秒），强制退出")
+                timed_out = True
                 # 尝试中断内核
                 try:
                     self.km.interrupt_kernel()
@@ -178,8 +113,17 @@ class LocalCodeInterpreter(BaseCodeInterpreter):
 
             try:
                 iopub_msg = self.kc.get_iopub_msg(timeout=1)
-                msg_list.append(iopub_msg)
                 timeout_count = 0  # 重置超时计数
+                # 跳过之前被中断的执行遗留的消息
+                parent_id = iopub_msg.get("parent_header", {}).get("msg_id")
+                if parent_id and parent_id != msg_id:
+                    continue
+                output_exceeded = collector.exceeded
+                collector.add(iopub_msg)
+                if collector.exceeded and not output_exceeded:
+                    # 超出输出硬上限：中断执行，继续读取消息直到 idle
+                    logger.error("代码输出超出上限，中断内核")
+                    self.km.interrupt_kernel()
 
                 if (
                     iopub_msg["msg_type"] == "status"
@@ -187,6 +131,11 @@ class LocalCodeInterpreter(BaseCodeInterpreter):
                 ):
                     break
             except queue.Empty:
+                # 内核进程退出（如被 OOM killer 杀死）时不会再有消息
+                if not self.km.is_alive():
+                    logger.error("内核进程已退出")
+                    kernel_died = True
+                    break
                 # 超时，但继续等待
                 timeout_count += 1
                 if timeout_count >= max_timeout_count:
@@ -206,82 +155,62 @@ class LocalCodeInterpreter(BaseCodeInterpreter):
                     self.interrupt_signal = False
                 break
 
-        all_output: list[tuple[str, str]] = []
-        for iopub_msg in msg_list:
-            if iopub_msg["msg_type"] == "stream":
-                if iopub_msg["content"].get("name") == "stdout":
-                    output = iopub_msg["content"]["text"]
-                    all_output.append(("stdout", output))
-            elif iopub_msg["msg_type"] == "execute_result":
-                if "data" in iopub_msg["content"]:
-                    if "text/plain" in iopub_msg["content"]["data"]:
-                        output = iopub_msg["content"]["data"]["text/plain"]
-                        all_output.append(("execute_result_text", output))
-                    if "text/html" in iopub_msg["content"]["data"]:
-                        output = iopub_msg["content"]["data"]["text/html"]
-                        all_output.append(("execute_result_html", output))
-                    if "image/png" in iopub_msg["content"]["data"]:
-                        output = iopub_msg["content"]["data"]["image/png"]
-                        all_output.append(("execute_result_png", output))
-                    if "image/jpeg" in iopub_msg["content"]["data"]:
-                        output = iopub_msg["content"]["data"]["image/jpeg"]
-                        all_output.append(("execute_result_jpeg", output))
-            elif iopub_msg["msg_type"] == "display_data":
-                if "data" in iopub_msg["content"]:
-                    if "text/plain" in iopub_msg["content"]["data"]:
-                        output = iopub_msg["content"]["data"]["text/plain"]
-                        all_output.append(("display_text", output))
-                    if "text/html" in iopub_msg["content"]["data"]:
-                        output = iopub_msg["content"]["data"]["text/html"]
-                        all_output.append(("display_html", output))
-                    if "image/png" in iopub_msg["content"]["data"]:
-                        output = iopub_msg["content"]["data"]["image/png"]
-                        all_output.append(("display_png", output))
-                    if "image/jpeg" in iopub_msg["content"]["data"]:
-                        output = iopub_msg["content"]["data"]["image/jpeg"]
-                        all_output.append(("display_jpeg", output))
-            elif iopub_msg["msg_type"] == "error":
-                # 返回清理后的错误信息
-                if "traceback" in iopub_msg["content"]:
-                    output = "\n".join(iopub_msg["content"]["traceback"])
-                    cleaned_output = self.delete_color_control_char(output)
-                    all_output.append(("error", cleaned_output))
-        return all_output
-
-    async def get_created_images(self, section: str) -> list[str]:
-        """获取新创建的图片列表"""
-        current_images = set()
-        files = os.listdir(self.work_dir)
-        for file in files:
-            if file.endswith((".png", ".jpg", ".jpeg")):
-                current_images.add(file)
-
-        # 计算新增的图片
-        new_images = current_images - self.last_created_images
-
-        # 更新last_created_images为当前的图片集合
-        self.last_created_images = current_images
-
-        logger.info(f"新创建的图片列表: {new_images}")
-        return list(new_images)  # 最后转换为list返回
+        outputs = collector.outputs()
+        if timed_out:
+            outputs.append(
+                (
+                    "error",
+                    f"WallTimeLimitExceeded: execution exceeded {max_wait_time} s and was interrupted",
+                )
+            )
+        if kernel_died:
+            reason = (
+                "killed by the cgroup OOM killer"
+                if cgroup_limiter.oom_killed(self._cgroup_name)
+                else "exited unexpectedly"
+            )
+            # 恢复上一个子任务的检查点，恢复结果随错误一起返回给 CoderAgent
+            restored = self.restart_jupyter_kernel()
+            message = f"KernelDied: kernel process {reason}"
+            message += "".join(
+                f"\n{text.strip()}" for mark, text in restored if mark == "stdout"
+            )
+            outputs.append(("error", message))
+        return outputs
 
     async def cleanup(self):
         # 关闭内核
         self.kc.shutdown()
         logger.info("关闭内核")
         self.km.shutdown_kernel()
+        cgroup_limiter.remove(self._cgroup_name)
 
     def send_interrupt_signal(self):
         self.interrupt_signal = True
 
-    def restart_jupyter_kernel(self):
-        """Restart the Jupyter kernel and recreate the work directory."""
-        self.kc.shutdown()
+    def restart_jupyter_kernel(self) -> list[tuple[str, str]]:
+        """
+        重启内核：关闭旧内核，重新执行初始化代码（资源限制、跟踪钩子、load_data 等），
+        并从检查点恢复变量。内核死亡与主动重启都经过这里。
+
+        Returns:
+            恢复检查点的输出
+        """
+        try:
+            self.kc.shutdown()
+            self.km.shutdown_kernel(now=True)
+        except Exception as e:
+            logger.warning(f"关闭旧内核失败: {e}")
         self.km, self.kc = jupyter_client.manager.start_new_kernel(
             kernel_name="python3"
         )
         self.interrupt_signal = False
+        self.reset_kernel_state()
         self._create_work_dir()
+        self._pre_execute_code()
+        if not settings.KERNEL_CHECKPOINT_ENABLED:
+            return []
+        return self.execute_code_(restore_code(self.checkpoint_dir))
 
     def _create_work_dir(self):
         """Ensure the working directory exists after a restart."""
@@ -0,0 +1,97 @@
+# namespace_interpreter.py
+from app.services.package_provisioner import InstallResult
+from app.tools.base_interpreter import BaseCodeInterpreter
+from app.tools.kernel_checkpoint import CHECKPOINT_DIR, restore_code
+from app.tools.kernel_namespaces import (
+    DEFAULT_NAMESPACE,
+    NAMESPACE_CREATED,
+    drop_namespace_code,
+    namespace_code,
+    validate_namespace,
+)
+from app.tools.notebook_serializer import NotebookSerializer
+from app.utils.log_util import logger
+
+
+class NamespaceInterpreter(BaseCodeInterpreter):
+    """
+    在父解释器的内核中使用独立命名空间执行代码
+
+    并行子任务各用一个命名空间，共享父解释器的内核进程（已导入的包、load_data 等），
+    变量互不覆盖，无需为每个子任务启动完整内核。同一内核上的执行仍然串行。
+
+        ques1 = NamespaceInterpreter(interpreter, "ques1", inherit=True)
+        await ques1.initialize()
+    """
+
+    def __init__(
+        self,
+        parent: BaseCodeInterpreter,
+        name: str,
+        inherit: bool = False,
+        notebook_serializer: NotebookSerializer | None = None,
+    ):
+        """
+        Args:
+            parent: 持有内核的解释器
+            name: 命名空间名称（字母、数字、_ 和 -）
+            inherit: 新命名空间以父解释器当前变量的引用开始（如 EDA 后各问题共享 df）
+            notebook_serializer: 默认写入父解释器的 notebook
+        """
+        super().__init__(
+            task_id=parent.task_id,
+            work_dir=parent.work_dir,
+            notebook_serializer=notebook_serializer or parent.notebook_serializer,
+            limits=parent.base_limits,
+        )
+        self.parent = parent
+        self.namespace = validate_namespace(name)
+        self.checkpoint_dir = f"{CHECKPOINT_DIR}-{name}"
+        self.inherit = inherit
+        self._entered = False
+
+    async def initialize(self):
+        # 沿用已有工作目录时（如任务恢复），从该命名空间的检查点恢复变量
+        await self.restore_checkpoint()
+
+    async def _pre_execute_code(self):
+        """内核由父解释器初始化"""
+
+    def _kernel_owner(self) -> BaseCodeInterpreter:
+        return self.parent
+
+    async def _enter_namespace(self):
+        outputs = await self.parent._run_code(
+            namespace_code(self.namespace, self.inherit)
+        )
+        self.parent.active_namespace = self.namespace
+        created = any(
+            mark == "stdout" and NAMESPACE_CREATED in text for mark, text in outputs
+        )
+        if created and self._entered:
+            # 内核重启后命名空间已丢失，从本命名空间的检查点恢复
+            self.reset_kernel_state()
+            restored = await self.parent._run_code(restore_code(self.checkpoint_dir))
+            logger.warning(f"命名空间 {self.namespace} 已随内核重启丢失: {restored}")
+        self._entered = True
+
+    async def _run_code(self, code: str) -> list[tuple[str, str]]:
+        # 按本命名空间的子任务配置执行
+        limits = self.parent.limits
+        self.parent.limits = self.limits
+        try:
+            return await self.parent._run_code(code)
+        finally:
+            self.parent.limits = limits
+
+    async def _install(self, packages: list[str]) -> InstallResult:
+        return await self.parent._install(packages)
+
+    async def cleanup(self):
+        """删除内核中的命名空间及其变量，内核本身由父解释器关闭"""
+        async with self.parent.kernel_lock:
+            await self.parent._run_code(drop_namespace_code(self.namespace))
+            if self.parent.active_namespace == self.namespace:
+                self.parent.active_namespace = DEFAULT_NAMESPACE
+        self._entered = False
+        logger.info(f"已删除内核命名空间 {self.namespace}")
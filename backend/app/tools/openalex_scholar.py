@@ -1,19 +1,33 @@
-import requests
-from typing import List, Dict, Any
+import httpx
+from typing import List, Dict, Any, Optional
+from app.config.setting import settings
+from app.services.openalex_client import openalex_client
+from app.tools.result_formatter import format_papers, paper_id, result_store
+from app.tools.paper_store import PaperStore, paper_store
 from app.services.redis_manager import redis_manager
 from app.schemas.response import ScholarMessage
 
 
+_DEFAULT_STORE = object()
+
+
 class OpenAlexScholar:
-    def __init__(self, task_id: str, email: str = None):
+    def __init__(
+        self,
+        task_id: str,
+        email: str = None,
+        store: Optional[PaperStore] = _DEFAULT_STORE,
+    ):
         """Initialize OpenAlex client.
 
         Args:
             email: Optional email for better API service
+            store: Local paper cache, defaults to the global store (None disables it)
         """
         self.base_url = "https://api.openalex.org"
         self.email = email
         self.task_id = task_id
+        self.store = paper_store if store is _DEFAULT_STORE else store
 
     def _get_request_url(self, endpoint: str) -> str:
         """Construct request URL with email parameter if provided."""
@@ -50,7 +64,7 @@ class OpenAlexScholar:
         return " ".join(words).strip()
 
     async def search_papers(self, query: str, limit: int = 8) -> List[Dict[str, Any]]:
-        """Search for papers using OpenAlex API.
+        """Search for papers, answering from the local paper store when possible.
 
         Args:
             query: Search query string
@@ -59,9 +73,29 @@ class OpenAlexScholar:
         Returns:
             List of papers with their details
         """
-        # 构建基础 URL
-        base_url = self._get_request_url("works")
+        # 优先使用本地文献缓存，未命中时才访问 API
+        papers = await self.store.lookup(query, limit) if self.store else None
+        if papers is None:
+            papers = await self._fetch_papers(query, limit)
+            if self.store:
+                await self.store.save(query, limit, papers)
+
+        # 完整文献数据按 id 保存，紧凑文本中只保留摘要要点
+        await result_store.save_many({paper_id(paper): paper for paper in papers})
 
+        paper_titles = [paper["title"] for paper in papers]
+        await redis_manager.publish_message(
+            self.task_id,
+            ScholarMessage(
+                input={"query": query},
+                output=paper_titles,  # 只发送论文标题列表
+            ),
+        )
+
+        return papers
+
+    async def _fetch_papers(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """从 OpenAlex API 获取并解析文献"""
         # 设置请求参数，根据API支持的字段进行选择
         params = {
             "search": query,
@@ -69,117 +103,90 @@ class OpenAlexScholar:
             "select": "id,title,display_name,authorships,cited_by_count,doi,publication_year,biblio,abstract_inverted_index",
         }
 
-        # 添加邮箱参数到请求URL
-        if self.email:
-            params["mailto"] = self.email
-        else:
+        if not self.email:
             raise ValueError("配置OpenAlex邮箱获取访问文献权利")
 
-        # 设置请求头，包含User-Agent和邮箱信息
-        headers = {
-            "User-Agent": f"OpenAlexScholar/1.0 (mailto:{self.email})"
-            if self.email
-            else "OpenAlexScholar/1.0"
-        }
-
-        # 让 requests 处理参数编码和 URL 构建
+        # 通过共享客户端请求（连接复用、并发限制、失败重试），不阻塞事件循环
         try:
-            print(f"请求 URL: {base_url} 参数: {params}")
-            response = requests.get(
-                base_url,
-                params=params,
-                headers=headers,
-                timeout=10,
+            print(f"请求 OpenAlex works 参数: {params}")
+            results = await openalex_client.get(
+                "works", params=params, email=self.email
             )
-            print(f"响应状态: {response.status_code}")
-
-            response.raise_for_status()
-            results = response.json()
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             print(f"HTTP 错误: {e}")
-            if response.status_code == 403:
+            if e.response.status_code == 403:
                 print(
                     "提示: 403错误通常意味着您需要提供有效的邮箱地址或者遵循礼貌池（polite pool）规则"
                 )
-            if hasattr(response, "text"):
-                print(f"响应内容: {response.text}")
+            print(f"响应内容: {e.response.text}")
             raise
         except Exception as e:
             print(f"请求出错: {e}")
             raise
 
-        papers = []
-        paper_titles = []  # 用于存储论文标题
-        for work in results.get("results", []):
-            # 从倒排索引中获取摘要
-            abstract = self._get_abstract_from_index(
-                work.get("abstract_inverted_index", {})
-            )
-
-            # 获取作者信息
-            authors = []
-            for authorship in work.get("authorships", []):
-                author = authorship.get("author", {})
-                if author:
-                    author_info = {
-                        "name": author.get("display_name"),
-                        "position": authorship.get("author_position"),
-                        "institution": authorship.get("institutions", [{}])[0].get(
-                            "display_name"
-                        )
-                        if authorship.get("institutions")
-                        else None,
-                    }
-                    authors.append(author_info)
-
-            # 获取引用格式信息
-            biblio = work.get("biblio", {})
-            citation = {
-                "volume": biblio.get("volume"),
-                "issue": biblio.get("issue"),
-                "first_page": biblio.get("first_page"),
-                "last_page": biblio.get("last_page"),
-            }
-
-            paper = {
-                "title": work.get("display_name") or work.get("title", ""),
-                "abstract": abstract,
-                "authors": authors,
-                "citations_count": work.get("cited_by_count"),
-                "doi": work.get("doi"),
-                "publication_year": work.get("publication_year"),
-                "citation_info": citation,
-                # 构建引用格式
-                "citation_format": self._format_citation(work),
-            }
-            papers.append(paper)
-            paper_titles.append(paper["title"])  # 添加标题到列表
+        return [self._parse_work(work) for work in results.get("results", [])]
 
-        await redis_manager.publish_message(
-            self.task_id,
-            ScholarMessage(
-                input={"query": query},
-                output=paper_titles,  # 只发送论文标题列表
-            ),
+    def _parse_work(self, work: Dict[str, Any]) -> Dict[str, Any]:
+        """将 OpenAlex work 解析为文献字典"""
+        # 从倒排索引中获取摘要
+        abstract = self._get_abstract_from_index(
+            work.get("abstract_inverted_index", {})
         )
 
-        return papers
+        # 获取作者信息
+        authors = []
+        for authorship in work.get("authorships", []):
+            author = authorship.get("author", {})
+            if author:
+                author_info = {
+                    "name": author.get("display_name"),
+                    "position": authorship.get("author_position"),
+                    "institution": authorship.get("institutions", [{}])[0].get(
+                        "display_name"
+                    )
+                    if authorship.get("institutions")
+                    else None,
+                }
+                authors.append(author_info)
+
+        # 获取引用格式信息
+        biblio = work.get("biblio", {})
+        citation = {
+            "volume": biblio.get("volume"),
+            "issue": biblio.get("issue"),
+            "first_page": biblio.get("first_page"),
+            "last_page": biblio.get("last_page"),
+        }
+
+        return {
+            "id": work.get("id"),
+            "title": work.get("display_name") or work.get("title", ""),
+            "abstract": abstract,
+            "authors": authors,
+            "citations_count": work.get("cited_by_count"),
+            "doi": work.get("doi"),
+            "publication_year": work.get("publication_year"),
+            "citation_info": citation,
+            # 构建引用格式
+            "citation_format": self._format_citation(work),
+        }
 
-    def papers_to_str(self, papers: List[Dict[str, Any]]) -> str:
-        """将文献列表转换为字符串"""
-        result = ""
-        for paper in papers:
-            result += "\n" + "=" * 80
-            result += f"\n标题: {paper['title']}"
-            result += f"\n摘要: {paper['abstract']}"
-            result += "\n作者:"
-            for author in paper["authors"]:
-                result += f"- {author['name']}"
-            result += f"\n引用次数: {paper['citations_count']}"
-            result += f"\n发表年份: {paper['publication_year']}"
-            result += f"\n引用格式:\n{paper['citation_format']}"
-            result += "=" * 80
-        return result
+    def papers_to_str(
+        self,
+        papers: List[Dict[str, Any]],
+        query: str = "",
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """将文献列表转换为限定 token 预算的紧凑字符串
+
+        Args:
+            papers: 文献列表
+            query: 查询字符串，用于挑选摘要中的相关句子
+            token_budget: token 预算，默认使用 TOOL_RESULT_TOKEN_BUDGET
+        """
+        return format_papers(
+            papers, query, token_budget or settings.TOOL_RESULT_TOKEN_BUDGET
+        )
 
     def _format_citation(self, work: Dict[str, Any]) -> str:
         """Format citation in a readable format."""
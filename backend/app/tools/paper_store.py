@@ -0,0 +1,243 @@
+"""
+本地文献元数据缓存
+
+将 OpenAlex 返回并解析后的文献（重建后的摘要、作者、引用格式等）持久化到 SQLite，
+以 OpenAlex id 为主键、DOI 建索引，并维护 FTS5 全文索引：
+- 相同查询（规范化后）直接返回上次的结果顺序
+- 与已缓存文献重叠的新查询，若全文索引命中足够多的文献则在本地作答
+- 都未命中时才访问 OpenAlex API，并把结果写回缓存
+
+SQLite 操作在线程池中执行，避免阻塞事件循环。
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.config.setting import settings
+from app.utils.log_util import logger
+
+
+class PaperStore:
+    """基于 SQLite + FTS5 的文献缓存"""
+
+    def __init__(
+        self,
+        db_path: str,
+        query_ttl_seconds: float = 30 * 24 * 3600,  # 查询结果缓存的有效期
+    ):
+        self.db_path = db_path
+        self.query_ttl_seconds = query_ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.fts_enabled = False
+
+    async def lookup(self, query: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        在本地查找查询结果
+
+        Args:
+            query: 查询字符串
+            limit: 需要的文献数量
+
+        Returns:
+            List[Dict[str, Any]]: 命中时返回文献列表，未命中返回 None
+        """
+        try:
+            return await asyncio.to_thread(self._lookup, query, limit)
+        except sqlite3.Error as e:
+            logger.warning(f"Paper store lookup failed: {e}")
+            return None
+
+    async def save(self, query: str, limit: int, papers: List[Dict[str, Any]]):
+        """
+        保存 API 返回的文献及查询到文献的映射
+
+        Args:
+            query: 查询字符串
+            limit: 请求的文献数量
+            papers: 解析后的文献列表（需包含 id 字段）
+        """
+        try:
+            await asyncio.to_thread(self._save, query, limit, papers)
+        except sqlite3.Error as e:
+            logger.warning(f"Paper store save failed: {e}")
+
+    async def get_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """按 OpenAlex id 或 DOI 获取单篇文献"""
+        try:
+            return await asyncio.to_thread(self._get_paper, paper_id)
+        except sqlite3.Error as e:
+            logger.warning(f"Paper store read failed: {e}")
+            return None
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """规范化查询：小写并合并空白"""
+        return re.sub(r"\s+", " ", query.casefold()).strip()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                id TEXT PRIMARY KEY,
+                doi TEXT,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_papers_doi ON papers(doi);
+            CREATE TABLE IF NOT EXISTS queries (
+                query TEXT NOT NULL,
+                result_limit INTEGER NOT NULL,
+                paper_ids TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (query, result_limit)
+            );
+            """
+        )
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts "
+                "USING fts5(id UNINDEXED, title, abstract)"
+            )
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, only exact queries cached: {e}")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def _lookup(self, query: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            conn = self._connect()
+            normalized = self.normalize_query(query)
+            fresh_after = time.time() - self.query_ttl_seconds
+
+            # 1. 相同查询：按上次的结果顺序返回
+            row = conn.execute(
+                "SELECT paper_ids, created_at FROM queries "
+                "WHERE query = ? AND result_limit >= ? "
+                "ORDER BY result_limit LIMIT 1",
+                (normalized, limit),
+            ).fetchone()
+            if row and row["created_at"] > fresh_after:
+                ids = json.loads(row["paper_ids"])[:limit]
+                papers = self._load_papers(conn, ids)
+                if ids and len(papers) == len(ids):
+                    return papers
+
+            # 2. 重叠查询：全文索引中所有词都命中、且在有效期内获取的文献足够多时本地作答
+            if not self.fts_enabled:
+                return None
+            match = self._fts_match_expression(normalized)
+            if not match:
+                return None
+            ids = [
+                r["id"]
+                for r in conn.execute(
+                    "SELECT papers_fts.id AS id FROM papers_fts "
+                    "JOIN papers ON papers.id = papers_fts.id "
+                    "WHERE papers_fts MATCH ? AND papers.updated_at > ? "
+                    "ORDER BY bm25(papers_fts) LIMIT ?",
+                    (match, fresh_after, limit),
+                )
+            ]
+            if len(ids) < limit:
+                return None
+            return self._load_papers(conn, ids)
+
+    def _save(self, query: str, limit: int, papers: List[Dict[str, Any]]):
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            ids = []
+            for paper in papers:
+                paper_id = paper.get("id") or paper.get("doi")
+                if not paper_id:
+                    continue
+                ids.append(paper_id)
+                conn.execute(
+                    "INSERT OR REPLACE INTO papers (id, doi, data, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        paper_id,
+                        paper.get("doi"),
+                        json.dumps(paper, ensure_ascii=False),
+                        now,
+                    ),
+                )
+                if self.fts_enabled:
+                    conn.execute("DELETE FROM papers_fts WHERE id = ?", (paper_id,))
+                    conn.execute(
+                        "INSERT INTO papers_fts (id, title, abstract) VALUES (?, ?, ?)",
+                        (
+                            paper_id,
+                            paper.get("title") or "",
+                            paper.get("abstract") or "",
+                        ),
+                    )
+            # 空结果不缓存：可能是临时故障，下次仍访问 API
+            if ids:
+                conn.execute(
+                    "INSERT OR REPLACE INTO queries "
+                    "(query, result_limit, paper_ids, created_at) VALUES (?, ?, ?, ?)",
+                    (self.normalize_query(query), limit, json.dumps(ids), now),
+                )
+            conn.commit()
+
+    def _get_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT data FROM papers WHERE id = ? OR doi = ? LIMIT 1",
+                (paper_id, paper_id),
+            ).fetchone()
+            return json.loads(row["data"]) if row else None
+
+    @staticmethod
+    def _load_papers(conn: sqlite3.Connection, ids: List[str]) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        rows = conn.execute(
+            f"SELECT id, data FROM papers WHERE id IN ({placeholders})", ids
+        ).fetchall()
+        by_id = {row["id"]: json.loads(row["data"]) for row in rows}
+        return [by_id[paper_id] for paper_id in ids if paper_id in by_id]
+
+    @staticmethod
+    def _fts_match_expression(normalized_query: str) -> str:
+        """把查询转换为 FTS5 表达式：每个词作为带引号的短语，全部命中（AND）"""
+        terms = re.findall(r"\w+", normalized_query)
+        return " ".join(f'"{term}"' for term in terms)
+
+
+# 全局文献缓存（连接在首次使用时建立）
+paper_store = (
+    PaperStore(
+        db_path=settings.PAPER_STORE_PATH,
+        query_ttl_seconds=settings.PAPER_STORE_QUERY_TTL_DAYS * 24 * 3600,
+    )
+    if settings.PAPER_STORE_ENABLED
+    else None
+)
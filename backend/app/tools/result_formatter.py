@@ -0,0 +1,262 @@
+"""
+面向 LLM 的紧凑结果格式化
+
+搜索结果和文献会作为 tool 消息进入 chat_history，并在之后的每一轮对话中重复计费。
+这里把它们压缩到固定的 token 预算内：
+- 按相关性排序并去重（DOI / 规范化 URL / 标题）
+- 摘要只保留与查询最相关的句子
+- 作者去重，超过 3 位时写作 et al.，引用格式只出现一次
+- 完整数据以 id 为键存入 Redis，可通过 id 取回
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from app.schemas.search import SearchResult
+from app.services.redis_manager import redis_manager
+from app.tools.search.result_fusion import dedup_key
+from app.utils.log_util import logger
+
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。！？])\s+|(?<=[。！？])")
+_CJK = re.compile(r"[\u3000-\u9fff\uac00-\ud7af]")
+
+
+def estimate_tokens(text: str) -> int:
+    """估算 token 数：中日韩字符约 1 token，其余约 4 字符 1 token"""
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def salient_text(text: str, query: str, max_tokens: int) -> str:
+    """
+    截取与查询最相关的句子
+
+    句子按与查询词的重合度打分（首句略加权），在 token 限额内按原文顺序拼接。
+
+    Args:
+        text: 原文（摘要或网页片段）
+        query: 查询字符串
+        max_tokens: token 限额
+
+    Returns:
+        str: 截取后的文本
+    """
+    text = re.sub(r"\s+", " ", text or "").strip()
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text
+
+    sentences = [s for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+    terms = {t for t in re.findall(r"\w+", query.casefold()) if len(t) > 2}
+
+    def score(item):
+        index, sentence = item
+        words = set(re.findall(r"\w+", sentence.casefold()))
+        return len(terms & words) + (0.5 if index == 0 else 0.0)
+
+    chosen = []
+    used = 0
+    for index, sentence in sorted(enumerate(sentences), key=score, reverse=True):
+        cost = estimate_tokens(sentence) + 1
+        if used + cost > max_tokens:
+            continue
+        chosen.append(index)
+        used += cost
+
+    if not chosen:
+        # 单句超长时按字符截断
+        return sentences[0][: max_tokens * 4].rstrip() + "…"
+    return " … ".join(sentences[i] for i in sorted(chosen))
+
+
+def fit_to_budget(
+    entries: Sequence[tuple[str, Callable[[int], str]]],
+    token_budget: int,
+    min_entry_tokens: int = 40,
+) -> str:
+    """
+    在 token 预算内拼接条目
+
+    每个条目由 (id, render) 组成，render 接收该条目可用的 token 数并返回文本。
+    预算按条目平均分配，放不下的条目只列出 id。
+
+    Args:
+        entries: 已排序的条目
+        token_budget: 总 token 预算
+        min_entry_tokens: 单个条目的最少 token 数
+
+    Returns:
+        str: 拼接后的文本
+    """
+    if not entries:
+        return ""
+    count = max(1, min(len(entries), token_budget // min_entry_tokens))
+    per_entry = token_budget // count
+
+    lines = []
+    used = 0
+    omitted = []
+    for entry_id, render in entries:
+        if used >= token_budget or len(lines) >= count:
+            omitted.append(entry_id)
+            continue
+        block = render(min(per_entry, token_budget - used))
+        lines.append(block)
+        used += estimate_tokens(block)
+
+    if omitted:
+        lines.append(f"(+{len(omitted)} more: {', '.join(omitted)})")
+    return "\n".join(lines)
+
+
+def web_result_id(result: SearchResult) -> str:
+    """网页结果的稳定 id（基于 DOI 或规范化 URL）"""
+    return "R" + hashlib.sha1(dedup_key(result).encode()).hexdigest()[:8]
+
+
+def paper_id(paper: Dict[str, Any]) -> str:
+    """文献的短 id（OpenAlex work id，如 W2741809807）"""
+    raw = paper.get("id") or paper.get("doi") or paper.get("title", "")
+    short = str(raw).rstrip("/").rsplit("/", 1)[-1]
+    if re.fullmatch(r"W\d+", short):
+        return short
+    return "P" + hashlib.sha1(str(raw).encode()).hexdigest()[:8]
+
+
+def format_web_results(
+    results: List[SearchResult], query: str, token_budget: int
+) -> str:
+    """
+    将网页搜索结果格式化为紧凑文本
+
+    Args:
+        results: 搜索结果
+        query: 查询字符串
+        token_budget: token 预算
+
+    Returns:
+        str: 格式化后的文本
+    """
+    if not results:
+        return "No results found."
+
+    ranked = sorted(
+        enumerate(results),
+        key=lambda item: (-(item[1].score or 0.0), item[0]),
+    )
+    seen = set()
+    entries = []
+    for _, result in ranked:
+        key = dedup_key(result)
+        if key in seen:
+            continue
+        seen.add(key)
+        result_id = web_result_id(result)
+        position = len(entries) + 1
+
+        def render(tokens, result=result, result_id=result_id, position=position):
+            header = (
+                f"{position}. {result.title} (id: {result_id})\n   URL: {result.url}"
+            )
+            snippet = salient_text(
+                result.content or "", query, max(10, tokens - estimate_tokens(header))
+            )
+            return f"{header}\n   Snippet: {snippet or 'No snippet available.'}"
+
+        entries.append((result_id, render))
+
+    return fit_to_budget(entries, token_budget)
+
+
+def format_papers(papers: List[Dict[str, Any]], query: str, token_budget: int) -> str:
+    """
+    将文献列表格式化为紧凑文本
+
+    Args:
+        papers: OpenAlexScholar 解析后的文献
+        query: 查询字符串
+        token_budget: token 预算
+
+    Returns:
+        str: 格式化后的文本
+    """
+    if not papers:
+        return "未找到相关文献。"
+
+    seen = set()
+    entries = []
+    for paper in papers:
+        key = (paper.get("doi") or paper.get("title") or paper_id(paper)).casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        pid = paper_id(paper)
+
+        def render(tokens, paper=paper, pid=pid):
+            citation = paper.get("citation_format") or _short_citation(paper)
+            header = (
+                f"[{pid}] {citation}（被引 {paper.get('citations_count') or 0} 次）"
+            )
+            abstract = salient_text(
+                paper.get("abstract") or "",
+                query,
+                max(10, tokens - estimate_tokens(header)),
+            )
+            return f"{header}\n  摘要: {abstract}" if abstract else header
+
+        entries.append((pid, render))
+
+    return fit_to_budget(entries, token_budget)
+
+
+def _short_citation(paper: Dict[str, Any]) -> str:
+    names = list(
+        dict.fromkeys(a.get("name") for a in paper.get("authors", []) if a.get("name"))
+    )
+    authors = f"{names[0]} et al." if len(names) > 3 else ", ".join(names)
+    citation = (
+        f"{authors} ({paper.get('publication_year', '')}). {paper.get('title', '')}."
+    )
+    if paper.get("doi"):
+        citation += f" DOI: {paper['doi']}"
+    return citation
+
+
+class ResultStore:
+    """按 id 保存完整结果（Redis），供紧凑文本之外按需取回"""
+
+    def __init__(self, ttl: int = 7 * 24 * 3600, key_prefix: str = "tool_result:"):
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    async def save_many(self, items: Dict[str, Any]):
+        """批量保存 {id: 完整数据}"""
+        if not items:
+            return
+        try:
+            redis = await redis_manager.get_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                for item_id, data in items.items():
+                    pipe.set(
+                        self.key_prefix + item_id,
+                        json.dumps(data, ensure_ascii=False, default=str),
+                        ex=self.ttl,
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to store tool results: {e}")
+
+    async def get(self, item_id: str) -> Optional[Any]:
+        """按 id 取回完整数据，不存在时返回 None"""
+        try:
+            redis = await redis_manager.get_client()
+            data = await redis.get(self.key_prefix + item_id.strip())
+        except Exception as e:
+            logger.warning(f"Failed to read tool result {item_id}: {e}")
+            return None
+        return json.loads(data) if data else None
+
+
+# 全局结果存储
+result_store = ResultStore()
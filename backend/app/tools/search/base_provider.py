@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional
 import asyncio
 import aiohttp
 import time
@@ -10,6 +10,7 @@ from app.schemas.search import (
     SearchError,
     SearchProviderStatus,
 )
+from app.services.http_session_manager import http_session_manager
 from app.tools.search.rate_limiter import rate_limiter
 from app.utils.log_util import get_logger
 
@@ -27,10 +28,9 @@ class BaseSearchProvider(ABC):
         """
         self.config = config
         self.name = config.provider.value
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._timeout = aiohttp.ClientTimeout(total=config.timeout)
         self._rate_limit_remaining: Optional[int] = None
         self._last_request_time: float = 0
-        self._response_times: List[float] = []
 
         # Set up rate limiting if configured
         if config.rate_limit:
@@ -45,16 +45,20 @@ class BaseSearchProvider(ABC):
         """Async context manager exit"""
         await self.close()
 
-    async def _ensure_session(self):
-        """Ensure aiohttp session is created"""
-        if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=self.config.timeout)
-            self._session = aiohttp.ClientSession(timeout=timeout)
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Get the shared aiohttp session
+
+        Returns:
+            Process-wide session owned by the HTTP session manager
+        """
+        return await http_session_manager.get_session()
 
     async def close(self):
-        """Close the aiohttp session"""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Release provider resources
+
+        The shared HTTP session is closed by the application lifespan, so
+        there is nothing to release per provider.
+        """
 
     @abstractmethod
     async def search(self, request: SearchRequest) -> SearchResponse:
@@ -89,26 +93,23 @@ class BaseSearchProvider(ABC):
         """
         pass
 
-    def _record_response_time(self, response_time: float):
+    def _record_response_time(self, response_time: float, error: bool = False):
         """Record response time for monitoring
 
         Args:
             response_time: Response time in seconds
+            error: Whether the request failed
         """
-        self._response_times.append(response_time)
-        # Keep only last 100 response times
-        if len(self._response_times) > 100:
-            self._response_times = self._response_times[-100:]
+        http_session_manager.record_request(self.name, response_time, error=error)
 
     def get_average_response_time(self) -> Optional[float]:
         """Get average response time
 
         Returns:
-            Average response time in seconds, or None if no data
+            Average response time in seconds over recent requests, or None if
+            no data
         """
-        if not self._response_times:
-            return None
-        return sum(self._response_times) / len(self._response_times)
+        return http_session_manager.get_metrics(self.name).average_latency
 
     async def _make_request(
         self,
@@ -140,16 +141,22 @@ class BaseSearchProvider(ABC):
                 error_code="RATE_LIMIT_EXCEEDED",
             )
 
-        await self._ensure_session()
+        session = await self._ensure_session()
 
         start_time = time.time()
 
         try:
-            async with self._session.request(
-                method=method, url=url, headers=headers, params=params, json=json_data
+            async with session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json_data,
+                timeout=self._timeout,
+                trace_request_ctx={"provider": self.name},
             ) as response:
                 response_time = time.time() - start_time
-                self._record_response_time(response_time)
+                self._record_response_time(response_time, error=response.status != 200)
 
                 # Update rate limit info if available
                 if "x-ratelimit-remaining" in response.headers:
@@ -191,7 +198,7 @@ class BaseSearchProvider(ABC):
 
         except aiohttp.ClientError as e:
             response_time = time.time() - start_time
-            self._record_response_time(response_time)
+            self._record_response_time(response_time, error=True)
             raise SearchError(
                 f"Network error for {self.name}: {str(e)}",
                 provider=self.name,
@@ -199,7 +206,7 @@ class BaseSearchProvider(ABC):
             )
         except asyncio.TimeoutError:
             response_time = time.time() - start_time
-            self._record_response_time(response_time)
+            self._record_response_time(response_time, error=True)
             raise SearchError(
                 f"Request timeout for {self.name}",
                 provider=self.name,
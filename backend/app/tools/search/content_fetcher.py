@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Tuple
+from app.services.redis_manager import redis_manager
+from app.utils.log_util import get_logger
+
+logger = get_logger(__name__)
+
+
+class ContentFetcher:
+    """Batched, concurrent page content retrieval with a per-URL cache
+
+    URL lists are split into batches that run concurrently under a limit.
+    Each batch has its own timeout; a batch that fails or times out is retried
+    URL by URL, so a single slow or broken page only loses itself. Retrieved
+    content is cached per URL in memory and in Redis.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 10,
+        max_concurrency: int = 4,
+        timeout: float = 15.0,
+        cache_ttl: int = 24 * 3600,
+        max_entries: int = 1024,
+        use_redis: bool = True,
+        key_prefix: str = "content_cache:",
+    ):
+        """Initialize content fetcher
+
+        Args:
+            batch_size: Maximum number of URLs per provider request
+            max_concurrency: Maximum number of provider requests in flight
+            timeout: Timeout in seconds for one provider request
+            cache_ttl: Seconds a URL's content stays cached
+            max_entries: Maximum number of URLs kept in memory
+            use_redis: Whether to use the shared Redis tier
+            key_prefix: Prefix for Redis keys
+        """
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.use_redis = use_redis
+        self.key_prefix = key_prefix
+
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def fetch(self, provider, urls: List[str]) -> Dict[str, str]:
+        """Get content for all URLs, tolerating individual failures
+
+        Args:
+            provider: Search provider implementing ``get_content``
+            urls: URLs to retrieve
+
+        Returns:
+            Dictionary mapping URLs to content; URLs that could not be
+            retrieved are absent
+        """
+        content = {}
+        async for partial in self.iter_content(provider, urls):
+            content.update(partial)
+        return content
+
+    async def iter_content(
+        self, provider, urls: List[str]
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Yield content as it becomes available
+
+        Cached URLs are yielded first, then each batch as soon as it
+        completes.
+
+        Args:
+            provider: Search provider implementing ``get_content``
+            urls: URLs to retrieve
+
+        Yields:
+            Partial dictionaries mapping URLs to content
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        cached = await self._get_cached(urls)
+        if cached:
+            yield cached
+
+        missing = [url for url in urls if url not in cached]
+        if not missing:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [
+            asyncio.create_task(
+                self._fetch_batch(provider, missing[i : i + self.batch_size], semaphore)
+            )
+            for i in range(0, len(missing), self.batch_size)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                content = await next_done
+                if content:
+                    yield content
+        finally:
+            # The consumer may stop early; don't leave requests running
+            for task in tasks:
+                task.cancel()
+
+    async def clear(self):
+        """Remove all cached content from both tiers"""
+        self._entries.clear()
+        if not self.use_redis:
+            return
+        try:
+            redis = await redis_manager.get_client()
+            keys = [key async for key in redis.scan_iter(f"{self.key_prefix}*")]
+            if keys:
+                await redis.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Failed to clear content cache in Redis: {e}")
+
+    async def _fetch_batch(
+        self, provider, batch: List[str], semaphore: asyncio.Semaphore
+    ) -> Dict[str, str]:
+        try:
+            async with semaphore:
+                content = await asyncio.wait_for(
+                    provider.get_content(batch), timeout=self.timeout
+                )
+        except Exception as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            if len(batch) == 1:
+                logger.warning(f"Content retrieval for {batch[0]} failed: {reason}")
+                return {}
+            logger.warning(
+                f"Content batch of {len(batch)} URLs failed ({reason}), "
+                "retrying URLs individually"
+            )
+            results = await asyncio.gather(
+                *(self._fetch_batch(provider, [url], semaphore) for url in batch)
+            )
+            return {url: text for result in results for url, text in result.items()}
+
+        await self._store(content)
+        return content
+
+    async def _get_cached(self, urls: List[str]) -> Dict[str, str]:
+        now = time.time()
+        found = {}
+        for url in urls:
+            entry = self._entries.get(url)
+            if entry is None:
+                continue
+            if entry[1] <= now:
+                del self._entries[url]
+                continue
+            self._entries.move_to_end(url)
+            found[url] = entry[0]
+
+        remaining = [url for url in urls if url not in found]
+        if not remaining or not self.use_redis:
+            return found
+
+        try:
+            redis = await redis_manager.get_client()
+            values = await redis.mget([self._key(url) for url in remaining])
+        except Exception as e:
+            logger.warning(f"Failed to read content cache from Redis: {e}")
+            return found
+
+        for url, value in zip(remaining, values):
+            if value is not None:
+                found[url] = value
+                self._store_local(url, value, now + self.cache_ttl)
+        return found
+
+    async def _store(self, content: Dict[str, str]):
+        if not content:
+            return
+        expires_at = time.time() + self.cache_ttl
+        for url, text in content.items():
+            self._store_local(url, text, expires_at)
+
+        if not self.use_redis:
+            return
+        try:
+            redis = await redis_manager.get_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                for url, text in content.items():
+                    pipe.set(self._key(url), text, ex=self.cache_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to write content cache to Redis: {e}")
+
+    def _store_local(self, url: str, text: str, expires_at: float):
+        self._entries[url] = (text, expires_at)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _key(self, url: str) -> str:
+        return self.key_prefix + hashlib.sha256(url.encode()).hexdigest()[:32]
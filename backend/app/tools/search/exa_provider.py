@@ -161,6 +161,9 @@ class ExaSearchProvider(BaseSearchProvider):
             content = None
             if include_content:
                 content = item.get("text") or item.get("content") or item.get("summary")
+            else:
+                # Without page text, fall back to the short highlights as a snippet
+                content = " ".join(item.get("highlights") or []) or item.get("summary")
 
             result = SearchResult(
                 title=item.get("title", ""),
@@ -0,0 +1,190 @@
+from typing import Any, Dict, List, Optional
+import time
+from datetime import datetime
+import httpx
+from app.schemas.search import (
+    SearchRequest,
+    SearchResponse,
+    SearchResult,
+    SearchConfig,
+    SearchError,
+    SearchProviderStatus,
+    SearchProvider,
+)
+from app.services.openalex_client import openalex_client
+from app.tools.search.base_provider import BaseSearchProvider
+from app.utils.log_util import get_logger
+
+logger = get_logger(__name__)
+
+
+class OpenAlexSearchProvider(BaseSearchProvider):
+    """OpenAlex scholarly search provider
+
+    OpenAlex needs no API key; ``config.api_key`` holds the optional polite
+    pool email. Requests go through the shared OpenAlex client, which owns
+    connection pooling, throttling and retries.
+    """
+
+    SELECT_FIELDS = (
+        "id,doi,display_name,publication_year,publication_date,"
+        "cited_by_count,primary_location,abstract_inverted_index"
+    )
+
+    def __init__(self, config: SearchConfig, client=None):
+        """Initialize OpenAlex search provider
+
+        Args:
+            config: Search provider configuration
+            client: OpenAlex client, defaults to the shared global client
+        """
+        super().__init__(config)
+        self.email = config.api_key or None
+        self.client = client or openalex_client
+
+    def validate_config(self) -> bool:
+        """Validate OpenAlex configuration
+
+        Returns:
+            Always True, since OpenAlex works without credentials
+        """
+        return True
+
+    async def search(self, request: SearchRequest) -> SearchResponse:
+        """Search OpenAlex works
+
+        Args:
+            request: Search request parameters
+
+        Returns:
+            Search response with one result per work
+
+        Raises:
+            SearchError: If search fails
+        """
+        start_time = time.time()
+        params = {
+            "search": request.query,
+            "per_page": request.max_results or self.config.max_results,
+            "select": self.SELECT_FIELDS,
+        }
+        date_filter = self._parse_date_range(request.date_range)
+        if date_filter:
+            params["filter"] = date_filter
+
+        try:
+            response_data = await self.client.get(
+                "works", params=params, email=self.email
+            )
+        except httpx.HTTPStatusError as e:
+            raise SearchError(
+                f"HTTP {e.response.status_code}: {e.response.text}",
+                provider=self.name,
+                error_code=f"HTTP_{e.response.status_code}",
+            )
+        except httpx.HTTPError as e:
+            raise SearchError(
+                f"Network error for {self.name}: {str(e)}",
+                provider=self.name,
+                error_code="NETWORK_ERROR",
+            )
+
+        search_time = time.time() - start_time
+        self._record_response_time(search_time)
+        results = self._parse_openalex_response(response_data)
+
+        return SearchResponse(
+            results=results,
+            query=request.query,
+            provider=SearchProvider.OPENALEX,
+            total_results=response_data.get("meta", {}).get("count", len(results)),
+            search_time=search_time,
+        )
+
+    async def health_check(self) -> SearchProviderStatus:
+        """Check OpenAlex availability with a minimal query
+
+        Returns:
+            Provider status information
+        """
+        try:
+            await self.client.get("works", params={"per_page": 1}, email=self.email)
+            return self.get_status()
+        except Exception as e:
+            return SearchProviderStatus(
+                provider=SearchProvider.OPENALEX,
+                available=False,
+                configured=True,
+                last_error=str(e),
+                response_time=self.get_average_response_time(),
+            )
+
+    def _parse_openalex_response(
+        self, response_data: Dict[str, Any]
+    ) -> List[SearchResult]:
+        """Parse OpenAlex works into SearchResult objects
+
+        Args:
+            response_data: Raw response from the works endpoint
+
+        Returns:
+            List of parsed search results
+        """
+        results = []
+        for work in response_data.get("results", []):
+            location = work.get("primary_location") or {}
+            source = (location.get("source") or {}).get("display_name")
+            url = work.get("doi") or location.get("landing_page_url") or work.get("id")
+            if not url:
+                continue
+
+            published_date = None
+            if work.get("publication_date"):
+                try:
+                    published_date = datetime.fromisoformat(work["publication_date"])
+                except (ValueError, TypeError):
+                    pass
+
+            results.append(
+                SearchResult(
+                    title=work.get("display_name") or "",
+                    url=url,
+                    content=self._abstract_from_index(
+                        work.get("abstract_inverted_index")
+                    )
+                    or None,
+                    published_date=published_date,
+                    source=source,
+                    metadata={
+                        "id": work.get("id"),
+                        "doi": work.get("doi"),
+                        "publication_year": work.get("publication_year"),
+                        "cited_by_count": work.get("cited_by_count"),
+                    },
+                )
+            )
+        return results
+
+    @staticmethod
+    def _abstract_from_index(inverted_index: Optional[Dict[str, List[int]]]) -> str:
+        """Rebuild abstract text from OpenAlex's inverted index"""
+        if not inverted_index:
+            return ""
+        positions = {
+            position: word
+            for word, word_positions in inverted_index.items()
+            for position in word_positions
+        }
+        return " ".join(positions[i] for i in sorted(positions))
+
+    @staticmethod
+    def _parse_date_range(date_range: Optional[Dict[str, str]]) -> Optional[str]:
+        """Convert a date range into an OpenAlex filter expression"""
+        if not date_range:
+            return None
+        filters = []
+        if date_range.get("start_date"):
+            filters.append(f"from_publication_date:{date_range['start_date']}")
+        if date_range.get("end_date"):
+            filters.append(f"to_publication_date:{date_range['end_date']}")
+        return ",".join(filters) or None
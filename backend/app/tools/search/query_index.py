@@ -0,0 +1,292 @@
+import hashlib
+import random
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from app.config.setting import settings
+from app.schemas.search import SearchRequest, SearchResponse, SearchType
+from app.tools.search.search_cache import DEFAULT_SEARCH_CACHE_TTLS
+
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in into is it of on or the to "
+    "using what when where which with".split()
+)
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+@dataclass
+class IndexedQuery:
+    """A past query with its response"""
+
+    query: str
+    shingles: FrozenSet[str]
+    words: FrozenSet[str]
+    response: SearchResponse
+    expires_at: float
+
+
+class SemanticQueryIndex:
+    """Near-duplicate detection over recent search queries
+
+    Queries are normalized into character trigrams of their content words, so
+    word order, stop words, plurals and hyphenation ("k-means" / "kmeans") do
+    not matter. MinHash signatures split into LSH bands find candidate
+    matches without scanning the whole index. A candidate must reach
+    ``threshold`` on both trigram and whole-word Jaccard similarity, and its
+    numbers must be identical, so "SARIMA" does not match "ARIMA" and "2020"
+    does not match "2010".
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        max_entries: int = 256,
+        num_perm: int = 64,
+        bands: int = 16,
+        ttls: Optional[Dict[SearchType, int]] = None,
+        seed: int = 1,
+    ):
+        """Initialize the query index
+
+        Args:
+            threshold: Minimum Jaccard similarity to reuse a response
+            max_entries: Maximum number of indexed queries
+            num_perm: Number of MinHash permutations
+            bands: Number of LSH bands (must divide num_perm)
+            ttls: Seconds an entry stays usable per search type (merged over
+                the search cache defaults)
+            seed: Seed for the MinHash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ttls = dict(DEFAULT_SEARCH_CACHE_TTLS)
+        for search_type, ttl in (ttls or {}).items():
+            self.ttls[SearchType(search_type)] = int(ttl)
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._entries: "OrderedDict[int, IndexedQuery]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[int]] = {}
+        self._entry_bands: Dict[int, List[Tuple[str, int, Tuple[int, ...]]]] = {}
+        self._next_id = 0
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def words(query: str) -> FrozenSet[str]:
+        """Normalized content words of a query
+
+        Args:
+            query: Raw query string
+
+        Returns:
+            Case-folded words without stop words, hyphens or plural ``s``
+        """
+        text = unicodedata.normalize("NFKC", query).casefold()
+        text = re.sub(r"(?<=\w)[-_](?=\w)", "", text)
+        words = set()
+        for word in re.findall(r"\w+", text):
+            if word in _STOPWORDS:
+                continue
+            if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+                word = word[:-1]
+            words.add(word)
+        return frozenset(words)
+
+    @classmethod
+    def shingles(cls, query: str) -> FrozenSet[str]:
+        """Character trigrams of a query's normalized content words
+
+        Args:
+            query: Raw query string
+
+        Returns:
+            Set of trigrams (words are padded with ``#`` so short words and
+            word boundaries still contribute)
+        """
+        return frozenset(
+            padded[i : i + 3]
+            for padded in (f"#{word}#" for word in cls.words(query))
+            for i in range(len(padded) - 2)
+        )
+
+    @staticmethod
+    def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+        """Jaccard similarity of two shingle sets"""
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+    def score(
+        self, shingles: FrozenSet[str], words: FrozenSet[str], entry: IndexedQuery
+    ) -> float:
+        """Similarity of a query to an indexed entry
+
+        Args:
+            shingles: Trigrams of the query
+            words: Content words of the query
+            entry: Indexed query
+
+        Returns:
+            The lower of trigram and word Jaccard similarity, or 0.0 when the
+            queries contain different numbers
+        """
+        if _numbers(words) != _numbers(entry.words):
+            return 0.0
+        return min(
+            self.similarity(shingles, entry.shingles),
+            self.similarity(words, entry.words),
+        )
+
+    def lookup(self, request: SearchRequest) -> Optional[Tuple[IndexedQuery, float]]:
+        """Find a recent response for a near-duplicate query
+
+        Args:
+            request: Search request
+
+        Returns:
+            (matching entry, similarity) for the most similar usable entry, or
+            None
+        """
+        words = self.words(request.query)
+        shingles = self.shingles(request.query)
+        scope = self._scope(request)
+        best: Optional[Tuple[IndexedQuery, float]] = None
+        now = time.time()
+
+        candidates = set()
+        for band_key in self._band_keys(scope, shingles):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if entry.expires_at <= now:
+                self._remove(entry_id)
+                continue
+            score = self.score(shingles, words, entry)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (entry, score)
+
+        if best is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return best
+
+    def add(self, request: SearchRequest, response: SearchResponse):
+        """Index a query and its response
+
+        Args:
+            request: Search request that produced the response
+            response: Response to reuse for near-duplicate queries
+        """
+        shingles = self.shingles(request.query)
+        if not shingles:
+            return
+        ttl = self.ttls.get(request.search_type, self.ttls[SearchType.GENERAL])
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = IndexedQuery(
+            query=request.query,
+            shingles=shingles,
+            words=self.words(request.query),
+            response=response,
+            expires_at=time.time() + ttl,
+        )
+        band_keys = self._band_keys(self._scope(request), shingles)
+        self._entry_bands[entry_id] = band_keys
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """Remove all indexed queries"""
+        self._entries.clear()
+        self._buckets.clear()
+        self._entry_bands.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit statistics
+
+        Returns:
+            Dictionary with hits, misses, hit rate and entry count
+        """
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": self._stats["hits"] / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _remove(self, entry_id: int):
+        self._entries.pop(entry_id, None)
+        for band_key in self._entry_bands.pop(entry_id, ()):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def _band_keys(
+        self, scope: str, shingles: FrozenSet[str]
+    ) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        signature = self._minhash(shingles)
+        return [
+            (scope, band, tuple(signature[band * self.rows : (band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def _minhash(self, shingles: FrozenSet[str]) -> List[int]:
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big"
+            )
+            for shingle in shingles
+        ]
+        if not hashes:
+            return [0] * len(self._perms)
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms
+        ]
+
+    @staticmethod
+    def _scope(request: SearchRequest) -> str:
+        """Requests only match others with the same filters"""
+        return "|".join(
+            [
+                request.search_type.value,
+                request.provider.value if request.provider else "",
+                str(request.max_results or ""),
+                ",".join(sorted(request.domains or [])),
+                ",".join(
+                    f"{k}={v}" for k, v in sorted((request.date_range or {}).items())
+                ),
+                str(request.include_content),
+                request.language or "",
+            ]
+        )
+
+
+def _numbers(words: FrozenSet[str]) -> FrozenSet[str]:
+    return frozenset(word for word in words if any(c.isdigit() for c in word))
+
+
+# Global index of recent agent queries
+query_index = SemanticQueryIndex(
+    threshold=settings.SEARCH_SEMANTIC_DEDUP_THRESHOLD,
+    max_entries=settings.SEARCH_SEMANTIC_DEDUP_MAX_ENTRIES,
+    ttls=settings.SEARCH_CACHE_TTLS,
+)
@@ -0,0 +1,123 @@
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from app.schemas.search import SearchResult
+
+
+# Standard constant from the reciprocal rank fusion paper (Cormack et al., 2009)
+RRF_K = 60
+
+_DOI_PATTERN = re.compile(r"\b(10\.\d{4,9}/[^\s?#]+)", re.IGNORECASE)
+_TRACKING_PARAMS = {"ref", "fbclid", "gclid"}
+
+
+def extract_doi(result: SearchResult) -> Optional[str]:
+    """Find a DOI in result metadata or its URL
+
+    Args:
+        result: Search result
+
+    Returns:
+        Lower-cased bare DOI (``10.xxxx/...``), or None
+    """
+    for candidate in (result.metadata.get("doi"), result.url):
+        if candidate:
+            match = _DOI_PATTERN.search(str(candidate))
+            if match:
+                return match.group(1).rstrip("/.").lower()
+    return None
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for duplicate detection
+
+    Drops the scheme, ``www.``, fragments, tracking parameters and trailing
+    slashes, and sorts the remaining query parameters.
+
+    Args:
+        url: Raw URL
+
+    Returns:
+        Normalized URL string
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    return urlunsplit(("", host, path, urlencode(query), "")).lstrip("/")
+
+
+def dedup_key(result: SearchResult) -> str:
+    """Identity of a result across providers: DOI when known, else URL"""
+    doi = extract_doi(result)
+    return f"doi:{doi}" if doi else f"url:{normalize_url(result.url)}"
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Tuple[str, List[SearchResult]]],
+    k: int = RRF_K,
+    limit: Optional[int] = None,
+) -> List[SearchResult]:
+    """Merge ranked result lists from several providers
+
+    Each result scores ``sum(1 / (k + rank))`` over the lists it appears in,
+    so items ranked well by several providers rise to the top. Duplicates
+    (same DOI or normalized URL) are merged: the first copy wins, missing
+    content is filled from later copies, and ``metadata["providers"]`` lists
+    every provider that returned it.
+
+    Args:
+        ranked_lists: (provider name, results in rank order) pairs
+        k: Rank smoothing constant
+        limit: Maximum number of fused results
+
+    Returns:
+        Fused results ordered by descending score, with ``score`` set to the
+        fused score
+    """
+    scores: Dict[str, float] = {}
+    merged: Dict[str, SearchResult] = {}
+
+    for provider, results in ranked_lists:
+        seen = set()
+        for rank, result in enumerate(results, start=1):
+            key = dedup_key(result)
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = result.model_copy(
+                    update={
+                        "metadata": {
+                            **result.metadata,
+                            "providers": [provider],
+                            "provider_score": result.score,
+                        }
+                    }
+                )
+                continue
+
+            existing.metadata["providers"].append(provider)
+            if not existing.content and result.content:
+                existing.content = result.content
+            if existing.published_date is None and result.published_date:
+                existing.published_date = result.published_date
+
+    ordered = sorted(merged, key=lambda key: scores[key], reverse=True)
+    if limit is not None:
+        ordered = ordered[:limit]
+    fused = []
+    for key in ordered:
+        result = merged[key]
+        result.score = round(scores[key], 6)
+        fused.append(result)
+    return fused
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+from app.schemas.search import SearchRequest, SearchResponse, SearchType
+from app.services.redis_manager import redis_manager
+from app.utils.log_util import get_logger
+
+logger = get_logger(__name__)
+
+
+# Default freshness per search type, in seconds
+DEFAULT_SEARCH_CACHE_TTLS: Dict[SearchType, int] = {
+    SearchType.NEWS: 15 * 60,
+    SearchType.GENERAL: 6 * 3600,
+    SearchType.CODE: 24 * 3600,
+    SearchType.RESEARCH: 24 * 3600,
+    SearchType.ACADEMIC: 7 * 24 * 3600,
+}
+
+
+@dataclass
+class CachedSearch:
+    """A cached search response with its freshness window"""
+
+    response: SearchResponse
+    fresh_until: float
+    stale_until: float
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.fresh_until
+
+    def is_usable(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.stale_until
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "response": self.response.model_dump(mode="json"),
+                "fresh_until": self.fresh_until,
+                "stale_until": self.stale_until,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: str) -> "CachedSearch":
+        payload = json.loads(data)
+        return cls(
+            response=SearchResponse.model_validate(payload["response"]),
+            fresh_until=float(payload["fresh_until"]),
+            stale_until=float(payload["stale_until"]),
+        )
+
+
+class SearchCache:
+    """Two-tier search result cache (in-process LRU + shared Redis)
+
+    Entries are fresh for a per-search-type TTL, then stay usable as stale for
+    ``stale_factor`` times that TTL so callers can serve them immediately while
+    refreshing in the background (stale-while-revalidate).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttls: Optional[Dict[SearchType, int]] = None,
+        stale_factor: float = 1.0,
+        default_max_results: int = 10,
+        use_redis: bool = True,
+        key_prefix: str = "search_cache:",
+    ):
+        """Initialize search cache
+
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            ttls: Freshness TTL in seconds per search type (merged over defaults)
+            stale_factor: Stale window as a multiple of the freshness TTL
+            default_max_results: Value used in keys when a request omits max_results
+            use_redis: Whether to use the shared Redis tier
+            key_prefix: Prefix for Redis keys
+        """
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_SEARCH_CACHE_TTLS)
+        for search_type, ttl in (ttls or {}).items():
+            self.ttls[SearchType(search_type)] = int(ttl)
+        self.stale_factor = stale_factor
+        self.default_max_results = default_max_results
+        self.use_redis = use_redis
+        self.key_prefix = key_prefix
+
+        self._entries: "OrderedDict[str, CachedSearch]" = OrderedDict()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0}
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a query so trivially different spellings share a key
+
+        Args:
+            query: Raw query string
+
+        Returns:
+            Unicode-normalized, case-folded query with collapsed whitespace
+        """
+        query = unicodedata.normalize("NFKC", query).casefold()
+        query = re.sub(r"\s+", " ", query).strip()
+        return query.rstrip("?!.。？！ ")
+
+    def make_key(self, request: SearchRequest) -> str:
+        """Build the cache key for a request
+
+        Args:
+            request: Search request
+
+        Returns:
+            Stable cache key
+        """
+        domains = sorted({d.strip().lower() for d in request.domains or [] if d})
+        date_range = sorted((request.date_range or {}).items())
+        parts = {
+            "query": self.normalize_query(request.query),
+            "search_type": request.search_type.value,
+            "domains": domains,
+            "date_range": date_range,
+            "max_results": request.max_results or self.default_max_results,
+            "include_content": request.include_content,
+            "language": request.language,
+            # A pinned provider must not share entries with others or the fan-out
+            "provider": request.provider.value if request.provider else None,
+        }
+        digest = hashlib.sha256(
+            json.dumps(parts, ensure_ascii=False, sort_keys=True).encode()
+        ).hexdigest()
+        return digest[:32]
+
+    async def get(self, key: str) -> Optional[CachedSearch]:
+        """Look up a usable (fresh or stale) entry
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached entry, or None on miss
+        """
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and not entry.is_usable(now):
+            del self._entries[key]
+            entry = None
+
+        if entry is None and self.use_redis:
+            entry = await self._get_shared(key)
+            if entry is not None and entry.is_usable(now):
+                self._store_local(key, entry)
+            else:
+                entry = None
+
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if entry.is_fresh(now):
+            self._stats["hits"] += 1
+        else:
+            self._stats["stale_hits"] += 1
+        return entry
+
+    async def set(
+        self, key: str, search_type: SearchType, response: SearchResponse
+    ) -> CachedSearch:
+        """Store a response in both tiers
+
+        Args:
+            key: Cache key from make_key
+            search_type: Search type used to pick the TTL
+            response: Response to cache
+
+        Returns:
+            The stored entry
+        """
+        now = time.time()
+        ttl = self.ttls.get(search_type, self.ttls[SearchType.GENERAL])
+        entry = CachedSearch(
+            response=response,
+            fresh_until=now + ttl,
+            stale_until=now + ttl * (1 + self.stale_factor),
+        )
+        self._store_local(key, entry)
+
+        if self.use_redis:
+            try:
+                redis = await redis_manager.get_client()
+                await redis.set(
+                    self.key_prefix + key,
+                    entry.to_json(),
+                    ex=max(1, int(entry.stale_until - now)),
+                )
+            except Exception as e:
+                logger.warning(f"Failed to write search cache to Redis: {e}")
+
+        return entry
+
+    async def clear(self):
+        """Remove all cached entries from both tiers"""
+        self._entries.clear()
+        if not self.use_redis:
+            return
+        try:
+            redis = await redis_manager.get_client()
+            keys = [key async for key in redis.scan_iter(f"{self.key_prefix}*")]
+            if keys:
+                await redis.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Failed to clear search cache in Redis: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache hit statistics for this process
+
+        Returns:
+            Dictionary with hit, stale hit, miss and entry counts
+        """
+        return {**self._stats, "entries": len(self._entries)}
+
+    def _store_local(self, key: str, entry: CachedSearch):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _get_shared(self, key: str) -> Optional[CachedSearch]:
+        try:
+            redis = await redis_manager.get_client()
+            data = await redis.get(self.key_prefix + key)
+        except Exception as e:
+            logger.warning(f"Failed to read search cache from Redis: {e}")
+            return None
+        if not data:
+            return None
+        try:
+            return CachedSearch.from_json(data)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding malformed search cache entry: {e}")
+            return None
@@ -1,4 +1,7 @@
-from typing import List, Dict, Optional, Union
+import asyncio
+import random
+import time
+from typing import AsyncIterator, List, Dict, Optional, Tuple, Union
 from app.schemas.search import (
     SearchRequest,
     SearchResponse,
@@ -7,8 +10,13 @@ from app.schemas.search import (
     SearchError,
     SearchProviderStatus,
     SearchProvider,
+    SearchType,
 )
 from app.tools.search.base_provider import BaseSearchProvider
+from app.tools.search.content_fetcher import ContentFetcher
+from app.tools.search.openalex_provider import OpenAlexSearchProvider
+from app.tools.search.result_fusion import reciprocal_rank_fusion
+from app.tools.search.search_cache import SearchCache
 from app.tools.search.tavily_provider import TavilySearchProvider
 from app.tools.search.exa_provider import ExaSearchProvider
 from app.config.setting import settings
@@ -20,12 +28,51 @@ logger = get_logger(__name__)
 class SearchManager:
     """Manages multiple search providers with fallback support"""
 
-    def __init__(self):
-        """Initialize search manager with configured providers"""
+    def __init__(
+        self,
+        cache: Optional[SearchCache] = None,
+        content_fetcher: Optional[ContentFetcher] = None,
+    ):
+        """Initialize search manager with configured providers
+
+        Args:
+            cache: Search result cache; built from settings when omitted
+            content_fetcher: Page content pipeline; built from settings when omitted
+        """
         self.providers: Dict[SearchProvider, BaseSearchProvider] = {}
         self.default_provider = SearchProvider(settings.SEARCH_DEFAULT_PROVIDER)
         self.fallback_providers = self._parse_fallback_providers()
         self.enable_fallback = settings.SEARCH_ENABLE_FALLBACK
+        self.fanout_types = (
+            {SearchType(t) for t in settings.SEARCH_FANOUT_TYPES if t}
+            if settings.SEARCH_FANOUT_ENABLED
+            else set()
+        )
+        self.fanout_deadline = settings.SEARCH_FANOUT_DEADLINE
+
+        if cache is None and settings.SEARCH_CACHE_ENABLED:
+            cache = SearchCache(
+                max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+                ttls=settings.SEARCH_CACHE_TTLS,
+                stale_factor=settings.SEARCH_CACHE_STALE_FACTOR,
+                default_max_results=settings.SEARCH_MAX_RESULTS,
+            )
+        self.cache = cache
+        self.content_fetcher = content_fetcher or ContentFetcher(
+            batch_size=settings.SEARCH_CONTENT_BATCH_SIZE,
+            max_concurrency=settings.SEARCH_CONTENT_MAX_CONCURRENCY,
+            timeout=settings.SEARCH_CONTENT_TIMEOUT,
+            cache_ttl=settings.SEARCH_CONTENT_CACHE_TTL,
+        )
+        # Latest provider health from the background prober
+        self._health: Dict[SearchProvider, SearchProviderStatus] = {}
+        self._health_checked_at: Optional[float] = None
+        self._health_interval = settings.SEARCH_HEALTH_PROBE_INTERVAL
+        self._health_jitter = settings.SEARCH_HEALTH_PROBE_JITTER
+        self._health_timeout = settings.SEARCH_HEALTH_PROBE_TIMEOUT
+        self._probe_task: Optional[asyncio.Task] = None
+        # In-flight provider calls per cache key, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
 
         # Initialize providers
         self._initialize_providers()
@@ -74,12 +121,28 @@ class SearchManager:
             )
             self.providers[SearchProvider.EXA] = ExaSearchProvider(exa_config)
 
+        # OpenAlex needs no API key; the email only joins the polite pool
+        if settings.SEARCH_OPENALEX_ENABLED:
+            openalex_config = SearchConfig(
+                provider=SearchProvider.OPENALEX,
+                api_key=settings.OPENALEX_EMAIL or "",
+                timeout=settings.SEARCH_TIMEOUT,
+                max_results=settings.SEARCH_MAX_RESULTS,
+            )
+            self.providers[SearchProvider.OPENALEX] = OpenAlexSearchProvider(
+                openalex_config
+            )
+
         logger.info(
             f"Initialized {len(self.providers)} search providers: {list(self.providers.keys())}"
         )
 
     async def search(self, request: SearchRequest) -> SearchResponse:
-        """Perform search with fallback support
+        """Perform search with caching and fallback support
+
+        Fresh cache hits are returned directly. Stale hits are returned
+        immediately while a background refresh updates the cache. Concurrent
+        misses for the same key share a single provider call.
 
         Args:
             request: Search request parameters
@@ -90,6 +153,110 @@ class SearchManager:
         Raises:
             SearchError: If all providers fail
         """
+        if self.cache is None:
+            return await self._search_providers(request)
+
+        key = self.cache.make_key(request)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            if cached.is_fresh():
+                return self._mark_cached(cached.response, "hit")
+            self._start_fetch(key, request)
+            return self._mark_cached(cached.response, "stale")
+
+        return await asyncio.shield(self._start_fetch(key, request))
+
+    async def search_stream(
+        self, request: SearchRequest
+    ) -> AsyncIterator[Tuple[str, SearchResponse]]:
+        """Search like ``search``, yielding fan-out responses as they arrive
+
+        For fan-out searches that miss the cache, each provider's response is
+        yielded as ``("partial", response)`` as soon as that provider answers.
+        Every search ends with ``("final", response)`` carrying the same
+        (fused, cached) response ``search`` would return.
+
+        Args:
+            request: Search request parameters
+
+        Yields:
+            (kind, response) pairs, kind being ``"partial"`` or ``"final"``
+
+        Raises:
+            SearchError: If all providers fail
+        """
+        if not self._uses_fanout(request):
+            yield "final", await self.search(request)
+            return
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(request)
+            cached = await self.cache.get(key)
+            if cached is not None or key in self._inflight:
+                # Cached or already being fetched: nothing to stream early
+                yield "final", await self.search(request)
+                return
+
+        final = None
+        async for kind, response in self._fanout_events(request):
+            if kind == "final":
+                final = response
+            else:
+                yield kind, response
+        if key is not None and not final.metadata["fanout"]["timed_out"]:
+            await self.cache.set(key, request.search_type, final)
+        yield "final", final
+
+    def _start_fetch(self, key: str, request: SearchRequest) -> asyncio.Task:
+        """Start (or join) a provider call that refreshes the cache entry"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_cache(key, request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_fetch_done(key, t))
+        return task
+
+    def _on_fetch_done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Background refreshes have no awaiting caller; log their failures
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Search for cache key {key} failed: {task.exception()}")
+
+    async def _fetch_and_cache(
+        self, key: str, request: SearchRequest
+    ) -> SearchResponse:
+        response = await self._search_providers(request)
+        # Fan-out results missing a timed-out provider are served but not
+        # cached, so the next request gets another chance at the slow provider
+        if not response.metadata.get("fanout", {}).get("timed_out"):
+            await self.cache.set(key, request.search_type, response)
+        return response
+
+    @staticmethod
+    def _mark_cached(response: SearchResponse, status: str) -> SearchResponse:
+        return response.model_copy(
+            update={"metadata": {**response.metadata, "cache": status}}
+        )
+
+    async def _search_providers(self, request: SearchRequest) -> SearchResponse:
+        """Query providers in order until one succeeds
+
+        Search types listed in ``SEARCH_FANOUT_TYPES`` query all providers
+        concurrently instead, unless the request pins a provider.
+
+        Args:
+            request: Search request parameters
+
+        Returns:
+            Search response with results
+
+        Raises:
+            SearchError: If all providers fail
+        """
+        if self._uses_fanout(request):
+            return await self._search_fanout(request)
+
         # Determine provider order
         target_provider = request.provider or self.default_provider
         providers_to_try = [target_provider]
@@ -100,6 +267,10 @@ class SearchManager:
                 if fallback not in providers_to_try and fallback in self.providers:
                     providers_to_try.append(fallback)
 
+        if request.provider is None:
+            # Try providers the prober saw healthy first, keeping configured order
+            providers_to_try.sort(key=lambda p: not self._is_healthy(p))
+
         errors = []
 
         for provider_enum in providers_to_try:
@@ -138,47 +309,256 @@ class SearchManager:
             error_code="ALL_PROVIDERS_FAILED",
         )
 
+    def _uses_fanout(self, request: SearchRequest) -> bool:
+        return (
+            request.provider is None
+            and request.search_type in self.fanout_types
+            and len(self.providers) > 1
+        )
+
+    async def _search_fanout(self, request: SearchRequest) -> SearchResponse:
+        """Query all providers concurrently and fuse their results
+
+        Providers still running when ``fanout_deadline`` expires are cancelled
+        and the results that arrived in time are returned, so latency is
+        bounded by the deadline rather than the slowest provider. Results are
+        deduplicated by DOI or normalized URL and ranked by reciprocal rank
+        fusion.
+
+        Args:
+            request: Search request parameters
+
+        Returns:
+            Fused search response. ``metadata["fanout"]`` lists the providers
+            that answered, failed or timed out, and whether the result is
+            partial.
+
+        Raises:
+            SearchError: If no provider answers before the deadline
+        """
+        final = None
+        async for kind, response in self._fanout_events(request):
+            if kind == "final":
+                final = response
+        return final
+
+    async def _fanout_events(
+        self, request: SearchRequest
+    ) -> AsyncIterator[Tuple[str, SearchResponse]]:
+        """Run a fan-out search, yielding each provider's response on arrival
+
+        Yields:
+            ``("partial", response)`` per provider that answers before the
+            deadline, then ``("final", fused_response)``
+
+        Raises:
+            SearchError: If no provider answers before the deadline
+        """
+        start_time = time.time()
+        order = [self.default_provider] + [
+            p for p in self.providers if p != self.default_provider
+        ]
+        # Skip providers the prober saw unhealthy, unless that leaves none
+        order = [p for p in order if self._is_healthy(p)] or order
+        tasks = {
+            provider_enum: asyncio.create_task(
+                self.providers[provider_enum].search(request)
+            )
+            for provider_enum in order
+            if provider_enum in self.providers
+        }
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.fanout_deadline
+        pending = set(tasks.values())
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        yield "partial", task.result()
+        finally:
+            # Also runs when the consumer stops early (e.g. client disconnect)
+            for task in pending:
+                task.cancel()
+
+        responses: List[SearchResponse] = []
+        failed: Dict[str, str] = {}
+        timed_out: List[str] = []
+        for provider_enum, task in tasks.items():
+            if task in pending:
+                timed_out.append(provider_enum.value)
+            elif task.exception() is not None:
+                error = task.exception()
+                failed[provider_enum.value] = getattr(error, "message", str(error))
+            else:
+                responses.append(task.result())
+
+        if timed_out or failed:
+            logger.warning(
+                f"Fan-out search for '{request.query}' degraded: "
+                f"timed out {timed_out}, failed {failed}"
+            )
+
+        if not responses:
+            errors = [f"Provider {name} failed: {msg}" for name, msg in failed.items()]
+            errors += [f"Provider {name} timed out" for name in timed_out]
+            raise SearchError(
+                f"All search providers failed. Errors: {'; '.join(errors)}",
+                provider="search_manager",
+                error_code="ALL_PROVIDERS_FAILED",
+            )
+
+        results = reciprocal_rank_fusion(
+            [(response.provider.value, response.results) for response in responses],
+            limit=request.max_results or settings.SEARCH_MAX_RESULTS,
+        )
+        yield (
+            "final",
+            SearchResponse(
+                results=results,
+                query=request.query,
+                provider=responses[0].provider,
+                total_results=len(results),
+                search_time=time.time() - start_time,
+                metadata={
+                    "fusion": "rrf",
+                    "fanout": {
+                        "providers": [
+                            response.provider.value for response in responses
+                        ],
+                        "failed": failed,
+                        "timed_out": timed_out,
+                        "partial": bool(failed or timed_out),
+                        "deadline": self.fanout_deadline,
+                    },
+                    "provider_metadata": {
+                        response.provider.value: response.metadata
+                        for response in responses
+                    },
+                },
+            ),
+        )
+
     async def get_provider_status(
-        self, provider: Optional[SearchProvider] = None
+        self, provider: Optional[SearchProvider] = None, refresh: bool = False
     ) -> Union[SearchProviderStatus, Dict[SearchProvider, SearchProviderStatus]]:
         """Get status of one or all providers
 
+        Statuses come from the latest background probe. Live health checks
+        only run when ``refresh`` is set or the snapshot is missing or older
+        than two probe intervals (e.g. when the prober is not running).
+
         Args:
             provider: Specific provider to check, or None for all
+            refresh: Run live health checks instead of using the snapshot
 
         Returns:
             Provider status or dictionary of all statuses
         """
+        if provider and provider not in self.providers:
+            return SearchProviderStatus(
+                provider=provider,
+                available=False,
+                configured=False,
+                last_error="Provider not configured",
+            )
+
+        if (
+            refresh
+            or not self._health_fresh()
+            or (provider and provider not in self._health)
+        ):
+            await self.refresh_health([provider] if provider else None)
+
         if provider:
-            if provider not in self.providers:
-                return SearchProviderStatus(
-                    provider=provider,
-                    available=False,
-                    configured=False,
-                    last_error="Provider not configured",
-                )
-            return await self.providers[provider].health_check()
+            return self._health[provider]
+        return {p: self._health[p] for p in self.providers if p in self._health}
+
+    async def refresh_health(
+        self, providers: Optional[List[SearchProvider]] = None
+    ) -> Dict[SearchProvider, SearchProviderStatus]:
+        """Probe providers concurrently and update the health snapshot
+
+        Args:
+            providers: Providers to probe, or None for all configured ones
+
+        Returns:
+            Updated health snapshot
+        """
+        targets = [p for p in (providers or self.providers) if p in self.providers]
+        statuses = await asyncio.gather(*(self._probe(p) for p in targets))
+        self._health.update(zip(targets, statuses))
+        if providers is None:
+            self._health_checked_at = time.monotonic()
+        return dict(self._health)
+
+    async def _probe(self, provider_enum: SearchProvider) -> SearchProviderStatus:
+        provider_instance = self.providers[provider_enum]
+        try:
+            return await asyncio.wait_for(
+                provider_instance.health_check(), timeout=self._health_timeout
+            )
+        except Exception as e:
+            return SearchProviderStatus(
+                provider=provider_enum,
+                available=False,
+                configured=provider_instance.validate_config(),
+                last_error=str(e) or type(e).__name__,
+            )
+
+    def start_health_probe(self):
+        """Start refreshing provider health in the background"""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
 
-        # Get status for all providers
-        statuses = {}
-        for provider_enum, provider_instance in self.providers.items():
+    async def stop_health_probe(self):
+        """Stop the background health prober"""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
             try:
-                statuses[provider_enum] = await provider_instance.health_check()
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    async def _probe_loop(self):
+        while True:
+            try:
+                await self.refresh_health()
             except Exception as e:
-                statuses[provider_enum] = SearchProviderStatus(
-                    provider=provider_enum,
-                    available=False,
-                    configured=provider_instance.validate_config(),
-                    last_error=str(e),
-                )
+                logger.warning(f"Search provider health probe failed: {e}")
+            # Jitter keeps workers from probing providers in lockstep
+            spread = self._health_interval * self._health_jitter
+            await asyncio.sleep(
+                max(1.0, self._health_interval + random.uniform(-spread, spread))
+            )
+
+    def _health_fresh(self) -> bool:
+        return (
+            self._health_checked_at is not None
+            and time.monotonic() - self._health_checked_at < 2 * self._health_interval
+        )
 
-        return statuses
+    def _is_healthy(self, provider: SearchProvider) -> bool:
+        """Providers without a probe result yet count as healthy"""
+        status = self._health.get(provider)
+        return status is None or status.available
 
     async def get_content(
         self, urls: List[str], provider: Optional[SearchProvider] = None
     ) -> Dict[str, str]:
         """Get content for specific URLs
 
+        URLs are fetched in concurrent batches and cached per URL. URLs whose
+        content could not be retrieved are left out of the result instead of
+        failing the whole call.
+
         Args:
             urls: List of URLs to get content for
             provider: Preferred provider (defaults to Exa if available)
@@ -187,10 +567,43 @@ class SearchManager:
             Dictionary mapping URLs to their content
 
         Raises:
-            SearchError: If content retrieval fails
+            SearchError: If no provider supports content retrieval
         """
-        # Prefer Exa for content retrieval as it has dedicated endpoint
-        target_provider = provider or SearchProvider.EXA
+        provider_instance = self._get_content_provider(provider)
+        return await self.content_fetcher.fetch(provider_instance, urls)
+
+    async def iter_content(
+        self, urls: List[str], provider: Optional[SearchProvider] = None
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Stream content for specific URLs as batches complete
+
+        Args:
+            urls: List of URLs to get content for
+            provider: Preferred provider (defaults to Exa if available)
+
+        Yields:
+            Partial dictionaries mapping URLs to their content
+
+        Raises:
+            SearchError: If no provider supports content retrieval
+        """
+        provider_instance = self._get_content_provider(provider)
+        async for content in self.content_fetcher.iter_content(provider_instance, urls):
+            yield content
+
+    def _get_content_provider(
+        self, provider: Optional[SearchProvider] = None
+    ) -> BaseSearchProvider:
+        # Prefer Exa for content retrieval as it has dedicated endpoint, then
+        # any other configured provider that can extract pages
+        target_provider = provider or next(
+            (
+                candidate
+                for candidate in [SearchProvider.EXA, *self.providers]
+                if hasattr(self.providers.get(candidate), "get_content")
+            ),
+            SearchProvider.EXA,
+        )
 
         if target_provider not in self.providers:
             raise SearchError(
@@ -201,14 +614,13 @@ class SearchManager:
 
         provider_instance = self.providers[target_provider]
 
-        if hasattr(provider_instance, "get_content"):
-            return await provider_instance.get_content(urls)
-        else:
+        if not hasattr(provider_instance, "get_content"):
             raise SearchError(
                 f"Provider {target_provider.value} does not support content retrieval",
                 provider="search_manager",
                 error_code="FEATURE_NOT_SUPPORTED",
             )
+        return provider_instance
 
     async def find_similar(
         self, url: str, num_results: int = 10, provider: Optional[SearchProvider] = None
@@ -248,7 +660,8 @@ class SearchManager:
             )
 
     async def close(self):
-        """Close all provider connections"""
+        """Stop the health prober and close all provider connections"""
+        await self.stop_health_probe()
         for provider in self.providers.values():
             try:
                 await provider.close()
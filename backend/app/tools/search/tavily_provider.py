@@ -118,6 +118,44 @@ class TavilySearchProvider(BaseSearchProvider):
                 error_code="SEARCH_FAILED",
             )
 
+    async def get_content(self, urls: List[str]) -> Dict[str, str]:
+        """Get raw page content using Tavily's extract endpoint
+
+        Args:
+            urls: List of URLs to get content for
+
+        Returns:
+            Dictionary mapping URLs to their content
+        """
+        if not self.validate_config():
+            raise SearchError(
+                "Invalid Tavily configuration. API key must start with 'tvly-'",
+                provider=self.name,
+                error_code="INVALID_CONFIG",
+            )
+
+        payload = {"api_key": self.api_key, "urls": urls}
+
+        try:
+            response_data = await self._make_request(
+                method="POST", url=f"{self.BASE_URL}/extract", json_data=payload
+            )
+        except SearchError:
+            raise
+        except Exception as e:
+            logger.error(f"Tavily content retrieval error: {str(e)}")
+            raise SearchError(
+                f"Tavily content retrieval failed: {str(e)}",
+                provider=self.name,
+                error_code="CONTENT_RETRIEVAL_FAILED",
+            )
+
+        return {
+            item["url"]: item["raw_content"]
+            for item in response_data.get("results", [])
+            if item.get("url") and item.get("raw_content")
+        }
+
     def _parse_tavily_response(
         self, response_data: Dict[str, Any]
     ) -> List[SearchResult]:
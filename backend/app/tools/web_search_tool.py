@@ -1,8 +1,17 @@
+import json
 from typing import List, Optional
 from app.tools.base import BaseTool, tool
+from app.tools.result_formatter import (
+    format_web_results,
+    result_store,
+    web_result_id,
+)
+from app.tools.search.query_index import query_index
 from app.tools.search.search_manager import search_manager
+from app.config.setting import settings
 from app.schemas.search import (
     SearchRequest,
+    SearchResponse,
     SearchResult,
     SearchProvider,
     SearchType,
@@ -53,10 +62,16 @@ class WebSearchTool(BaseTool):
                 provider=SearchProvider(provider) if provider else None,
                 max_results=max_results,
             )
-            response = await search_manager.search(request)
+            response = await self._search_with_dedup(request)
 
-            # Format the response for the agent
-            formatted_results = self._format_results(response.results)
+            # Format the response for the agent; full results stay retrievable by id
+            formatted_results = self._format_results(response.results, query)
+            await result_store.save_many(
+                {
+                    web_result_id(result): result.model_dump(mode="json")
+                    for result in response.results
+                }
+            )
 
             return ToolResult(
                 result=f"Search successful. Found {len(response.results)} results.\n\n{formatted_results}",
@@ -96,10 +111,11 @@ class WebSearchTool(BaseTool):
                     for url, content in content_map.items()
                 ]
             )
-            return ToolResult(
-                result=f"Successfully retrieved content for {len(content_map)} URLs.\n\n{formatted_content}",
-                metadata=content_map,
-            )
+            result = f"Successfully retrieved content for {len(content_map)} URLs.\n\n{formatted_content}"
+            missing = [url for url in urls if url not in content_map]
+            if missing:
+                result += "\n\nNo content retrieved for: " + ", ".join(missing)
+            return ToolResult(result=result, metadata=content_map)
         except SearchError as e:
             return ToolResult(
                 error=f"Failed to get content: {e.message}",
@@ -110,22 +126,64 @@ class WebSearchTool(BaseTool):
                 error=f"An unexpected error occurred while getting content: {str(e)}"
             )
 
-    def _format_results(self, results: List[SearchResult]) -> str:
+    async def _search_with_dedup(self, request: SearchRequest) -> SearchResponse:
         """
-        Formats search results into a readable string.
+        Returns a recent response for a near-duplicate query, or searches.
         """
-        if not results:
-            return "No results found."
-
-        formatted = []
-        for i, res in enumerate(results, 1):
-            snippet = res.content or "No snippet available."
-            # Truncate snippet for display
-            if len(snippet) > 300:
-                snippet = snippet[:300] + "..."
+        if not settings.SEARCH_SEMANTIC_DEDUP_ENABLED:
+            return await search_manager.search(request)
 
-            formatted.append(
-                f"{i}. {res.title}\n   URL: {res.url}\n   Snippet: {snippet}"
+        match = query_index.lookup(request)
+        if match is not None:
+            entry, similarity = match
+            return entry.response.model_copy(
+                update={
+                    "metadata": {
+                        **entry.response.metadata,
+                        "cache": "similar",
+                        "similar_query": entry.query,
+                        "similarity": round(similarity, 3),
+                    }
+                }
             )
 
-        return "\n".join(formatted)
+        response = await search_manager.search(request)
+        if not response.metadata.get("fanout", {}).get("timed_out"):
+            query_index.add(request, response)
+        return response
+
+    @tool(
+        name="get_result_details",
+        description="Retrieves the full stored data (complete abstract or page snippet, all authors, metadata) for a search or paper result by the id shown in earlier results.",
+        parameters={
+            "result_id": {
+                "type": "string",
+                "description": "The result id, e.g. 'R1a2b3c4d' or 'W2741809807'.",
+            }
+        },
+        required=["result_id"],
+    )
+    async def get_result_details(self, result_id: str) -> ToolResult:
+        """
+        Retrieves the full data for a previously returned result.
+        """
+        details = await result_store.get(result_id)
+        if details is None:
+            return ToolResult(error=f"No stored result with id '{result_id}'.")
+        return ToolResult(
+            result=json.dumps(details, ensure_ascii=False, indent=2),
+            metadata=details,
+        )
+
+    def _format_results(
+        self,
+        results: List[SearchResult],
+        query: str = "",
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """
+        Formats search results into a compact string within a token budget.
+        """
+        return format_web_results(
+            results, query, token_budget or settings.TOOL_RESULT_TOKEN_BUDGET
+        )
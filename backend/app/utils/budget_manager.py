@@ -0,0 +1,178 @@
+"""
+Token / 费用预算管理
+
+在请求准入时检查任务级和租户级（按天）预算，预算信息来自 model_config.toml 的 [budget] 表：
+
+    [budget]
+    TASK_MAX_TOKENS = 2000000
+    TASK_MAX_COST = 20.0
+    TENANT_DAILY_MAX_TOKENS = 20000000
+    TENANT_DAILY_MAX_COST = 200.0
+    DEGRADE_RATIO = 0.9
+    DEGRADED_MAX_TOKENS = 1024
+
+预算接近或耗尽时不会拒绝请求，而是进入降级模式：优先选择低价提供商并限制输出长度，
+保证任务能够继续完成。使用量记录在 Redis 中，多个 worker 共享。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from app.services.redis_manager import redis_manager
+from app.utils.log_util import logger
+
+
+@dataclass
+class BudgetDecision:
+    """预算准入结果"""
+
+    degraded: bool = False  # 是否进入降级模式
+    reason: str = ""  # 降级原因
+    max_tokens: Optional[int] = None  # 降级时的输出 token 上限
+
+
+class BudgetManager:
+    """基于 Redis 的任务 / 租户预算管理器"""
+
+    DEFAULT_DEGRADE_RATIO = 0.9
+    DEFAULT_DEGRADED_MAX_TOKENS = 1024
+
+    TASK_TTL = 7 * 24 * 3600
+    TENANT_TTL = 2 * 24 * 3600
+
+    def __init__(self, loader: Optional[Any] = None):
+        # loader 默认为全局 config_loader，延迟获取以避免循环导入
+        self._loader = loader
+
+    async def check(
+        self,
+        task_id: str,
+        tenant: str,
+        estimated_tokens: int = 0,
+        estimated_cost: float = 0.0,
+    ) -> BudgetDecision:
+        """
+        请求准入检查
+
+        Args:
+            task_id: 任务 ID
+            tenant: 租户标识
+            estimated_tokens: 本次请求预估的 token 数
+            estimated_cost: 本次请求预估的费用
+
+        Returns:
+            BudgetDecision: 准入结果（永远放行，必要时标记为降级）
+        """
+        config = self._get_config()
+        if not self._has_limits(config):
+            return BudgetDecision()
+
+        ratio = float(config.get("DEGRADE_RATIO", self.DEFAULT_DEGRADE_RATIO))
+        usage = await self.get_usage(task_id, tenant)
+
+        checks = [
+            (
+                "task tokens",
+                usage["task"]["tokens"] + estimated_tokens,
+                "TASK_MAX_TOKENS",
+            ),
+            ("task cost", usage["task"]["cost"] + estimated_cost, "TASK_MAX_COST"),
+            (
+                "tenant daily tokens",
+                usage["tenant"]["tokens"] + estimated_tokens,
+                "TENANT_DAILY_MAX_TOKENS",
+            ),
+            (
+                "tenant daily cost",
+                usage["tenant"]["cost"] + estimated_cost,
+                "TENANT_DAILY_MAX_COST",
+            ),
+        ]
+        for name, used, limit_key in checks:
+            limit = config.get(limit_key)
+            if limit and used >= float(limit) * ratio:
+                return BudgetDecision(
+                    degraded=True,
+                    reason=f"{name} {used:.4g}/{limit}",
+                    max_tokens=int(
+                        config.get(
+                            "DEGRADED_MAX_TOKENS", self.DEFAULT_DEGRADED_MAX_TOKENS
+                        )
+                    ),
+                )
+
+        return BudgetDecision()
+
+    async def record_usage(self, task_id: str, tenant: str, tokens: int, cost: float):
+        """记录一次请求的 token 和费用"""
+        if tokens <= 0 and cost <= 0:
+            return
+        try:
+            redis = await redis_manager.get_client()
+            for key, ttl in (
+                (self._task_key(task_id), self.TASK_TTL),
+                (self._tenant_key(tenant), self.TENANT_TTL),
+            ):
+                await redis.hincrby(key, "tokens", int(tokens))
+                await redis.hincrbyfloat(key, "cost", float(cost))
+                await redis.expire(key, ttl)
+        except Exception as e:
+            logger.warning(f"Failed to record budget usage for {task_id}: {e}")
+
+    async def get_usage(self, task_id: str, tenant: str) -> Dict[str, Dict[str, Any]]:
+        """获取任务和租户当天的使用量"""
+        usage = {
+            "task": {"tokens": 0, "cost": 0.0},
+            "tenant": {"tokens": 0, "cost": 0.0},
+        }
+        try:
+            redis = await redis_manager.get_client()
+            for scope, key in (
+                ("task", self._task_key(task_id)),
+                ("tenant", self._tenant_key(tenant)),
+            ):
+                data = await redis.hgetall(key)
+                usage[scope]["tokens"] = int(data.get("tokens", 0))
+                usage[scope]["cost"] = float(data.get("cost", 0.0))
+        except Exception as e:
+            logger.warning(f"Failed to read budget usage for {task_id}: {e}")
+        return usage
+
+    async def reset(self, task_id: str, tenant: str):
+        """重置任务和租户当天的使用量"""
+        try:
+            redis = await redis_manager.get_client()
+            await redis.delete(self._task_key(task_id), self._tenant_key(tenant))
+        except Exception as e:
+            logger.warning(f"Failed to reset budget usage for {task_id}: {e}")
+
+    def _get_config(self) -> Dict[str, Any]:
+        if self._loader is None:
+            from app.utils.config_loader import config_loader
+
+            self._loader = config_loader
+        return self._loader.get_budget_config()
+
+    @staticmethod
+    def _has_limits(config: Dict[str, Any]) -> bool:
+        return any(
+            config.get(key)
+            for key in (
+                "TASK_MAX_TOKENS",
+                "TASK_MAX_COST",
+                "TENANT_DAILY_MAX_TOKENS",
+                "TENANT_DAILY_MAX_COST",
+            )
+        )
+
+    @staticmethod
+    def _task_key(task_id: str) -> str:
+        return f"budget:task:{task_id}"
+
+    @staticmethod
+    def _tenant_key(tenant: str) -> str:
+        return f"budget:tenant:{tenant}:{time.strftime('%Y%m%d')}"
+
+
+# 全局预算管理器
+budget_manager = BudgetManager()
@@ -0,0 +1,307 @@
+"""
+熔断器模块
+
+为每个 LLM 提供商（API Key）实现 closed / open / half-open 状态机：
+- CLOSED：正常放行，在滑动时间窗口内统计错误率
+- OPEN：错误率超过阈值后熔断，冷却期内直接拒绝请求，不再浪费一次完整超时
+- HALF_OPEN：冷却期结束后只放行有限数量的探测请求，探测成功则恢复，失败则重新熔断
+
+状态变化写入 Redis，多个 worker 共享同一提供商的熔断状态；
+半开状态下的探测名额也通过 Redis 计数，避免所有 worker 同时涌向可能仍不可用的端点。
+Redis 不可用时退化为进程内状态。
+"""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Optional, Deque, Tuple, Dict, Any
+from app.services.redis_manager import redis_manager
+from app.utils.log_util import logger
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """基于错误率窗口的熔断器，状态通过 Redis 在 worker 之间共享"""
+
+    def __init__(
+        self,
+        identifier: str,  # 唯一标识符（与 RateLimiter 相同，为 API Key 的哈希值）
+        failure_rate_threshold: float = 0.5,  # 触发熔断的错误率
+        window_seconds: int = 60,  # 错误率统计窗口
+        min_requests: int = 5,  # 窗口内最少请求数，样本过少时不熔断
+        open_seconds: float = 30,  # 熔断后的冷却时间
+        half_open_max_probes: int = 1,  # 半开状态下允许同时进行的探测请求数
+        sync_interval: float = 1.0,  # 从 Redis 同步共享状态的最小间隔
+    ):
+        self.identifier = identifier
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_max_probes = half_open_max_probes
+        self.sync_interval = sync_interval
+
+        # Redis key
+        self.state_key = f"circuit_breaker:{identifier}:state"
+        self.probes_key = f"circuit_breaker:{identifier}:probes"
+
+        # 进程内状态
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.updated_at = 0.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._last_probe_at = 0.0
+        self._last_sync = 0.0
+
+    def is_available(self) -> bool:
+        """
+        根据本地状态判断是否可能放行请求（不修改状态，不访问 Redis）
+
+        用于快速过滤候选提供商；真正放行前需调用 allow_request。
+        """
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            return time.time() - self.opened_at >= self.open_seconds
+        self._expire_probes(time.time())
+        return self._probes_in_flight < self.half_open_max_probes
+
+    async def allow_request(self) -> bool:
+        """
+        申请发起一次请求
+
+        Returns:
+            bool: 是否放行。半开状态下放行即占用一个探测名额，
+            若请求最终未发出，需要调用 release() 归还。
+        """
+        await self._sync_from_redis()
+
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        now = time.time()
+        if self.state == CircuitState.OPEN:
+            if now - self.opened_at < self.open_seconds:
+                return False
+            await self._transition(CircuitState.HALF_OPEN, now)
+
+        # HALF_OPEN：只放行有限的探测请求
+        self._expire_probes(now)
+        if self._probes_in_flight >= self.half_open_max_probes:
+            return False
+        if not await self._acquire_shared_probe():
+            return False
+
+        self._probes_in_flight += 1
+        self._last_probe_at = now
+        logger.info(
+            f"Circuit half-open for {self.identifier}, sending probe request "
+            f"({self._probes_in_flight}/{self.half_open_max_probes})"
+        )
+        return True
+
+    async def release(self):
+        """归还未得出结果的探测名额（例如请求被速率限制拦截或被取消）"""
+        if self.state != CircuitState.HALF_OPEN or self._probes_in_flight <= 0:
+            return
+        self._probes_in_flight -= 1
+        try:
+            redis = await redis_manager.get_client()
+            await redis.decr(self.probes_key)
+        except Exception as e:
+            logger.warning(f"Failed to release shared probe for {self.identifier}: {e}")
+
+    async def record_success(self):
+        """记录成功请求"""
+        now = time.time()
+        if self.state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_max_probes:
+                logger.info(f"Circuit closed for {self.identifier}, probe succeeded")
+                await self._transition(CircuitState.CLOSED, now)
+            return
+
+        self._record_outcome(now, True)
+
+    async def record_failure(self):
+        """记录失败请求"""
+        now = time.time()
+        if self.state == CircuitState.HALF_OPEN:
+            logger.warning(f"Circuit re-opened for {self.identifier}, probe failed")
+            await self._transition(CircuitState.OPEN, now)
+            return
+
+        self._record_outcome(now, False)
+        if self.state == CircuitState.CLOSED and self._should_trip(now):
+            total, failures = self._window_counts(now)
+            logger.warning(
+                f"Circuit opened for {self.identifier}: "
+                f"{failures}/{total} failures in {self.window_seconds}s"
+            )
+            await self._transition(CircuitState.OPEN, now)
+
+    def get_failure_rate(self) -> float:
+        """获取当前窗口内的错误率"""
+        total, failures = self._window_counts(time.time())
+        return failures / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取熔断器统计信息"""
+        now = time.time()
+        total, failures = self._window_counts(now)
+        retry_after = 0.0
+        if self.state == CircuitState.OPEN:
+            retry_after = max(0.0, self.open_seconds - (now - self.opened_at))
+        return {
+            "state": self.state.value,
+            "window_requests": total,
+            "window_failures": failures,
+            "failure_rate": failures / total if total else 0.0,
+            "retry_after": retry_after,
+            "probes_in_flight": self._probes_in_flight,
+        }
+
+    async def reset(self):
+        """重置熔断器（本地与 Redis 状态）"""
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.updated_at = 0.0
+        self._outcomes.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._last_sync = 0.0
+        try:
+            redis = await redis_manager.get_client()
+            await redis.delete(self.state_key, self.probes_key)
+        except Exception as e:
+            logger.warning(f"Failed to reset circuit state in Redis: {e}")
+
+    def _expire_probes(self, now: float):
+        """探测名额与 Redis 中的计数一样在 _probe_ttl 后过期，避免未归还的名额永久占用"""
+        if self._probes_in_flight and now - self._last_probe_at >= self._probe_ttl():
+            logger.warning(f"Probe for {self.identifier} timed out, releasing slot")
+            self._probes_in_flight = 0
+
+    def _record_outcome(self, now: float, success: bool):
+        self._outcomes.append((now, success))
+        self._prune(now)
+
+    def _prune(self, now: float):
+        window_start = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] <= window_start:
+            self._outcomes.popleft()
+
+    def _window_counts(self, now: float) -> Tuple[int, int]:
+        self._prune(now)
+        total = len(self._outcomes)
+        failures = sum(1 for _, success in self._outcomes if not success)
+        return total, failures
+
+    def _should_trip(self, now: float) -> bool:
+        total, failures = self._window_counts(now)
+        if total < self.min_requests:
+            return False
+        return failures / total >= self.failure_rate_threshold
+
+    async def _transition(self, state: CircuitState, now: float):
+        """切换状态并写入 Redis"""
+        self.state = state
+        self.updated_at = now
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == CircuitState.OPEN:
+            self.opened_at = now
+        elif state == CircuitState.CLOSED:
+            self.opened_at = 0.0
+            self._outcomes.clear()
+
+        try:
+            redis = await redis_manager.get_client()
+            await redis.hset(
+                self.state_key,
+                mapping={
+                    "state": state.value,
+                    "opened_at": self.opened_at,
+                    "updated_at": now,
+                },
+            )
+            await redis.expire(self.state_key, self._state_ttl())
+            if state != CircuitState.HALF_OPEN:
+                await redis.delete(self.probes_key)
+        except Exception as e:
+            logger.warning(f"Failed to share circuit state for {self.identifier}: {e}")
+
+    async def _sync_from_redis(self):
+        """从 Redis 拉取其他 worker 写入的较新状态"""
+        now = time.time()
+        if now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+
+        try:
+            redis = await redis_manager.get_client()
+            data = await redis.hgetall(self.state_key)
+        except Exception as e:
+            logger.warning(f"Failed to read circuit state for {self.identifier}: {e}")
+            return
+        if not data:
+            return
+
+        try:
+            remote_state = CircuitState(data.get("state"))
+            remote_updated_at = float(data.get("updated_at", 0))
+            remote_opened_at = float(data.get("opened_at", 0))
+        except (ValueError, TypeError):
+            return
+
+        if remote_updated_at <= self.updated_at or remote_state == self.state:
+            return
+
+        logger.info(
+            f"Circuit for {self.identifier} synced from shared state: "
+            f"{self.state.value} -> {remote_state.value}"
+        )
+        self.state = remote_state
+        self.updated_at = remote_updated_at
+        self.opened_at = remote_opened_at
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if remote_state == CircuitState.CLOSED:
+            self._outcomes.clear()
+
+    async def _acquire_shared_probe(self) -> bool:
+        """在 Redis 中占用一个探测名额，保证所有 worker 合计不超过上限"""
+        try:
+            redis = await redis_manager.get_client()
+            count = await redis.incr(self.probes_key)
+            if count == 1:
+                await redis.expire(self.probes_key, self._probe_ttl())
+            if count > self.half_open_max_probes:
+                await redis.decr(self.probes_key)
+                return False
+        except Exception as e:
+            logger.warning(f"Failed to acquire shared probe for {self.identifier}: {e}")
+        return True
+
+    def _state_ttl(self) -> int:
+        return int(max(self.window_seconds, self.open_seconds) * 2) + 1
+
+    def _probe_ttl(self) -> int:
+        return int(self.open_seconds) + 1
+
+
+def create_circuit_breaker(
+    identifier: str, config: Optional[Dict[str, Any]] = None
+) -> CircuitBreaker:
+    """根据配置字典创建熔断器，未提供的参数使用默认值"""
+    return CircuitBreaker(identifier=identifier, **(config or {}))
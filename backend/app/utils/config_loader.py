@@ -206,6 +206,35 @@ class ConfigLoader:
             "retry_delay": current_config.get(f"{agent_name}_RETRY_DELAY", 1.0),
         }
 
+    def get_circuit_breaker_config(self, agent_name: str) -> Dict[str, Any]:
+        """获取熔断器配置（仅返回显式配置的项，其余使用 CircuitBreaker 默认值）"""
+        agent_name = agent_name.upper()
+        current_config = self.config_data.get(self.current_config_name, {})
+
+        keys = {
+            "failure_rate_threshold": f"{agent_name}_CIRCUIT_FAILURE_RATE",
+            "window_seconds": f"{agent_name}_CIRCUIT_WINDOW_SECONDS",
+            "min_requests": f"{agent_name}_CIRCUIT_MIN_REQUESTS",
+            "open_seconds": f"{agent_name}_CIRCUIT_OPEN_SECONDS",
+            "half_open_max_probes": f"{agent_name}_CIRCUIT_HALF_OPEN_PROBES",
+        }
+
+        return {
+            name: current_config[key]
+            for name, key in keys.items()
+            if key in current_config
+        }
+
+    def get_pricing_config(self) -> Dict[str, Any]:
+        """获取模型价格配置（顶层 [pricing] 表，所有配置共享）"""
+        pricing = self.config_data.get("pricing", {})
+        return pricing if isinstance(pricing, dict) else {}
+
+    def get_budget_config(self) -> Dict[str, Any]:
+        """获取预算配置（顶层 [budget] 表，所有配置共享）"""
+        budget = self.config_data.get("budget", {})
+        return budget if isinstance(budget, dict) else {}
+
     def reload(self):
         """重新加载配置"""
         self.config_data = self._load_config()
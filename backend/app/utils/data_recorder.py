@@ -1,6 +1,7 @@
 import json
 import os
 from app.utils.log_util import logger
+from app.utils.pricing import pricing_registry
 from typing import Any, Dict
 
 
@@ -193,22 +194,5 @@ class DataRecorder:
         Returns:
             float: 费用（rmb）
         """
-        # 定义模型价格（每1000个token的价格，单位：rmb）
-        model_prices = {
-            "gpt-4-turbo-preview": {"prompt": 0.01, "completion": 0.03},
-            "gpt-4": {"prompt": 0.03, "completion": 0.06},
-            "gpt-3.5-turbo": {"prompt": 0.0005, "completion": 0.0015},
-            "qwen-max-latest": {"prompt": 0.0024, "completion": 0.0096},  # 示例价格
-        }
-
-        # 获取模型价格，如果模型不在列表中使用默认价格
-        model_price = model_prices.get(
-            model,
-            {"prompt": 0.0001, "completion": 0.0001},  # 默认价格
-        )
-
-        # 计算费用（将token数转换为千分比）
-        prompt_cost = (prompt_tokens / 1000.0) * model_price["prompt"]
-        completion_cost = (completion_tokens / 1000.0) * model_price["completion"]
-
-        return prompt_cost + completion_cost
+        # 价格来自全局价格注册表（model_config.toml 的 [pricing] 表）
+        return pricing_registry.calculate_cost(model, prompt_tokens, completion_tokens)
@@ -0,0 +1,113 @@
+"""
+模型价格注册表
+
+价格来自 model_config.toml 中的 [pricing] 表，未配置的模型使用内置默认价格：
+
+    [pricing]
+    default = { prompt = 0.0001, completion = 0.0001 }
+    "gpt-4" = { prompt = 0.03, completion = 0.06 }
+
+价格单位为每 1000 个 token 的费用。配置热重载后自动生效。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+from app.utils.log_util import logger
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """模型价格（每 1000 个 token）"""
+
+    prompt: float
+    completion: float
+
+    @property
+    def blended(self) -> float:
+        """输入输出价格之和，用于比较不同模型的相对成本"""
+        return self.prompt + self.completion
+
+
+# 内置默认价格（未在配置中覆盖时使用）
+DEFAULT_MODEL_PRICES: Dict[str, ModelPrice] = {
+    "gpt-4-turbo-preview": ModelPrice(prompt=0.01, completion=0.03),
+    "gpt-4": ModelPrice(prompt=0.03, completion=0.06),
+    "gpt-3.5-turbo": ModelPrice(prompt=0.0005, completion=0.0015),
+    "qwen-max-latest": ModelPrice(prompt=0.0024, completion=0.0096),
+}
+DEFAULT_PRICE = ModelPrice(prompt=0.0001, completion=0.0001)
+
+
+class PricingRegistry:
+    """模型价格注册表"""
+
+    def __init__(self, loader: Optional[Any] = None):
+        # loader 默认为全局 config_loader，延迟获取以避免循环导入
+        self._loader = loader
+        self._source: Optional[Dict[str, Any]] = None
+        self._prices: Dict[str, ModelPrice] = dict(DEFAULT_MODEL_PRICES)
+        self._default = DEFAULT_PRICE
+
+    def get_price(self, model: str) -> ModelPrice:
+        """
+        获取模型价格
+
+        依次匹配完整模型名和去掉提供商前缀后的名称（如 openai/gpt-4 -> gpt-4），
+        都未命中时返回默认价格。
+        """
+        self._refresh()
+        model = model or ""
+        price = self._prices.get(model)
+        if price is None and "/" in model:
+            price = self._prices.get(model.rsplit("/", 1)[-1])
+        return price or self._default
+
+    def calculate_cost(
+        self, model: str, prompt_tokens: int, completion_tokens: int
+    ) -> float:
+        """计算一次调用的费用"""
+        price = self.get_price(model)
+        return (prompt_tokens / 1000.0) * price.prompt + (
+            completion_tokens / 1000.0
+        ) * price.completion
+
+    def estimate_cost(self, model: str, tokens: int) -> float:
+        """按输入输出混合价格粗略估算费用（token 数未区分输入输出时使用）"""
+        return (tokens / 1000.0) * self.get_price(model).blended / 2
+
+    def _get_loader(self):
+        if self._loader is None:
+            from app.utils.config_loader import config_loader
+
+            self._loader = config_loader
+        return self._loader
+
+    def _refresh(self):
+        """配置数据被替换（重新加载）后重建价格表"""
+        loader = self._get_loader()
+        if loader.config_data is self._source:
+            return
+        self._source = loader.config_data
+
+        prices = dict(DEFAULT_MODEL_PRICES)
+        default = DEFAULT_PRICE
+        for model, value in loader.get_pricing_config().items():
+            try:
+                price = ModelPrice(
+                    prompt=float(value["prompt"]),
+                    completion=float(value["completion"]),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Invalid pricing config for {model}: {e}")
+                continue
+            if model == "default":
+                default = price
+            else:
+                prices[model] = price
+
+        self._prices = prices
+        self._default = default
+
+
+# 全局价格注册表
+pricing_registry = PricingRegistry()
@@ -2,19 +2,26 @@
 LLM 提供商和 API Key 管理器
 
 支持：
-- 多 API Key 轮询（Round-robin、Least-used、Random）
+- 多 API Key 轮询（Round-robin、Least-used、Random、Cost-optimized）
 - 多提供商故障转移
 - 自动跳过超限的 Key 和提供商
-- 健康状态追踪
+- 健康状态追踪（基于错误率的熔断器，支持半开探测）
 """
 
+import asyncio
 import hashlib
 import random
 import time
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from enum import Enum
 from dataclasses import dataclass, field
-from app.utils.rate_limiter import RateLimiter, RateLimitExceeded
+from app.utils.rate_limiter import (
+    RateLimiter,
+    RateLimitExceeded,
+    get_bulk_usage_stats,
+)
+from app.utils.circuit_breaker import CircuitBreaker, create_circuit_breaker
+from app.utils.pricing import pricing_registry
 from app.utils.log_util import logger
 
 
@@ -24,6 +31,7 @@ class RotationStrategy(str, Enum):
     ROUND_ROBIN = "round-robin"
     LEAST_USED = "least-used"
     RANDOM = "random"
+    COST_OPTIMIZED = "cost-optimized"
 
 
 @dataclass
@@ -45,23 +53,39 @@ class ProviderConfig:
     last_failure_time: float = field(default=0.0, init=False)
     total_requests: int = field(default=0, init=False)
 
-    def get_identifier(self) -> str:
-        """获取唯一标识符（API Key 的哈希值）"""
+    # 缓存字段：标识符在创建时计算一次，速率限制器和熔断器由 ProviderManager 绑定
+    identifier: str = field(default="", init=False, repr=False)
+    rate_limiter: Optional[RateLimiter] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    circuit_breaker: Optional[CircuitBreaker] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.identifier = self._compute_identifier()
+
+    def _compute_identifier(self) -> str:
         return hashlib.sha256(f"{self.name}:{self.api_key}".encode()).hexdigest()[:16]
 
+    def get_identifier(self) -> str:
+        """获取唯一标识符（API Key 的哈希值，创建时预先计算）"""
+        return self.identifier
+
     def is_healthy(
         self, failure_threshold: int = 5, cooldown_seconds: int = 300
     ) -> bool:
-        """检查提供商是否健康"""
+        """检查提供商是否健康（只读，不修改任何状态）"""
         if not self.enabled:
             return False
 
-        # 如果失败次数超过阈值，检查是否已过冷却期
+        # 绑定了熔断器时以熔断器状态为准
+        if self.circuit_breaker is not None:
+            return self.circuit_breaker.is_available()
+
+        # 未绑定熔断器时，失败次数超过阈值则在冷却期内视为不健康
         if self.failure_count >= failure_threshold:
-            if time.time() - self.last_failure_time < cooldown_seconds:
-                return False
-            # 冷却期已过，重置失败计数
-            self.failure_count = 0
+            return time.time() - self.last_failure_time >= cooldown_seconds
 
         return True
 
@@ -86,48 +110,105 @@ class ProviderManager:
         rotation_strategy: RotationStrategy = RotationStrategy.ROUND_ROBIN,
         auto_retry: bool = True,
         max_retries: int = 3,
+        circuit_breaker_config: Optional[Dict[str, Any]] = None,
+        stats_cache_ttl: float = 2.0,
     ):
         self.providers = sorted(providers, key=lambda p: p.priority)
         self.rotation_strategy = rotation_strategy
         self.auto_retry = auto_retry
         self.max_retries = max_retries
+        self.circuit_breaker_config = circuit_breaker_config or {}
 
-        # 为每个提供商创建速率限制器
+        # 为每个提供商创建速率限制器和熔断器，并直接绑定到提供商上，避免每次选择时查表
         self.rate_limiters: Dict[str, RateLimiter] = {}
+        self._providers_by_id: Dict[str, ProviderConfig] = {}
         for provider in self.providers:
-            identifier = provider.get_identifier()
-            self.rate_limiters[identifier] = RateLimiter(
+            identifier = provider.identifier
+            rate_limiter = RateLimiter(
                 identifier=identifier,
                 rpm=provider.rpm,
                 tpm=provider.tpm,
                 rpd=provider.rpd,
             )
+            provider.rate_limiter = rate_limiter
+            provider.circuit_breaker = create_circuit_breaker(
+                identifier, self.circuit_breaker_config
+            )
+            self.rate_limiters[identifier] = rate_limiter
+            self._providers_by_id[identifier] = provider
 
         # 轮询索引（用于 round-robin 策略）
         self.current_index = 0
 
+        # 统计信息快照：短时间内的多次查询（如多个仪表盘轮询）共享同一份结果
+        self.stats_cache_ttl = stats_cache_ttl
+        self._stats_snapshot: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        self._stats_lock = asyncio.Lock()
+
+    def inherit_state(self, previous: "ProviderManager"):
+        """
+        从旧的管理器继承运行时状态（配置热重载时使用）
+
+        相同标识符的提供商保留健康状态、请求计数；熔断参数未变化时复用原熔断器，
+        限额未变化时直接复用原速率限制器，以保留本地 RPM 滑动窗口。
+
+        Args:
+            previous: 被替换的旧管理器
+        """
+        for provider in self.providers:
+            old = previous.get_provider_by_identifier(provider.identifier)
+            if old is None:
+                continue
+
+            provider.failure_count = old.failure_count
+            provider.last_failure_time = old.last_failure_time
+            provider.total_requests = old.total_requests
+
+            if (
+                old.circuit_breaker is not None
+                and previous.circuit_breaker_config == self.circuit_breaker_config
+            ):
+                provider.circuit_breaker = old.circuit_breaker
+
+            if old.rate_limiter is not None and (old.rpm, old.tpm, old.rpd) == (
+                provider.rpm,
+                provider.tpm,
+                provider.rpd,
+            ):
+                provider.rate_limiter = old.rate_limiter
+                self.rate_limiters[provider.identifier] = old.rate_limiter
+
+        if self.providers:
+            self.current_index = previous.current_index % len(self.providers)
+
     async def get_next_provider(
         self,
         estimated_tokens: int = 0,
-        exclude_providers: Optional[List[str]] = None,
+        exclude_providers: Optional[Iterable[str]] = None,
+        prefer_cheap: bool = False,
     ) -> Optional[ProviderConfig]:
         """
         获取下一个可用的提供商
 
         Args:
             estimated_tokens: 预估的 token 使用量
-            exclude_providers: 要排除的提供商标识符列表
+            exclude_providers: 要排除的提供商标识符集合（也接受列表）
+            prefer_cheap: 是否优先使用低价提供商（用于低重要性调用或预算降级），
+                为 True 时忽略配置的轮询策略
 
         Returns:
             ProviderConfig: 可用的提供商配置，如果没有可用的则返回 None
         """
-        exclude_providers = exclude_providers or []
+        if exclude_providers is None:
+            excluded = frozenset()
+        elif isinstance(exclude_providers, (set, frozenset)):
+            excluded = exclude_providers
+        else:
+            excluded = set(exclude_providers)
 
         # 过滤健康的提供商
         healthy_providers = [
-            p
-            for p in self.providers
-            if p.is_healthy() and p.get_identifier() not in exclude_providers
+            p for p in self.providers if p.identifier not in excluded and p.is_healthy()
         ]
 
         if not healthy_providers:
@@ -135,7 +216,9 @@ class ProviderManager:
             return None
 
         # 根据策略选择提供商
-        if self.rotation_strategy == RotationStrategy.ROUND_ROBIN:
+        if prefer_cheap or self.rotation_strategy == RotationStrategy.COST_OPTIMIZED:
+            provider = await self._select_cheapest(healthy_providers, estimated_tokens)
+        elif self.rotation_strategy == RotationStrategy.ROUND_ROBIN:
             provider = await self._select_round_robin(
                 healthy_providers, estimated_tokens
             )
@@ -163,19 +246,10 @@ class ProviderManager:
             provider = providers[self.current_index % len(providers)]
             self.current_index = (self.current_index + 1) % len(providers)
 
-            # 检查速率限制
-            identifier = provider.get_identifier()
-            rate_limiter = self.rate_limiters[identifier]
-
-            try:
-                await rate_limiter.check_and_increment_request(estimated_tokens)
+            # 检查熔断器和速率限制
+            if await self._try_acquire(provider, estimated_tokens):
                 return provider
-            except RateLimitExceeded:
-                logger.warning(
-                    f"Provider {provider.name} rate limit exceeded, trying next"
-                )
-                attempts += 1
-                continue
+            attempts += 1
 
         return None
 
@@ -189,17 +263,8 @@ class ProviderManager:
         sorted_providers = sorted(providers, key=lambda p: p.total_requests)
 
         for provider in sorted_providers:
-            identifier = provider.get_identifier()
-            rate_limiter = self.rate_limiters[identifier]
-
-            try:
-                await rate_limiter.check_and_increment_request(estimated_tokens)
+            if await self._try_acquire(provider, estimated_tokens):
                 return provider
-            except RateLimitExceeded:
-                logger.warning(
-                    f"Provider {provider.name} rate limit exceeded, trying next"
-                )
-                continue
 
         return None
 
@@ -214,20 +279,56 @@ class ProviderManager:
         random.shuffle(shuffled)
 
         for provider in shuffled:
-            identifier = provider.get_identifier()
-            rate_limiter = self.rate_limiters[identifier]
+            if await self._try_acquire(provider, estimated_tokens):
+                return provider
+
+        return None
+
+    async def _select_cheapest(
+        self,
+        providers: List[ProviderConfig],
+        estimated_tokens: int,
+    ) -> Optional[ProviderConfig]:
+        """Cost-optimized 选择策略：按模型价格从低到高尝试，同价时按优先级"""
+        sorted_providers = sorted(
+            providers,
+            key=lambda p: (pricing_registry.get_price(p.model).blended, p.priority),
+        )
 
-            try:
-                await rate_limiter.check_and_increment_request(estimated_tokens)
+        for provider in sorted_providers:
+            if await self._try_acquire(provider, estimated_tokens):
                 return provider
-            except RateLimitExceeded:
-                logger.warning(
-                    f"Provider {provider.name} rate limit exceeded, trying next"
-                )
-                continue
 
         return None
 
+    async def _try_acquire(
+        self, provider: ProviderConfig, estimated_tokens: int
+    ) -> bool:
+        """
+        尝试占用提供商：先经过熔断器（半开时只放行探测请求），再检查速率限制
+
+        Returns:
+            bool: 是否可以使用该提供商发起请求
+        """
+        breaker = provider.circuit_breaker
+        if breaker is not None and not await breaker.allow_request():
+            logger.warning(f"Provider {provider.name} circuit open, trying next")
+            return False
+
+        try:
+            await provider.rate_limiter.check_and_increment_request(estimated_tokens)
+            return True
+        except RateLimitExceeded:
+            logger.warning(f"Provider {provider.name} rate limit exceeded, trying next")
+            if breaker is not None:
+                await breaker.release()
+            return False
+
+    async def release_provider(self, provider: ProviderConfig):
+        """请求未得出结果（如被取消）时归还熔断器的半开探测名额，不计入成败"""
+        if provider.circuit_breaker is not None:
+            await provider.circuit_breaker.release()
+
     async def record_request_result(
         self,
         provider: ProviderConfig,
@@ -249,36 +350,71 @@ class ProviderManager:
         else:
             provider.record_failure()
 
+        if provider.circuit_breaker is not None:
+            if success:
+                await provider.circuit_breaker.record_success()
+            else:
+                await provider.circuit_breaker.record_failure()
+
         # 更新实际 token 使用量
         if actual_tokens > 0:
-            identifier = provider.get_identifier()
-            rate_limiter = self.rate_limiters[identifier]
-            await rate_limiter.record_actual_tokens(actual_tokens, estimated_tokens)
+            await self._get_rate_limiter(provider).record_actual_tokens(
+                actual_tokens, estimated_tokens
+            )
 
-    async def get_all_stats(self) -> List[Dict[str, Any]]:
-        """获取所有提供商的统计信息"""
-        stats = []
-        for provider in self.providers:
-            identifier = provider.get_identifier()
-            rate_limiter = self.rate_limiters[identifier]
-
-            provider_stats = {
-                "name": provider.name,
-                "model": provider.model,
-                "priority": provider.priority,
-                "enabled": provider.enabled,
-                "healthy": provider.is_healthy(),
-                "total_requests": provider.total_requests,
-                "failure_count": provider.failure_count,
-                "rate_limits": await rate_limiter.get_usage_stats(),
-            }
-            stats.append(provider_stats)
-
-        return stats
+    async def get_all_stats(self, use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        获取所有提供商的统计信息
+
+        所有速率限制器的用量在一次 Redis 往返中批量读取；结果缓存 stats_cache_ttl 秒，
+        并发请求等待同一次读取而不是各自访问 Redis。返回的列表为共享快照，调用方不应修改。
+
+        Args:
+            use_cache: 是否允许使用缓存的快照
+        """
+        if use_cache and self._snapshot_fresh():
+            return self._stats_snapshot[1]
+
+        async with self._stats_lock:
+            # 等待锁期间其他请求可能已经刷新了快照
+            if use_cache and self._snapshot_fresh():
+                return self._stats_snapshot[1]
+
+            usage_stats = await get_bulk_usage_stats(
+                [self._get_rate_limiter(p) for p in self.providers]
+            )
+            stats = []
+            for provider, rate_limits in zip(self.providers, usage_stats):
+                provider_stats = {
+                    "name": provider.name,
+                    "model": provider.model,
+                    "priority": provider.priority,
+                    "enabled": provider.enabled,
+                    "healthy": provider.is_healthy(),
+                    "total_requests": provider.total_requests,
+                    "failure_count": provider.failure_count,
+                    "circuit": provider.circuit_breaker.get_stats()
+                    if provider.circuit_breaker
+                    else None,
+                    "rate_limits": rate_limits,
+                }
+                stats.append(provider_stats)
+
+            self._stats_snapshot = (time.monotonic(), stats)
+            return stats
+
+    def _snapshot_fresh(self) -> bool:
+        return (
+            self._stats_snapshot is not None
+            and time.monotonic() - self._stats_snapshot[0] < self.stats_cache_ttl
+        )
 
     def get_provider_by_identifier(self, identifier: str) -> Optional[ProviderConfig]:
         """根据标识符获取提供商"""
-        for provider in self.providers:
-            if provider.get_identifier() == identifier:
-                return provider
-        return None
+        return self._providers_by_id.get(identifier)
+
+    def _get_rate_limiter(self, provider: ProviderConfig) -> RateLimiter:
+        """获取提供商绑定的速率限制器（兼容未经本管理器注册的提供商对象）"""
+        if provider.rate_limiter is not None:
+            return provider.rate_limiter
+        return self.rate_limiters[provider.identifier]
@@ -0,0 +1,167 @@
+"""
+进程级 ProviderManager 注册表
+
+所有任务共享同一组 ProviderManager，使以下运行时状态在任务之间累积而不是每个任务重置：
+- 提供商健康状态（失败计数、熔断器状态）
+- Round-robin 轮询位置
+- 本地 RPM 滑动窗口
+
+配置发生变化（例如 /api/rate-limit/reload-config 或保存模型配置）时，
+注册表会重建对应的管理器，并为未变化的 API Key 继承原有状态。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any
+from app.utils.config_loader import ConfigLoader, config_loader
+from app.utils.provider_manager import (
+    ProviderConfig,
+    ProviderManager,
+    RotationStrategy,
+)
+from app.utils.log_util import logger
+
+
+@dataclass
+class _RegistryEntry:
+    """注册表条目：管理器及其对应配置的指纹"""
+
+    manager: ProviderManager
+    fingerprint: Tuple[Any, ...]
+
+
+class ProviderManagerRegistry:
+    """按 Agent/配置缓存 ProviderManager 的注册表"""
+
+    AGENTS = ("coordinator", "modeler", "coder", "writer")
+
+    def __init__(self, loader: ConfigLoader = config_loader):
+        self.loader = loader
+        self._entries: Dict[str, _RegistryEntry] = {}
+
+    def get_agent_manager(self, agent_name: str) -> Optional[ProviderManager]:
+        """
+        获取指定 Agent 的共享提供商管理器
+
+        Args:
+            agent_name: Agent 名称（coordinator, modeler, coder, writer）
+
+        Returns:
+            ProviderManager: 共享的管理器；如果该 Agent 未配置提供商则返回 None
+        """
+        providers = self.loader.get_agent_providers(agent_name)
+        if not providers:
+            return None
+
+        retry_config = self.loader.get_retry_config(agent_name)
+        return self._get_or_build(
+            key=f"{self.loader.current_config_name}:{agent_name.lower()}",
+            providers=providers,
+            rotation_strategy=self.loader.get_rotation_strategy(agent_name),
+            auto_retry=retry_config["auto_retry"],
+            max_retries=retry_config["max_retries"],
+            circuit_breaker_config=self.loader.get_circuit_breaker_config(agent_name),
+        )
+
+    def get_fallback_manager(
+        self, agent_name: str, provider: ProviderConfig
+    ) -> ProviderManager:
+        """获取基于环境变量配置的回退管理器（同样在任务之间共享）"""
+        return self._get_or_build(
+            key=f"fallback:{agent_name.lower()}",
+            providers=[provider],
+            rotation_strategy=RotationStrategy.ROUND_ROBIN,
+        )
+
+    def reload(self) -> List[str]:
+        """
+        根据当前配置刷新所有已知 Agent 的管理器
+
+        配置未变化的管理器原样保留；变化的管理器会被重建并继承旧状态。
+
+        Returns:
+            List[str]: 已配置提供商的 Agent 列表
+        """
+        # 配置名称可能已切换，旧配置下的条目不再可达，直接丢弃
+        prefix = f"{self.loader.current_config_name}:"
+        for key in list(self._entries):
+            if not key.startswith(prefix) and not key.startswith("fallback:"):
+                del self._entries[key]
+
+        configured = []
+        for agent_name in self.AGENTS:
+            if self.get_agent_manager(agent_name) is not None:
+                configured.append(agent_name)
+
+        logger.info(f"Provider registry reloaded, configured agents: {configured}")
+        return configured
+
+    def clear(self):
+        """清空注册表（主要用于测试）"""
+        self._entries.clear()
+
+    def _get_or_build(
+        self,
+        key: str,
+        providers: List[ProviderConfig],
+        rotation_strategy: RotationStrategy,
+        auto_retry: bool = True,
+        max_retries: int = 3,
+        circuit_breaker_config: Optional[Dict[str, Any]] = None,
+    ) -> ProviderManager:
+        circuit_breaker_config = circuit_breaker_config or {}
+        fingerprint = self._fingerprint(
+            providers,
+            rotation_strategy,
+            auto_retry,
+            max_retries,
+            circuit_breaker_config,
+        )
+        entry = self._entries.get(key)
+        if entry is not None and entry.fingerprint == fingerprint:
+            return entry.manager
+
+        manager = ProviderManager(
+            providers=providers,
+            rotation_strategy=rotation_strategy,
+            auto_retry=auto_retry,
+            max_retries=max_retries,
+            circuit_breaker_config=circuit_breaker_config,
+        )
+        if entry is not None:
+            manager.inherit_state(entry.manager)
+            logger.info(f"Provider config changed for {key}, manager rebuilt")
+
+        self._entries[key] = _RegistryEntry(manager=manager, fingerprint=fingerprint)
+        return manager
+
+    @staticmethod
+    def _fingerprint(
+        providers: List[ProviderConfig],
+        rotation_strategy: RotationStrategy,
+        auto_retry: bool,
+        max_retries: int,
+        circuit_breaker_config: Dict[str, Any],
+    ) -> Tuple[Any, ...]:
+        return (
+            RotationStrategy(rotation_strategy),
+            auto_retry,
+            max_retries,
+            tuple(sorted(circuit_breaker_config.items())),
+            tuple(
+                (
+                    p.identifier,
+                    p.model,
+                    p.base_url,
+                    p.priority,
+                    p.rpm,
+                    p.tpm,
+                    p.rpd,
+                    p.enabled,
+                )
+                for p in providers
+            ),
+        )
+
+
+# 全局提供商管理器注册表
+provider_registry = ProviderManagerRegistry()
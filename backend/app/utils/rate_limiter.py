@@ -9,7 +9,7 @@
 """
 
 import time
-from typing import Optional
+from typing import Optional, List
 from app.services.redis_manager import redis_manager
 from app.utils.log_util import logger
 
@@ -180,6 +180,11 @@ class RateLimiter:
 
         # 获取所有记录并累加 token 数
         records = await redis.zrange(self.tokens_key, 0, -1)
+        return self._sum_token_records(records)
+
+    @staticmethod
+    def _sum_token_records(records) -> int:
+        """累加 token 记录中的 token 数"""
         total_tokens = 0
         for record in records:
             try:
@@ -230,6 +235,12 @@ class RateLimiter:
 
     async def get_usage_stats(self) -> dict:
         """获取当前使用统计"""
+        tpm_count = await self._get_token_count(60) if self.tpm else 0
+        rpd_count = await self._get_count(self.rpd_key, 86400) if self.rpd else 0
+        return self._build_usage_stats(tpm_count, rpd_count)
+
+    def _build_usage_stats(self, tpm_count: int, rpd_count: int) -> dict:
+        """根据 Redis 中读取的计数构造统计信息（RPM 使用本地滑动窗口）"""
         stats = {
             "identifier": self.identifier,
             "limits": {
@@ -254,14 +265,12 @@ class RateLimiter:
             )
 
         if self.tpm:
-            tpm_count = await self._get_token_count(60)
             stats["current"]["tpm"] = tpm_count
             stats["current"]["tpm_percentage"] = (
                 (tpm_count / self.tpm * 100) if self.tpm else 0
             )
 
         if self.rpd:
-            rpd_count = await self._get_count(self.rpd_key, 86400)
             stats["current"]["rpd"] = rpd_count
             stats["current"]["rpd_percentage"] = (
                 (rpd_count / self.rpd * 100) if self.rpd else 0
@@ -276,3 +285,46 @@ class RateLimiter:
         # 清空本地 RPM 统计
         self._rpm_timestamps.clear()
         logger.info(f"Rate limiter reset for {self.identifier}")
+
+
+async def get_bulk_usage_stats(limiters: List[RateLimiter]) -> List[dict]:
+    """
+    批量获取多个速率限制器的使用统计
+
+    所有限制器的 TPM / RPD 计数通过一个 pipeline 在一次 Redis 往返中读取，
+    且只读取窗口内的数据（不清理过期记录），适合仪表盘轮询。
+
+    Args:
+        limiters: 速率限制器列表
+
+    Returns:
+        List[dict]: 与 limiters 顺序一致的统计信息（格式同 get_usage_stats）
+    """
+    if not limiters:
+        return []
+
+    now = time.time()
+    redis = redis_manager.redis
+    pipe = redis.pipeline(transaction=False)
+    queued = []  # (limiter 下标, 指标)
+    for idx, limiter in enumerate(limiters):
+        if limiter.tpm:
+            pipe.zrangebyscore(limiter.tokens_key, f"({now - 60}", "+inf")
+            queued.append((idx, "tpm"))
+        if limiter.rpd:
+            pipe.zcount(limiter.rpd_key, f"({now - 86400}", "+inf")
+            queued.append((idx, "rpd"))
+
+    counts = [{"tpm": 0, "rpd": 0} for _ in limiters]
+    if queued:
+        results = await pipe.execute()
+        for (idx, metric), result in zip(queued, results):
+            if metric == "tpm":
+                counts[idx]["tpm"] = RateLimiter._sum_token_records(result)
+            else:
+                counts[idx]["rpd"] = int(result)
+
+    return [
+        limiter._build_usage_stats(count["tpm"], count["rpd"])
+        for limiter, count in zip(limiters, counts)
+    ]
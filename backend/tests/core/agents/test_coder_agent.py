@@ -167,6 +167,39 @@ class TestCoderAgent:
             with pytest.raises(Exception, match="exceeded max retries"):
                 await coder_agent.run(prompt="Test", subtask_title="Test")
 
+    async def test_unparsable_pip_install_returns_tool_error(self, coder_agent):
+        """An unbalanced quote in pip_install is reported instead of crashing."""
+        from unittest.mock import MagicMock
+
+        mock_tool_call = MagicMock()
+        mock_tool_call.id = "pip_id"
+        mock_tool_call.function.name = "pip_install"
+        mock_tool_call.function.arguments = '{"packages": "scikit-learn\'"}'
+
+        mock_response1 = MagicMock()
+        mock_response1.choices = [MagicMock()]
+        mock_response1.choices[0].message.tool_calls = [mock_tool_call]
+        mock_response1.choices[0].message.model_dump.return_value = {
+            "role": "assistant",
+            "content": None,
+        }
+        mock_response2 = MagicMock()
+        mock_response2.choices = [MagicMock()]
+        mock_response2.choices[0].message.tool_calls = None
+        mock_response2.choices[0].message.content = "Task completed"
+        coder_agent.model.chat.side_effect = [mock_response1, mock_response2]
+
+        with patch("app.utils.common_utils.get_current_files", return_value=[]):
+            result = await coder_agent.run(prompt="Test", subtask_title="Test")
+
+        assert result is not None
+        coder_agent.code_interpreter.install_packages.assert_not_awaited()
+        tool_message = next(
+            m for m in coder_agent.chat_history if m.get("name") == "pip_install"
+        )
+        assert "Installation failed: scikit-learn'" in tool_message["content"]
+        assert "Could not parse packages" in tool_message["content"]
+
     async def test_code_with_data_files(self, coder_agent, temp_work_dir):
         """Test code execution with data files."""
         import os
@@ -1,8 +1,34 @@
 """Tests for WriterAgent."""
 
+import json
 import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
 from app.core.agents.writer_agent import WriterAgent
 from app.schemas.A2A import WriterResponse
+from app.schemas.tool_result import ToolResult
+
+
+def _tool_call_response(call_id, name, arguments):
+    """Mock LLM response whose message is a single tool call."""
+    tool_call = MagicMock(id=call_id)
+    tool_call.function.name = name
+    tool_call.function.arguments = json.dumps(arguments)
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = None
+    response.choices[0].message.tool_calls = [tool_call]
+    response.choices[0].message.model_dump.return_value = {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": call_id,
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }
+        ],
+    }
+    return response
 
 
 @pytest.mark.asyncio
@@ -329,3 +355,34 @@ class TestWriterAgent:
 
         assert isinstance(result, WriterResponse)
         assert result.response_content is not None
+
+    async def test_follow_up_tool_calls_are_handled(
+        self, writer_agent, mock_llm_response
+    ):
+        """A get_result_details call after search_papers is run before answering."""
+        writer_agent.scholar = MagicMock()
+        writer_agent.scholar.search_papers = AsyncMock(return_value=[])
+        writer_agent.scholar.papers_to_str.return_value = "[W1] Paper (id: W1)"
+        writer_agent.model.chat.side_effect = [
+            _tool_call_response("call_1", "search_papers", {"query": "queueing"}),
+            _tool_call_response("call_2", "get_result_details", {"result_id": "W1"}),
+            mock_llm_response,
+        ]
+
+        with (
+            patch("app.core.agents.writer_agent.redis_manager.publish_message"),
+            patch.object(
+                writer_agent.web_search_tool,
+                "get_result_details",
+                AsyncMock(return_value=ToolResult(result='{"id": "W1"}')),
+            ) as get_details,
+        ):
+            result = await writer_agent.run(prompt="Write", sub_title="Intro")
+
+        get_details.assert_awaited_once_with("W1")
+        assert result.response_content == "Test LLM response"
+        tool_messages = [m for m in writer_agent.chat_history if m["role"] == "tool"]
+        assert [m["name"] for m in tool_messages] == [
+            "search_papers",
+            "get_result_details",
+        ]
@@ -48,11 +48,11 @@ class TestModelingRouter:
 
     async def test_validate_openalex_email_valid(self, async_client: AsyncClient):
         """Test OpenAlex email validation with valid email."""
-        with patch("requests.get") as mock_get:
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {"results": [{"id": "test"}]}
-            mock_get.return_value = mock_response
+        with patch(
+            "app.routers.modeling_router.openalex_client.get",
+            new_callable=AsyncMock,
+        ) as mock_get:
+            mock_get.return_value = {"results": [{"id": "test"}]}
 
             response = await async_client.post(
                 "/modeling/validate-openalex-email",
@@ -65,7 +65,10 @@ class TestModelingRouter:
 
     async def test_validate_openalex_email_invalid(self, async_client: AsyncClient):
         """Test OpenAlex email validation with invalid email."""
-        with patch("requests.get") as mock_get:
+        with patch(
+            "app.routers.modeling_router.openalex_client.get",
+            new_callable=AsyncMock,
+        ) as mock_get:
             mock_get.side_effect = Exception("Network error")
 
             response = await async_client.post(
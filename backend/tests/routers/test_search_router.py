@@ -92,7 +92,7 @@ async def test_find_similar(async_client, monkeypatch):
 async def test_search_settings_and_status(async_client, monkeypatch):
     from app.routers import search_router
 
-    async def fake_status(provider=None):  # type: ignore[override]
+    async def fake_status(provider=None, refresh=False):  # type: ignore[override]
         if provider is None:
             return {
                 SearchProvider.TAVILY: SearchProviderStatus(
@@ -138,7 +138,7 @@ async def test_search_test_and_health(async_client, monkeypatch):
     def fake_is_provider_available(provider):  # type: ignore[override]
         return True
 
-    async def fake_status(provider=None):  # type: ignore[override]
+    async def fake_status(provider=None, refresh=False):  # type: ignore[override]
         return SearchProviderStatus(
             provider=SearchProvider.TAVILY,
             available=True,
@@ -166,7 +166,7 @@ async def test_search_test_and_health(async_client, monkeypatch):
     assert body["success"] is True
 
     # health
-    async def fake_statuses(provider=None):  # type: ignore[override]
+    async def fake_statuses(provider=None, refresh=False):  # type: ignore[override]
         return {
             SearchProvider.TAVILY: SearchProviderStatus(
                 provider=SearchProvider.TAVILY,
@@ -182,3 +182,80 @@ async def test_search_test_and_health(async_client, monkeypatch):
     resp = await async_client.get("/search/health")
     assert resp.status_code == 200
     assert resp.json()["healthy"] is True
+
+
+@pytest.mark.asyncio
+async def test_web_search_stream(async_client, monkeypatch):
+    import json
+    from app.routers import search_router
+
+    seen = {}
+
+    async def fake_search(request: SearchRequest):  # type: ignore[override]
+        seen["include_content"] = request.include_content
+        return SearchResponse(
+            results=[
+                SearchResult(
+                    title=f"Result {i}",
+                    url=f"https://example.com/{i}",
+                    content="snippet",
+                    metadata={"raw_content": "x" * 1000},
+                )
+                for i in range(3)
+            ],
+            query=request.query,
+            provider=SearchProvider.TAVILY,
+            search_time=0.1,
+        )
+
+    monkeypatch.setattr(search_router.search_manager, "search", fake_search)
+
+    resp = await async_client.post("/search/web/stream", json={"query": "test"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["type"] for line in lines] == [
+        "meta",
+        "result",
+        "result",
+        "result",
+        "done",
+    ]
+    assert lines[1]["result"]["url"] == "https://example.com/0"
+    assert "raw_content" not in lines[1]["result"]["metadata"]
+    assert seen["include_content"] is False
+
+
+@pytest.mark.asyncio
+async def test_web_search_stream_error(async_client, monkeypatch):
+    import json
+    from app.routers import search_router
+    from app.schemas.search import SearchError
+
+    async def fake_search(request):  # type: ignore[override]
+        raise SearchError("boom", provider="tavily", error_code="API_ERROR")
+
+    monkeypatch.setattr(search_router.search_manager, "search", fake_search)
+
+    resp = await async_client.post("/search/web/stream", json={"query": "test"})
+    line = json.loads(resp.text.splitlines()[0])
+    assert line["type"] == "error"
+    assert line["error_code"] == "API_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_get_raw_content(async_client, monkeypatch):
+    from app.routers import search_router
+
+    async def fake_get_content(urls, provider=None):  # type: ignore[override]
+        return {u: "raw page" for u in urls if u != "https://missing"}
+
+    monkeypatch.setattr(search_router.search_manager, "get_content", fake_get_content)
+
+    resp = await async_client.get("/search/web/raw", params={"url": "https://a"})
+    assert resp.status_code == 200
+    assert resp.json() == {"url": "https://a", "content": "raw page"}
+
+    resp = await async_client.get("/search/web/raw", params={"url": "https://missing"})
+    assert resp.status_code == 404
@@ -0,0 +1,181 @@
+"""Tests for the out-of-process executor service and its interpreter client."""
+
+import asyncio
+import os
+import sys
+import aiohttp
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from aiohttp.test_utils import TestServer
+from app.services import executor_service
+from app.services.executor_service import ExecutorService
+from app.tools.executor_interpreter import ExecutorCodeInterpreter, ExecutorError
+from app.tools.kernel_limits import ResourceLimits
+from app.tools.notebook_serializer import NotebookSerializer
+
+
+@pytest.fixture
+async def executor(tmp_path):
+    service = ExecutorService(
+        work_root=str(tmp_path / "executor"), max_kernels=2, token="secret"
+    )
+    server = TestServer(service.create_app())
+    await server.start_server()
+    yield service, str(server.make_url("")).rstrip("/")
+    await server.close()
+
+
+def _interpreter(work_dir, url, **kwargs):
+    kwargs.setdefault("token", "secret")
+    kwargs.setdefault("limits", ResourceLimits(wall_time=30))
+    return ExecutorCodeInterpreter(
+        task_id="executor-test",
+        work_dir=str(work_dir),
+        notebook_serializer=NotebookSerializer(work_dir=str(work_dir)),
+        executor_urls=[url],
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+class TestExecutorService:
+    """Run code in a real kernel hosted by a local executor."""
+
+    @pytest.fixture(autouse=True)
+    def no_publish(self):
+        with patch(
+            "app.services.redis_manager.redis_manager.publish_message",
+            new_callable=AsyncMock,
+        ):
+            yield
+
+    async def test_execute_and_sync_files(self, executor, tmp_path):
+        """Files are uploaded, code runs remotely and outputs sync back."""
+        service, url = executor
+        work_dir = tmp_path / "task"
+        work_dir.mkdir()
+        (work_dir / "data.csv").write_text("a,b\n1,2\n")
+        interp = _interpreter(work_dir, url, shared_fs=False)
+
+        await interp.initialize()
+        try:
+            assert interp.remote_work_dir != str(work_dir)
+            text, error, _ = await interp.execute_code(
+                "import os\n"
+                "print(open('data.csv').read().strip())\n"
+                "import matplotlib\n"
+                "matplotlib.use('Agg')\n"
+                "import matplotlib.pyplot as plt\n"
+                "plt.plot([1, 2])\n"
+                "plt.savefig('plot.png')\n"
+                "print(os.getpid() != %d)" % os.getpid()
+            )
+            assert not error
+            assert "a,b" in text and "True" in text
+            assert (work_dir / "plot.png").exists()
+            assert await interp.get_created_images("") == ["plot.png"]
+
+            text, error, message = await interp.execute_code("1 / 0")
+            assert error and "ZeroDivisionError" in message
+
+            # Installs go through the executor, already installed ones return at once
+            result = await interp.install_packages(["numpy"])
+            assert result.ok and result.already_satisfied == ["numpy"]
+        finally:
+            await interp.cleanup()
+        assert service.kernels == {}
+
+    async def test_timeout_interrupts_kernel(self, executor, tmp_path):
+        """A runaway cell is interrupted and the kernel stays usable."""
+        _, url = executor
+        interp = _interpreter(
+            tmp_path, url, shared_fs=True, limits=ResourceLimits(wall_time=1)
+        )
+
+        await interp.initialize()
+        try:
+            assert interp.remote_work_dir == str(tmp_path)
+            _, error, message = await interp.execute_code("import time\ntime.sleep(30)")
+            assert error and '"kind": "wall_time"' in message
+            assert interp.last_violation.kind == "wall_time"
+
+            text, error, _ = await interp.execute_code("print(21 * 2)")
+            assert not error and "42" in text
+        finally:
+            await interp.cleanup()
+
+    async def test_requires_token(self, executor, tmp_path):
+        """Requests without the shared token are rejected."""
+        _, url = executor
+        interp = _interpreter(tmp_path, url, token="wrong")
+
+        with pytest.raises(ExecutorError):
+            await interp.initialize()
+
+
+class _FakeSession:
+    def __init__(self, kernel_id, limits):
+        self.kernel_id = kernel_id
+        self.limits = limits
+        self.calls = []
+
+    async def execute(self, code, timeout, max_output_chars, max_output_bytes):
+        self.calls.append((timeout, max_output_chars, max_output_bytes))
+        return {"outputs": [], "files": [], "timed_out": False}
+
+    async def shutdown(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_clients_can_only_tighten_limits_and_capacity_is_reserved():
+    """Per-request limits are clamped; concurrent creates respect max_kernels."""
+    release = asyncio.Event()
+
+    async def factory(kernel_id, work_dir, limits):
+        await release.wait()
+        return _FakeSession(kernel_id, limits)
+
+    service = ExecutorService(max_kernels=1, kernel_factory=factory)
+    server = TestServer(service.create_app())
+    await server.start_server()
+    try:
+        async with aiohttp.ClientSession() as http:
+            limits = {"wall_time": 10, "max_output_chars": 1000}
+            first = asyncio.create_task(
+                http.post(server.make_url("/kernels"), json={"limits": limits})
+            )
+            await asyncio.sleep(0.1)
+            second = await http.post(server.make_url("/kernels"), json={})
+            assert second.status == 503
+            release.set()
+            kernel_id = (await (await first).json())["kernel_id"]
+
+            await http.post(
+                server.make_url(f"/kernels/{kernel_id}/execute"),
+                json={
+                    "code": "1",
+                    "timeout": 10**6,
+                    "max_output_chars": None,
+                    "max_output_bytes": 10**12,
+                },
+            )
+            session = service.kernels[kernel_id]
+            assert session.calls == [
+                (10.0, 1000, min(10**12, session.limits.max_output_bytes or 10**12))
+            ]
+    finally:
+        await server.close()
+
+
+def test_main_refuses_public_host_without_token(monkeypatch):
+    monkeypatch.setattr(executor_service.settings, "EXECUTOR_TOKEN", None)
+    monkeypatch.setattr(executor_service.web, "run_app", MagicMock())
+    monkeypatch.setattr(sys, "argv", ["executor", "--host", "0.0.0.0"])
+    with pytest.raises(SystemExit):
+        executor_service.main()
+    executor_service.web.run_app.assert_not_called()
+
+    monkeypatch.setattr(sys, "argv", ["executor", "--host", "127.0.0.1"])
+    executor_service.main()
+    executor_service.web.run_app.assert_called_once()
@@ -0,0 +1,110 @@
+"""Tests for the shared HTTP session manager."""
+
+import asyncio
+import threading
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.schemas.search import SearchConfig, SearchProvider
+from app.services.http_session_manager import HttpSessionManager
+from app.tools.search import base_provider
+from app.tools.search.exa_provider import ExaSearchProvider
+from app.tools.search.tavily_provider import TavilySearchProvider
+
+
+@pytest.fixture
+async def server():
+    async def handler(request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/ping", handler)
+    server = TestServer(app)
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = HttpSessionManager(max_connections_per_host=2)
+    monkeypatch.setattr(base_provider, "http_session_manager", manager)
+    return manager
+
+
+@pytest.mark.asyncio
+class TestHttpSessionManager:
+    """Test suite for HttpSessionManager."""
+
+    async def test_providers_share_one_session(self, manager):
+        """All providers get the same pooled session."""
+        tavily = TavilySearchProvider(
+            SearchConfig(provider=SearchProvider.TAVILY, api_key="k")
+        )
+        exa = ExaSearchProvider(SearchConfig(provider=SearchProvider.EXA, api_key="k"))
+
+        assert await tavily._ensure_session() is await exa._ensure_session()
+
+        # Closing a provider leaves the shared session open
+        await tavily.close()
+        assert not (await exa._ensure_session()).closed
+        await manager.close()
+
+    async def test_metrics_track_latency_and_reuse(self, manager, server):
+        """Requests record latency and keep-alive connection reuse per provider."""
+        provider = TavilySearchProvider(
+            SearchConfig(provider=SearchProvider.TAVILY, api_key="k")
+        )
+
+        for _ in range(3):
+            data = await provider._make_request("GET", str(server.make_url("/ping")))
+            assert data == {"ok": True}
+
+        metrics = manager.get_metrics("tavily")
+        assert metrics.requests == 3
+        assert metrics.errors == 0
+        assert metrics.connections_created == 1
+        assert metrics.connections_reused == 2
+        assert provider.get_average_response_time() == metrics.average_latency
+        assert manager.get_all_metrics()["tavily"]["reuse_ratio"] == pytest.approx(
+            2 / 3
+        )
+        await manager.close()
+
+    async def test_close_recreates_session_on_demand(self, manager):
+        """A closed manager hands out a fresh session."""
+        session = await manager.get_session()
+        await manager.close()
+
+        assert session.closed
+        new_session = await manager.get_session()
+        assert new_session is not session and not new_session.closed
+        await manager.close()
+
+
+def test_loop_change_closes_old_session():
+    """A session from another event loop is closed before it is replaced."""
+    manager = HttpSessionManager()
+    old = asyncio.run(manager.get_session())
+    new = asyncio.run(manager.get_session())
+    assert old.closed and not new.closed
+
+    # The old loop is still running in another thread: it closes its own session
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    try:
+        threaded = asyncio.run_coroutine_threadsafe(
+            manager.get_session(), loop
+        ).result()
+        asyncio.run(manager.get_session())
+        deadline = time.monotonic() + 2
+        while not threaded.closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert threaded.closed
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    asyncio.run(manager.close())
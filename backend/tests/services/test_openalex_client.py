@@ -0,0 +1,106 @@
+"""Tests for the shared OpenAlex client."""
+
+import asyncio
+import httpx
+import pytest
+from app.services.openalex_client import OpenAlexClient
+
+
+def _client(handler, **kwargs) -> OpenAlexClient:
+    params = {"min_interval": 0, "backoff_base": 0}
+    params.update(kwargs)
+    return OpenAlexClient(transport=httpx.MockTransport(handler), **params)
+
+
+@pytest.mark.asyncio
+class TestOpenAlexClient:
+    """Test suite for OpenAlexClient."""
+
+    async def test_polite_pool_params(self):
+        """Requests carry mailto and a User-Agent with the email."""
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, json={"results": []})
+
+        client = _client(handler)
+        data = await client.get("works", params={"search": "lp"}, email="a@b.com")
+
+        assert data == {"results": []}
+        assert seen[0].url.path == "/works"
+        assert seen[0].url.params["mailto"] == "a@b.com"
+        assert "a@b.com" in seen[0].headers["User-Agent"]
+        await client.close()
+
+    async def test_connection_reused(self):
+        """Consecutive requests share one pooled client."""
+        client = _client(lambda request: httpx.Response(200, json={}))
+
+        await client.get("works")
+        pooled = client._client
+        await client.get("works")
+
+        assert client._client is pooled
+        await client.close()
+        assert client._client is None
+
+    async def test_retries_on_rate_limit_and_server_errors(self):
+        """429 and 5xx responses are retried until success."""
+        statuses = [429, 503, 200]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            status = statuses.pop(0)
+            return httpx.Response(status, json={"ok": status == 200})
+
+        client = _client(handler, max_retries=3)
+        assert await client.get("works") == {"ok": True}
+        assert statuses == []
+        await client.close()
+
+    async def test_gives_up_after_max_retries(self):
+        """The final error status is raised once retries are exhausted."""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(503)
+
+        client = _client(handler, max_retries=2)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("works")
+        assert len(calls) == 3
+        await client.close()
+
+    async def test_client_errors_are_not_retried(self):
+        """4xx responses other than 429 fail immediately."""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(403)
+
+        client = _client(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("works")
+        assert len(calls) == 1
+        await client.close()
+
+    async def test_concurrency_limit(self):
+        """No more than max_concurrency requests are in flight."""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json={})
+
+        client = _client(handler, max_concurrency=2)
+        await asyncio.gather(*(client.get("works") for _ in range(6)))
+
+        assert peak == 2
+        await client.close()
@@ -0,0 +1,79 @@
+"""Tests for package installation outside the kernel."""
+
+import asyncio
+import pytest
+from app.services.package_provisioner import InstallResult, PackageProvisioner
+
+
+class FakeProvisioner(PackageProvisioner):
+    """Runs no subprocesses; installs succeed only for packages in ``index``."""
+
+    def __init__(self, tmp_path, available, offline=False):
+        super().__init__(cache_dir=str(tmp_path), offline=offline)
+        self.available = available
+        self.index = {"numpy": "2.2.5"}
+        self.commands = []
+        self._use_uv = False
+
+    async def installed_packages(self, refresh=False):
+        return dict(self.index)
+
+    async def _exec(self, command):
+        self.commands.append(command)
+        await asyncio.sleep(0.01)
+        specs = command[command.index(self.wheel_dir) + 1 :]
+        if "wheel" in command:
+            self.downloaded = True
+            return 0, ""
+        if not getattr(self, "downloaded", False):
+            return 1, "No matching distribution in the local wheel directory"
+        missing = [spec for spec in specs if spec not in self.available]
+        if missing:
+            return 1, f"ERROR: No matching distribution found for {missing[0]}"
+        self.index.update({spec: "1.0" for spec in specs})
+        return 0, ""
+
+
+@pytest.mark.asyncio
+async def test_installed_packages_return_without_pip(tmp_path):
+    provisioner = FakeProvisioner(tmp_path, available=[])
+
+    result = await provisioner.install(["numpy>=2", "NumPy"])
+
+    assert result.ok and result.already_satisfied == ["numpy>=2", "NumPy"]
+    assert provisioner.commands == []
+
+
+@pytest.mark.asyncio
+async def test_install_downloads_to_wheel_cache_once(tmp_path):
+    provisioner = FakeProvisioner(tmp_path, available=["pulp"])
+
+    first, second = await asyncio.gather(
+        provisioner.install(["pulp"]), provisioner.install(["pulp"])
+    )
+
+    assert first.installed == second.installed == ["pulp"]
+    # Local attempt, download into the wheel dir, offline install: one job
+    assert [command[3] for command in provisioner.commands] == [
+        "install",
+        "wheel",
+        "install",
+    ]
+    assert "--no-index" in provisioner.commands[-1]
+
+    again = await provisioner.install(["pulp"])
+    assert again.already_satisfied == ["pulp"] and len(provisioner.commands) == 3
+
+
+@pytest.mark.asyncio
+async def test_failures_and_rejected_options(tmp_path):
+    provisioner = FakeProvisioner(tmp_path, available=[], offline=True)
+
+    result = await provisioner.install(["--index-url=http://evil", "no-such-pkg"])
+
+    assert not result.ok
+    assert result.failed == ["--index-url=http://evil", "no-such-pkg"]
+    # Offline: never tries to download
+    assert not any("wheel" in command for command in provisioner.commands)
+    assert "Installation failed" in result.summary()
+    assert InstallResult.from_dict(result.to_dict()) == result
@@ -0,0 +1,78 @@
+"""
+预算管理器单元测试
+"""
+
+import pytest
+import toml
+from app.utils.budget_manager import BudgetManager
+from app.utils.config_loader import ConfigLoader
+
+
+def _make_manager(tmp_path, budget):
+    config_path = tmp_path / "model_config.toml"
+    data = {"current": {"current": "config1"}, "config1": {}, "budget": budget}
+    with open(config_path, "w", encoding="utf-8") as f:
+        toml.dump(data, f)
+    return BudgetManager(loader=ConfigLoader(config_path=str(config_path)))
+
+
+@pytest.mark.asyncio
+async def test_no_limits_never_degrades(tmp_path):
+    """测试未配置预算时始终正常放行"""
+    manager = _make_manager(tmp_path, {})
+    await manager.reset("budget_task_a", "budget_tenant_a")
+    await manager.record_usage("budget_task_a", "budget_tenant_a", 10**9, 10**6)
+
+    decision = await manager.check("budget_task_a", "budget_tenant_a", 1000)
+    assert not decision.degraded
+
+
+@pytest.mark.asyncio
+async def test_task_token_budget_degrades(tmp_path):
+    """测试任务 token 预算接近耗尽时进入降级模式"""
+    manager = _make_manager(
+        tmp_path,
+        {"TASK_MAX_TOKENS": 1000, "DEGRADE_RATIO": 0.9, "DEGRADED_MAX_TOKENS": 256},
+    )
+    await manager.reset("budget_task_b", "budget_tenant_b")
+
+    await manager.record_usage("budget_task_b", "budget_tenant_b", 800, 0.01)
+    assert not (await manager.check("budget_task_b", "budget_tenant_b", 50)).degraded
+
+    # 预估 token 计入准入检查
+    decision = await manager.check("budget_task_b", "budget_tenant_b", 150)
+    assert decision.degraded
+    assert decision.max_tokens == 256
+    assert "task tokens" in decision.reason
+
+
+@pytest.mark.asyncio
+async def test_tenant_cost_budget_shared_across_tasks(tmp_path):
+    """测试租户费用预算在多个任务之间累计"""
+    manager = _make_manager(tmp_path, {"TENANT_DAILY_MAX_COST": 1.0})
+    await manager.reset("budget_task_c1", "budget_tenant_c")
+    await manager.reset("budget_task_c2", "budget_tenant_c")
+
+    await manager.record_usage("budget_task_c1", "budget_tenant_c", 100, 0.5)
+    await manager.record_usage("budget_task_c2", "budget_tenant_c", 100, 0.45)
+
+    usage = await manager.get_usage("budget_task_c2", "budget_tenant_c")
+    assert usage["task"]["cost"] == pytest.approx(0.45)
+    assert usage["tenant"]["cost"] == pytest.approx(0.95)
+
+    decision = await manager.check("budget_task_c2", "budget_tenant_c")
+    assert decision.degraded
+    assert "tenant daily cost" in decision.reason
+
+
+@pytest.mark.asyncio
+async def test_estimated_cost_counts_toward_cost_budget(tmp_path):
+    """测试预估费用计入准入检查"""
+    manager = _make_manager(tmp_path, {"TASK_MAX_COST": 1.0, "DEGRADE_RATIO": 0.9})
+    await manager.reset("budget_task_d", "budget_tenant_d")
+    await manager.record_usage("budget_task_d", "budget_tenant_d", 100, 0.8)
+
+    assert not (await manager.check("budget_task_d", "budget_tenant_d", 0)).degraded
+    decision = await manager.check("budget_task_d", "budget_tenant_d", 1000, 0.2)
+    assert decision.degraded
+    assert "task cost" in decision.reason
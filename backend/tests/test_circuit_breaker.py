@@ -0,0 +1,217 @@
+"""
+熔断器单元测试
+"""
+
+import asyncio
+import pytest
+from app.core.llm.llm import LLM, ManagedLLM
+from app.utils.circuit_breaker import CircuitBreaker, CircuitState
+from app.utils.provider_manager import ProviderConfig, ProviderManager
+
+
+class _Clock:
+    """可控时间，用于模拟冷却期"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr("app.utils.circuit_breaker.time.time", fake)
+    return fake
+
+
+async def _make_breaker(identifier: str, **kwargs) -> CircuitBreaker:
+    params = {
+        "failure_rate_threshold": 0.5,
+        "window_seconds": 60,
+        "min_requests": 4,
+        "open_seconds": 30,
+        "half_open_max_probes": 1,
+        "sync_interval": 0,
+    }
+    params.update(kwargs)
+    breaker = CircuitBreaker(identifier=identifier, **params)
+    await breaker.reset()
+    return breaker
+
+
+@pytest.mark.asyncio
+async def test_trips_on_failure_rate(clock):
+    """测试错误率达到阈值且样本足够时熔断"""
+    breaker = await _make_breaker("cb_trip")
+
+    await breaker.record_success()
+    await breaker.record_failure()
+    await breaker.record_failure()
+    # 样本数不足 min_requests，不熔断
+    assert breaker.state == CircuitState.CLOSED
+
+    await breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not await breaker.allow_request()
+    assert not breaker.is_available()
+
+
+@pytest.mark.asyncio
+async def test_low_failure_rate_stays_closed(clock):
+    """测试错误率低于阈值时保持关闭"""
+    breaker = await _make_breaker("cb_low_rate")
+
+    for _ in range(6):
+        await breaker.record_success()
+    await breaker.record_failure()
+    await breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.get_failure_rate() == pytest.approx(0.25)
+
+
+@pytest.mark.asyncio
+async def test_old_outcomes_leave_window(clock):
+    """测试窗口外的失败不计入错误率"""
+    breaker = await _make_breaker("cb_window", min_requests=2)
+
+    await breaker.record_failure()
+    clock.now += 61
+    await breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.get_stats()["window_requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_success_closes(clock):
+    """测试冷却后只放行一个探测请求，探测成功则恢复"""
+    breaker = await _make_breaker("cb_probe_ok", min_requests=1)
+    await breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now += 31
+    assert breaker.is_available()
+    assert await breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # 探测名额已被占用
+    assert not await breaker.allow_request()
+
+    await breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert await breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_failure_reopens(clock):
+    """测试探测失败后重新熔断并重新计算冷却期"""
+    breaker = await _make_breaker("cb_probe_fail", min_requests=1)
+    await breaker.record_failure()
+
+    clock.now += 31
+    assert await breaker.allow_request()
+    await breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert not await breaker.allow_request()
+    assert breaker.get_stats()["retry_after"] == pytest.approx(30)
+
+
+@pytest.mark.asyncio
+async def test_state_shared_between_workers(clock):
+    """测试熔断状态和探测名额通过 Redis 在 worker 之间共享"""
+    worker_a = await _make_breaker("cb_shared", min_requests=1)
+    worker_b = CircuitBreaker(
+        identifier="cb_shared",
+        min_requests=1,
+        open_seconds=30,
+        sync_interval=0,
+    )
+
+    await worker_a.record_failure()
+    assert worker_a.state == CircuitState.OPEN
+
+    # 另一个 worker 同步到熔断状态
+    assert not await worker_b.allow_request()
+    assert worker_b.state == CircuitState.OPEN
+
+    # 冷却后所有 worker 合计只放行一个探测请求
+    clock.now += 31
+    assert await worker_a.allow_request()
+    assert not await worker_b.allow_request()
+
+    # 探测成功后另一个 worker 也恢复
+    clock.now += 1
+    await worker_a.record_success()
+    assert await worker_b.allow_request()
+    assert worker_b.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_release_returns_probe(clock):
+    """测试归还未使用的探测名额"""
+    breaker = await _make_breaker("cb_release", min_requests=1)
+    await breaker.record_failure()
+
+    clock.now += 31
+    assert await breaker.allow_request()
+    await breaker.release()
+    assert await breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_manager_skips_open_provider(clock):
+    """测试管理器跳过已熔断的提供商"""
+    providers = [
+        ProviderConfig(name="cb_p1", api_key="cb-key-1", model="m", base_url="u"),
+        ProviderConfig(name="cb_p2", api_key="cb-key-2", model="m", base_url="u"),
+    ]
+    manager = ProviderManager(
+        providers, circuit_breaker_config={"min_requests": 1, "sync_interval": 0}
+    )
+    for provider in manager.providers:
+        await provider.circuit_breaker.reset()
+        await provider.rate_limiter.reset()
+
+    failing = manager.providers[0]
+    await manager.record_request_result(failing, success=False)
+    assert not failing.is_healthy()
+
+    for _ in range(3):
+        provider = await manager.get_next_provider()
+        assert provider is manager.providers[1]
+
+    stats = await manager.get_all_stats()
+    assert stats[0]["circuit"]["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_releases_slot(clock, monkeypatch):
+    """测试探测请求被取消时归还名额，未归还的名额也会过期"""
+    manager = ProviderManager(
+        [ProviderConfig(name="cb_cancel", api_key="cb-key-c", model="m", base_url="u")],
+        circuit_breaker_config={"min_requests": 1, "sync_interval": 0},
+    )
+    provider = manager.providers[0]
+    breaker = provider.circuit_breaker
+    await breaker.reset()
+    await provider.rate_limiter.reset()
+    await breaker.record_failure()
+    clock.now += 31
+
+    async def cancelled(*args, **kwargs):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(LLM, "chat", cancelled)
+    llm = ManagedLLM(manager, agent_name="cb_test", task_id="cb_task")
+    with pytest.raises(asyncio.CancelledError):
+        await llm.chat(history=[{"role": "user", "content": "hi"}])
+    assert breaker.is_available()
+
+    # 名额未归还时（如进程内异常路径遗漏），超过 _probe_ttl 后自动释放
+    assert await breaker.allow_request()
+    assert not breaker.is_available()
+    clock.now += breaker._probe_ttl()
+    assert breaker.is_available()
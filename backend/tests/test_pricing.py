@@ -0,0 +1,71 @@
+"""
+模型价格注册表单元测试
+"""
+
+import pytest
+import toml
+from app.utils.config_loader import ConfigLoader
+from app.utils.data_recorder import DataRecorder
+from app.utils.pricing import PricingRegistry, ModelPrice
+
+
+@pytest.fixture
+def loader(tmp_path):
+    config_path = tmp_path / "model_config.toml"
+    data = {
+        "current": {"current": "config1"},
+        "config1": {},
+        "pricing": {
+            "default": {"prompt": 0.002, "completion": 0.004},
+            "cheap-model": {"prompt": 0.0001, "completion": 0.0002},
+            "gpt-4": {"prompt": 0.05, "completion": 0.1},
+        },
+    }
+    with open(config_path, "w", encoding="utf-8") as f:
+        toml.dump(data, f)
+    return ConfigLoader(config_path=str(config_path))
+
+
+def test_config_overrides_builtin_prices(loader):
+    """测试配置中的价格覆盖内置价格，未配置的模型保留内置价格"""
+    registry = PricingRegistry(loader=loader)
+
+    assert registry.get_price("gpt-4") == ModelPrice(prompt=0.05, completion=0.1)
+    assert registry.get_price("gpt-3.5-turbo").prompt == 0.0005
+    assert registry.get_price("unknown-model") == ModelPrice(0.002, 0.004)
+
+
+def test_provider_prefix_is_ignored(loader):
+    """测试带提供商前缀的模型名也能匹配价格"""
+    registry = PricingRegistry(loader=loader)
+
+    assert registry.get_price("openai/cheap-model").prompt == 0.0001
+
+
+def test_calculate_cost(loader):
+    """测试按输入输出 token 分别计费"""
+    registry = PricingRegistry(loader=loader)
+
+    cost = registry.calculate_cost("gpt-4", 2000, 1000)
+    assert cost == pytest.approx(2 * 0.05 + 1 * 0.1)
+
+
+def test_prices_follow_config_reload(loader):
+    """测试配置重新加载后价格随之更新"""
+    registry = PricingRegistry(loader=loader)
+    assert registry.get_price("cheap-model").prompt == 0.0001
+
+    data = toml.load(loader.config_path)
+    data["pricing"]["cheap-model"] = {"prompt": 0.0003, "completion": 0.0006}
+    with open(loader.config_path, "w", encoding="utf-8") as f:
+        toml.dump(data, f)
+    loader.reload()
+
+    assert registry.get_price("cheap-model").prompt == 0.0003
+
+
+def test_data_recorder_uses_registry():
+    """测试 DataRecorder 使用价格注册表计算费用"""
+    recorder = DataRecorder()
+
+    assert recorder.calculate_cost("gpt-4", 1000, 1000) == pytest.approx(0.09)
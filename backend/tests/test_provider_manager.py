@@ -2,6 +2,7 @@
 提供商管理器单元测试
 """
 
+import asyncio
 import pytest
 from app.utils.provider_manager import (
     ProviderManager,
@@ -228,6 +229,153 @@ async def test_disabled_provider(sample_providers):
     assert provider.name != "provider1"
 
 
+@pytest.mark.asyncio
+async def test_identifier_and_rate_limiter_cached(sample_providers, monkeypatch):
+    """测试标识符预先计算、速率限制器直接绑定到提供商"""
+    manager = ProviderManager(
+        providers=sample_providers,
+        rotation_strategy=RotationStrategy.ROUND_ROBIN,
+    )
+
+    for provider in sample_providers:
+        assert provider.rate_limiter is manager.rate_limiters[provider.identifier]
+        assert manager.get_provider_by_identifier(provider.identifier) is provider
+        await provider.rate_limiter.reset()
+
+    assert manager.get_provider_by_identifier("unknown") is None
+
+    # 选择和记录结果过程中不应再计算哈希
+    import app.utils.provider_manager as pm_module
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("identifier should not be re-hashed")
+
+    monkeypatch.setattr(pm_module.hashlib, "sha256", _fail)
+
+    provider = await manager.get_next_provider(
+        exclude_providers={sample_providers[0].identifier}
+    )
+    assert provider.name == "provider2"
+    await manager.record_request_result(provider, success=True, actual_tokens=10)
+    assert provider.get_identifier() == provider.identifier
+
+
+def _make_key_pool(size: int) -> list[ProviderConfig]:
+    return [
+        ProviderConfig(
+            name=f"coder_{idx}",
+            api_key=f"sk-bench-{idx:04d}",
+            model="bench-model",
+            base_url="https://bench.local",
+            priority=idx + 1,
+            rpm=1000,
+        )
+        for idx in range(size)
+    ]
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "strategy",
+    [
+        RotationStrategy.ROUND_ROBIN,
+        RotationStrategy.LEAST_USED,
+        RotationStrategy.RANDOM,
+    ],
+)
+async def test_selection_benchmark_large_key_pool(strategy):
+    """基准测试：单个 Agent 轮换 128 个 API Key 时的选择开销"""
+    import time
+
+    pool_size = 128
+    rounds = 512
+    providers = _make_key_pool(pool_size)
+    manager = ProviderManager(providers=providers, rotation_strategy=strategy)
+    for provider in providers:
+        await provider.rate_limiter.reset()
+
+    # 排除一半的 Key，模拟一次请求内多次故障转移后的排除集合
+    exclude = {p.identifier for p in providers[: pool_size // 2]}
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        provider = await manager.get_next_provider(exclude_providers=exclude)
+        assert provider is not None
+        assert provider.identifier not in exclude
+        await manager.record_request_result(provider, success=True)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"\n[benchmark] {strategy.value}: {pool_size} keys, {rounds} selections, "
+        f"{elapsed / rounds * 1e6:.1f} us/selection"
+    )
+    assert sum(p.total_requests for p in providers) == rounds
+
+
 if __name__ == "__main__":
     # 运行测试
     pytest.main([__file__, "-v"])
+
+
+@pytest.mark.asyncio
+async def test_cost_aware_selection():
+    """测试低价优先选择：配置策略和按调用指定均生效"""
+    providers = [
+        ProviderConfig(
+            name="premium", api_key="cost-key-1", model="gpt-4", base_url="u"
+        ),
+        ProviderConfig(
+            name="budget",
+            api_key="cost-key-2",
+            model="gpt-3.5-turbo",
+            base_url="u",
+            priority=2,
+        ),
+    ]
+    manager = ProviderManager(providers, rotation_strategy=RotationStrategy.ROUND_ROBIN)
+    for provider in manager.providers:
+        await provider.rate_limiter.reset()
+        await provider.circuit_breaker.reset()
+
+    # 默认轮询从优先级最高的提供商开始
+    assert (await manager.get_next_provider()).name == "premium"
+
+    # 低重要性调用优先使用低价提供商
+    for _ in range(3):
+        provider = await manager.get_next_provider(prefer_cheap=True)
+        assert provider.name == "budget"
+
+    # 低价提供商不可用时回退到其他提供商
+    provider = await manager.get_next_provider(
+        prefer_cheap=True, exclude_providers=[manager.providers[1].identifier]
+    )
+    assert provider.name == "premium"
+
+    manager.rotation_strategy = RotationStrategy.COST_OPTIMIZED
+    assert (await manager.get_next_provider()).name == "budget"
+
+
+@pytest.mark.asyncio
+async def test_stats_snapshot_shared(sample_providers, monkeypatch):
+    """测试统计信息在缓存有效期内共享同一份快照"""
+    manager = ProviderManager(sample_providers, stats_cache_ttl=60)
+    calls = []
+
+    import app.utils.provider_manager as pm_module
+
+    original = pm_module.get_bulk_usage_stats
+
+    async def _counting_bulk(limiters):
+        calls.append(len(limiters))
+        return await original(limiters)
+
+    monkeypatch.setattr(pm_module, "get_bulk_usage_stats", _counting_bulk)
+
+    results = await asyncio.gather(*(manager.get_all_stats() for _ in range(5)))
+    assert calls == [3]
+    assert all(result is results[0] for result in results)
+
+    # 跳过缓存时重新读取
+    await manager.get_all_stats(use_cache=False)
+    assert calls == [3, 3]
@@ -0,0 +1,108 @@
+"""
+提供商管理器注册表单元测试
+"""
+
+import pytest
+import toml
+from app.utils.config_loader import ConfigLoader
+from app.utils.provider_manager import ProviderConfig
+from app.utils.provider_registry import ProviderManagerRegistry
+
+
+def _write_config(path, api_keys, rpm=10):
+    data = {
+        "current": {"current": "config1"},
+        "config1": {
+            "CODER_API_KEYS": api_keys,
+            "CODER_MODELS": "model-a",
+            "CODER_BASE_URLS": "https://api.example.com",
+            "CODER_RPMS": rpm,
+            "CODER_ROTATION_STRATEGY": "round-robin",
+        },
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        toml.dump(data, f)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    config_path = tmp_path / "model_config.toml"
+    _write_config(config_path, ["key-a", "key-b"])
+    loader = ConfigLoader(config_path=str(config_path))
+    return ProviderManagerRegistry(loader=loader)
+
+
+def test_manager_shared_between_calls(registry):
+    """测试同一 Agent 多次获取返回同一个管理器"""
+    manager1 = registry.get_agent_manager("coder")
+    manager2 = registry.get_agent_manager("coder")
+
+    assert manager1 is not None
+    assert manager1 is manager2
+    assert len(manager1.providers) == 2
+
+
+def test_unconfigured_agent_returns_none(registry):
+    """测试未配置提供商的 Agent 返回 None"""
+    assert registry.get_agent_manager("writer") is None
+
+
+@pytest.mark.asyncio
+async def test_reload_keeps_state_for_unchanged_keys(registry):
+    """测试热重载后未变化的 Key 保留健康状态和速率限制器"""
+    manager = registry.get_agent_manager("coder")
+    key_a = manager.providers[0]
+    await key_a.rate_limiter.reset()
+    key_a.record_failure()
+    key_a.record_failure()
+    old_limiter = key_a.rate_limiter
+
+    # 未修改配置时重载，管理器保持不变
+    assert registry.reload() == ["coder"]
+    assert registry.get_agent_manager("coder") is manager
+
+    # 新增一个 Key 后重载，管理器被重建但继承原有状态
+    _write_config(registry.loader.config_path, ["key-a", "key-b", "key-c"])
+    registry.loader.reload()
+    registry.reload()
+
+    new_manager = registry.get_agent_manager("coder")
+    assert new_manager is not manager
+    assert len(new_manager.providers) == 3
+
+    inherited = new_manager.get_provider_by_identifier(key_a.identifier)
+    assert inherited.failure_count == 2
+    assert inherited.total_requests == 2
+    assert inherited.rate_limiter is old_limiter
+
+    added = new_manager.providers[2]
+    assert added.failure_count == 0
+
+
+def test_reload_replaces_limiter_when_limits_change(registry):
+    """测试限额变化时使用新的速率限制器"""
+    manager = registry.get_agent_manager("coder")
+    old_limiter = manager.providers[0].rate_limiter
+
+    _write_config(registry.loader.config_path, ["key-a", "key-b"], rpm=50)
+    registry.loader.reload()
+
+    new_manager = registry.get_agent_manager("coder")
+    assert new_manager is not manager
+    assert new_manager.providers[0].rate_limiter is not old_limiter
+    assert new_manager.providers[0].rate_limiter.rpm == 50
+
+
+def test_fallback_manager_shared(registry):
+    """测试回退管理器同样在调用之间共享"""
+    provider = ProviderConfig(
+        name="writer", api_key="env-key", model="m", base_url="https://b"
+    )
+    manager1 = registry.get_fallback_manager("writer", provider)
+
+    same_provider = ProviderConfig(
+        name="writer", api_key="env-key", model="m", base_url="https://b"
+    )
+    manager2 = registry.get_fallback_manager("writer", same_provider)
+
+    assert manager1 is manager2
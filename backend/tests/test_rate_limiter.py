@@ -3,7 +3,11 @@
 """
 
 import pytest
-from app.utils.rate_limiter import RateLimiter, RateLimitExceeded
+from app.utils.rate_limiter import (
+    RateLimiter,
+    RateLimitExceeded,
+    get_bulk_usage_stats,
+)
 
 
 @pytest.mark.asyncio
@@ -115,6 +119,37 @@ async def test_no_limits():
         assert result is True
 
 
+@pytest.mark.asyncio
+async def test_bulk_usage_stats_match_single_reads():
+    """测试批量读取的统计与逐个读取一致"""
+    limiters = [
+        RateLimiter(identifier="test_bulk_1", rpm=10, tpm=1000, rpd=100),
+        RateLimiter(identifier="test_bulk_2", tpm=500),
+        RateLimiter(identifier="test_bulk_3"),
+    ]
+    for limiter in limiters:
+        await limiter.reset()
+
+    await limiters[0].check_and_increment_request(estimated_tokens=100)
+    await limiters[0].check_and_increment_request(estimated_tokens=50)
+    await limiters[0].record_actual_tokens(actual_tokens=80, estimated_tokens=50)
+    await limiters[1].check_and_increment_request(estimated_tokens=200)
+
+    bulk = await get_bulk_usage_stats(limiters)
+    single = [await limiter.get_usage_stats() for limiter in limiters]
+
+    assert bulk == single
+    assert bulk[0]["current"] == {
+        "rpm": 2,
+        "rpm_percentage": 20.0,
+        "tpm": 180,
+        "tpm_percentage": 18.0,
+        "rpd": 2,
+        "rpd_percentage": 2.0,
+    }
+    assert bulk[2]["current"] == {}
+
+
 if __name__ == "__main__":
     # 运行测试
     pytest.main([__file__, "-v"])
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from app.tools.search.content_fetcher import ContentFetcher
+
+
+class _Provider:
+    """Fake provider that records requested batches"""
+
+    def __init__(self, slow_urls=(), broken_urls=()):
+        self.slow_urls = set(slow_urls)
+        self.broken_urls = set(broken_urls)
+        self.calls = []
+
+    async def get_content(self, urls):
+        self.calls.append(list(urls))
+        if self.slow_urls & set(urls):
+            await asyncio.sleep(5)
+        if self.broken_urls & set(urls):
+            raise RuntimeError("boom")
+        return {url: f"content of {url}" for url in urls}
+
+
+@pytest.fixture
+async def fetcher():
+    fetcher = ContentFetcher(
+        batch_size=2, max_concurrency=2, timeout=0.2, key_prefix="test_content:"
+    )
+    await fetcher.clear()
+    return fetcher
+
+
+async def test_urls_are_batched_and_cached(fetcher):
+    provider = _Provider()
+    urls = [f"https://example.com/{i}" for i in range(5)]
+
+    content = await fetcher.fetch(provider, urls + [urls[0]])
+
+    assert set(content) == set(urls)
+    assert sorted(len(batch) for batch in provider.calls) == [1, 2, 2]
+
+    provider.calls.clear()
+    again = await fetcher.fetch(provider, urls)
+    assert again == content
+    assert provider.calls == []
+
+
+async def test_slow_url_only_loses_itself(fetcher):
+    provider = _Provider(slow_urls={"https://slow"}, broken_urls={"https://broken"})
+    urls = ["https://a", "https://slow", "https://b", "https://broken"]
+
+    content = await fetcher.fetch(provider, urls)
+
+    assert set(content) == {"https://a", "https://b"}
+
+
+async def test_partial_results_stream_as_batches_complete(fetcher):
+    provider = _Provider(slow_urls={"https://slow"})
+    await fetcher.fetch(provider, ["https://cached"])
+
+    partials = [
+        partial
+        async for partial in fetcher.iter_content(
+            provider, ["https://cached", "https://slow", "https://a", "https://b"]
+        )
+    ]
+
+    assert partials[0] == {"https://cached": "content of https://cached"}
+    assert {url for partial in partials for url in partial} == {
+        "https://cached",
+        "https://a",
+        "https://b",
+    }
@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.schemas.search import (
+    SearchProvider,
+    SearchRequest,
+    SearchResponse,
+    SearchResult,
+    SearchType,
+)
+from app.tools.search.query_index import SemanticQueryIndex
+from app.tools.web_search_tool import WebSearchTool
+
+
+def _response(query: str) -> SearchResponse:
+    return SearchResponse(
+        results=[SearchResult(title="K-means", url="https://example.com/kmeans")],
+        query=query,
+        provider=SearchProvider.TAVILY,
+        search_time=0.1,
+    )
+
+
+def test_rephrased_query_matches():
+    index = SemanticQueryIndex(threshold=0.7)
+    request = SearchRequest(query="K-means clustering python example")
+    index.add(request, _response(request.query))
+
+    match = index.lookup(SearchRequest(query="kmeans clustering in python"))
+
+    assert match is not None
+    entry, similarity = match
+    assert entry.query == request.query
+    assert similarity >= 0.7
+    assert index.lookup(SearchRequest(query="logistic regression python")) is None
+    assert index.get_stats()["hit_rate"] == 0.5
+
+
+def test_queries_differing_in_numbers_or_words_do_not_match():
+    index = SemanticQueryIndex(threshold=0.7)
+    for query in ["China population data 2010", "ARIMA time series forecasting"]:
+        index.add(SearchRequest(query=query), _response(query))
+
+    assert index.lookup(SearchRequest(query="China population data 2020")) is None
+    assert index.lookup(SearchRequest(query="SARIMA time series forecasting")) is None
+    assert index.lookup(SearchRequest(query="china population data 2010")) is not None
+
+
+def test_filters_and_threshold_are_respected():
+    index = SemanticQueryIndex(threshold=0.7)
+    index.add(SearchRequest(query="monte carlo simulation"), _response("q"))
+
+    assert (
+        index.lookup(
+            SearchRequest(query="monte carlo simulations", search_type=SearchType.NEWS)
+        )
+        is None
+    )
+    assert index.lookup(SearchRequest(query="monte carlo simulations")) is not None
+
+    strict = SemanticQueryIndex(threshold=0.99)
+    strict.add(SearchRequest(query="monte carlo simulation"), _response("q"))
+    assert strict.lookup(SearchRequest(query="monte carlo simulation python")) is None
+
+
+def test_index_is_bounded():
+    index = SemanticQueryIndex(max_entries=2)
+    for query in ["graph coloring", "queueing theory", "markov chain"]:
+        index.add(SearchRequest(query=query), _response(query))
+
+    assert index.get_stats()["entries"] == 2
+    assert index.lookup(SearchRequest(query="graph coloring")) is None
+
+
+@pytest.mark.asyncio
+async def test_tool_reuses_response_for_similar_query():
+    index = SemanticQueryIndex()
+    with (
+        patch("app.tools.web_search_tool.search_manager") as mock_manager,
+        patch("app.tools.web_search_tool.query_index", index),
+        patch("app.tools.web_search_tool.settings.SEARCH_SEMANTIC_DEDUP_ENABLED", True),
+    ):
+        mock_manager.search = AsyncMock(return_value=_response("q"))
+        tool = WebSearchTool()
+
+        first = await tool.search("K-means clustering python example")
+        second = await tool.search("kmeans clustering in python")
+
+    mock_manager.search.assert_called_once()
+    assert first.error is None and second.error is None
+    assert second.metadata["metadata"]["cache"] == "similar"
+    assert (
+        second.metadata["metadata"]["similar_query"]
+        == "K-means clustering python example"
+    )
@@ -0,0 +1,178 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+from app.schemas.search import (
+    SearchProvider,
+    SearchRequest,
+    SearchResponse,
+    SearchResult,
+    SearchType,
+    SearchError,
+)
+from app.tools.search.search_cache import SearchCache
+from app.tools.search.search_manager import SearchManager
+
+
+def _response(query: str, title: str = "Result") -> SearchResponse:
+    return SearchResponse(
+        results=[SearchResult(title=title, url="https://example.com")],
+        query=query,
+        provider=SearchProvider.TAVILY,
+        search_time=0.1,
+    )
+
+
+@pytest.fixture
+async def manager():
+    cache = SearchCache(max_entries=8, key_prefix="test_search_cache:")
+    await cache.clear()
+    manager = SearchManager(cache=cache)
+    provider = AsyncMock()
+    manager.providers = {SearchProvider.TAVILY: provider}
+    manager.default_provider = SearchProvider.TAVILY
+    manager.enable_fallback = False
+    return manager, provider
+
+
+def test_key_normalizes_query_and_filters():
+    cache = SearchCache(use_redis=False)
+
+    key = cache.make_key(
+        SearchRequest(query="Linear  Programming?", domains=["B.org", "a.com"])
+    )
+
+    assert key == cache.make_key(
+        SearchRequest(query="linear programming", domains=["a.com", "b.org"])
+    )
+    assert key != cache.make_key(
+        SearchRequest(
+            query="linear programming",
+            domains=["a.com", "b.org"],
+            search_type=SearchType.NEWS,
+        )
+    )
+    assert key != cache.make_key(
+        SearchRequest(
+            query="linear programming", domains=["a.com", "b.org"], max_results=3
+        )
+    )
+
+
+async def test_repeated_search_hits_cache(manager):
+    manager, provider = manager
+    provider.search.return_value = _response("q")
+
+    first = await manager.search(SearchRequest(query="Queueing theory"))
+    second = await manager.search(SearchRequest(query="queueing   THEORY"))
+
+    provider.search.assert_called_once()
+    assert first.metadata.get("cache") is None
+    assert second.metadata["cache"] == "hit"
+    assert second.results == first.results
+
+
+async def test_pinned_providers_do_not_share_entries(manager):
+    manager, tavily = manager
+    exa = AsyncMock()
+    manager.providers[SearchProvider.EXA] = exa
+    tavily.search.return_value = _response("q", title="Tavily")
+    exa.search.return_value = _response("q", title="Exa")
+
+    first = await manager.search(
+        SearchRequest(query="game theory", provider=SearchProvider.TAVILY)
+    )
+    second = await manager.search(
+        SearchRequest(query="game theory", provider=SearchProvider.EXA)
+    )
+
+    tavily.search.assert_called_once()
+    exa.search.assert_called_once()
+    assert second.metadata.get("cache") is None
+    assert (
+        [r.title for r in second.results] == ["Exa"] != [r.title for r in first.results]
+    )
+
+
+async def test_shared_tier_serves_other_process(manager):
+    manager, provider = manager
+    provider.search.return_value = _response("q")
+    await manager.search(SearchRequest(query="markov chains"))
+
+    # A second manager with an empty memory tier reads from Redis
+    other = SearchManager(
+        cache=SearchCache(max_entries=8, key_prefix="test_search_cache:")
+    )
+    other_provider = AsyncMock()
+    other.providers = {SearchProvider.TAVILY: other_provider}
+    other.default_provider = SearchProvider.TAVILY
+
+    response = await other.search(SearchRequest(query="markov chains"))
+
+    other_provider.search.assert_not_called()
+    assert response.metadata["cache"] == "hit"
+
+
+async def test_stale_entry_served_while_revalidating(manager, monkeypatch):
+    manager, provider = manager
+    provider.search.return_value = _response("q", title="old")
+    request = SearchRequest(query="election results", search_type=SearchType.NEWS)
+    await manager.search(request)
+
+    # Move past the news TTL but inside the stale window
+    ttl = manager.cache.ttls[SearchType.NEWS]
+    now = time.time() + ttl + 1
+    monkeypatch.setattr("app.tools.search.search_cache.time.time", lambda: now)
+    provider.search.return_value = _response("q", title="new")
+
+    stale = await manager.search(request)
+    assert stale.metadata["cache"] == "stale"
+    assert stale.results[0].title == "old"
+
+    await asyncio.gather(*manager._inflight.values())
+    fresh = await manager.search(request)
+    assert fresh.metadata["cache"] == "hit"
+    assert fresh.results[0].title == "new"
+    assert provider.search.call_count == 2
+
+
+async def test_concurrent_misses_share_one_call(manager):
+    manager, provider = manager
+
+    async def slow_search(request):
+        await asyncio.sleep(0.01)
+        return _response(request.query)
+
+    provider.search.side_effect = slow_search
+
+    results = await asyncio.gather(
+        *(manager.search(SearchRequest(query="optimization")) for _ in range(5))
+    )
+
+    provider.search.assert_called_once()
+    assert all(r.results == results[0].results for r in results)
+
+
+async def test_failures_are_not_cached(manager):
+    manager, provider = manager
+    provider.search.side_effect = SearchError("boom", "tavily", "API_ERROR")
+
+    with pytest.raises(SearchError):
+        await manager.search(SearchRequest(query="graph coloring"))
+
+    provider.search.side_effect = None
+    provider.search.return_value = _response("q")
+    response = await manager.search(SearchRequest(query="graph coloring"))
+
+    assert response.metadata.get("cache") is None
+    assert provider.search.call_count == 2
+
+
+async def test_memory_tier_is_bounded():
+    cache = SearchCache(max_entries=2, use_redis=False)
+
+    for i in range(3):
+        await cache.set(f"k{i}", SearchType.GENERAL, _response(str(i)))
+
+    assert cache.get_stats()["entries"] == 2
+    assert "k0" not in cache._entries
@@ -0,0 +1,169 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+from app.schemas.search import (
+    SearchError,
+    SearchProvider,
+    SearchRequest,
+    SearchResponse,
+    SearchResult,
+    SearchType,
+)
+from app.tools.search.result_fusion import (
+    dedup_key,
+    normalize_url,
+    reciprocal_rank_fusion,
+)
+from app.tools.search.search_cache import SearchCache
+from app.tools.search.search_manager import SearchManager
+
+
+def _response(provider: SearchProvider, urls) -> SearchResponse:
+    return SearchResponse(
+        results=[SearchResult(title=url, url=url) for url in urls],
+        query="q",
+        provider=provider,
+        search_time=0.1,
+    )
+
+
+def _provider(response=None, delay: float = 0.0, error: Exception = None):
+    async def search(request):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return response
+
+    provider = AsyncMock()
+    provider.search.side_effect = search
+    return provider
+
+
+@pytest.fixture
+async def manager():
+    cache = SearchCache(max_entries=8, key_prefix="test_search_fanout:")
+    await cache.clear()
+    manager = SearchManager(cache=cache)
+    manager.default_provider = SearchProvider.TAVILY
+    manager.fanout_types = {SearchType.RESEARCH, SearchType.ACADEMIC}
+    manager.fanout_deadline = 0.2
+    return manager
+
+
+def test_dedup_key_matches_doi_and_url_variants():
+    doi_url = SearchResult(title="a", url="https://doi.org/10.1000/XYZ.1")
+    publisher = SearchResult(
+        title="b",
+        url="https://journal.example/article",
+        metadata={"doi": "10.1000/xyz.1"},
+    )
+    assert dedup_key(doi_url) == dedup_key(publisher)
+
+    assert normalize_url("https://www.Example.com/a/?utm_source=x#top") == (
+        normalize_url("http://example.com/a")
+    )
+
+
+def test_rrf_promotes_results_shared_by_providers():
+    fused = reciprocal_rank_fusion(
+        [
+            (
+                "tavily",
+                [SearchResult(title=u, url=u) for u in ["https://a", "https://b"]],
+            ),
+            (
+                "exa",
+                [SearchResult(title=u, url=u) for u in ["https://c", "https://b/"]],
+            ),
+        ]
+    )
+
+    assert [r.url for r in fused][0] == "https://b"
+    assert fused[0].metadata["providers"] == ["tavily", "exa"]
+    assert len(fused) == 3
+
+
+async def test_fanout_returns_partial_results_at_deadline(manager):
+    manager.providers = {
+        SearchProvider.TAVILY: _provider(
+            _response(SearchProvider.TAVILY, ["https://a"])
+        ),
+        SearchProvider.EXA: _provider(delay=5),
+        SearchProvider.OPENALEX: _provider(
+            _response(SearchProvider.OPENALEX, ["https://doi.org/10.1/x"])
+        ),
+    }
+
+    start = time.monotonic()
+    response = await manager.search(
+        SearchRequest(query="queueing networks", search_type=SearchType.RESEARCH)
+    )
+
+    assert time.monotonic() - start < 1
+    assert {r.url for r in response.results} == {"https://a", "https://doi.org/10.1/x"}
+    assert response.metadata["fanout"]["timed_out"] == ["exa"]
+    assert response.metadata["fanout"]["partial"] is True
+
+    # Partial results are not cached
+    again = await manager.search(
+        SearchRequest(query="queueing networks", search_type=SearchType.RESEARCH)
+    )
+    assert again.metadata.get("cache") is None
+
+
+async def test_fanout_raises_when_no_provider_answers(manager):
+    manager.providers = {
+        SearchProvider.TAVILY: _provider(error=SearchError("boom")),
+        SearchProvider.EXA: _provider(delay=5),
+    }
+
+    with pytest.raises(SearchError) as exc_info:
+        await manager.search(
+            SearchRequest(query="graph coloring", search_type=SearchType.ACADEMIC)
+        )
+    assert exc_info.value.error_code == "ALL_PROVIDERS_FAILED"
+
+
+async def test_general_and_pinned_searches_stay_serial(manager):
+    tavily = _provider(_response(SearchProvider.TAVILY, ["https://a"]))
+    exa = _provider(_response(SearchProvider.EXA, ["https://b"]))
+    manager.providers = {SearchProvider.TAVILY: tavily, SearchProvider.EXA: exa}
+
+    await manager.search(SearchRequest(query="linear programming"))
+    await manager.search(
+        SearchRequest(
+            query="linear programming",
+            search_type=SearchType.RESEARCH,
+            provider=SearchProvider.TAVILY,
+        )
+    )
+
+    assert tavily.search.call_count == 2
+    exa.search.assert_not_called()
+
+
+async def test_stream_yields_each_provider_before_fused_result(manager):
+    manager.providers = {
+        SearchProvider.TAVILY: _provider(
+            _response(SearchProvider.TAVILY, ["https://a"]), delay=0.1
+        ),
+        SearchProvider.EXA: _provider(_response(SearchProvider.EXA, ["https://b"])),
+    }
+    request = SearchRequest(query="markov chains", search_type=SearchType.RESEARCH)
+
+    events = []
+    async for kind, response in manager.search_stream(request):
+        events.append((kind, response.provider, time.monotonic()))
+
+    assert [(kind, provider) for kind, provider, _ in events] == [
+        ("partial", SearchProvider.EXA),
+        ("partial", SearchProvider.TAVILY),
+        ("final", SearchProvider.TAVILY),
+    ]
+    # The fast provider is streamed before the slow one answers
+    assert events[1][2] - events[0][2] > 0.05
+
+    # The fused result was cached, so a repeat search streams it directly
+    events = [kind async for kind, _ in manager.search_stream(request)]
+    assert events == ["final"]
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.schemas.search import (
+    SearchProvider,
+    SearchProviderStatus,
+    SearchRequest,
+    SearchResponse,
+)
+from app.tools.search.search_manager import SearchManager
+
+
+def _provider(name: SearchProvider, available: bool = True):
+    provider = MagicMock()
+    provider.health_check = AsyncMock(
+        return_value=SearchProviderStatus(
+            provider=name, available=available, configured=True
+        )
+    )
+    provider.search = AsyncMock(
+        return_value=SearchResponse(query="q", provider=name, search_time=0.1)
+    )
+    return provider
+
+
+@pytest.fixture
+def manager():
+    manager = SearchManager()
+    manager.cache = None
+    manager.default_provider = SearchProvider.TAVILY
+    manager.fallback_providers = [SearchProvider.EXA]
+    manager.enable_fallback = True
+    manager.providers = {
+        SearchProvider.TAVILY: _provider(SearchProvider.TAVILY, available=False),
+        SearchProvider.EXA: _provider(SearchProvider.EXA),
+    }
+    return manager
+
+
+async def test_status_served_from_snapshot(manager):
+    await manager.refresh_health()
+
+    statuses = await manager.get_provider_status()
+    exa_status = await manager.get_provider_status(SearchProvider.EXA)
+
+    assert statuses[SearchProvider.TAVILY].available is False
+    assert exa_status.available is True
+    for provider in manager.providers.values():
+        provider.health_check.assert_called_once()
+
+    await manager.get_provider_status(SearchProvider.EXA, refresh=True)
+    assert manager.providers[SearchProvider.EXA].health_check.call_count == 2
+
+
+async def test_probe_timeout_marks_provider_unavailable(manager):
+    async def hang():
+        await asyncio.sleep(5)
+
+    manager._health_timeout = 0.05
+    manager.providers[SearchProvider.EXA].health_check = AsyncMock(side_effect=hang)
+
+    status = await manager.get_provider_status(SearchProvider.EXA, refresh=True)
+
+    assert status.available is False
+    assert status.last_error == "TimeoutError"
+
+
+async def test_unhealthy_default_is_tried_last(manager):
+    await manager.refresh_health()
+
+    response = await manager.search(SearchRequest(query="integer programming"))
+
+    assert response.provider == SearchProvider.EXA
+    manager.providers[SearchProvider.TAVILY].search.assert_not_called()
+
+    # A pinned provider is still honoured
+    await manager.search(
+        SearchRequest(query="integer programming", provider=SearchProvider.TAVILY)
+    )
+    manager.providers[SearchProvider.TAVILY].search.assert_called_once()
+
+
+async def test_background_probe_refreshes_and_stops(manager):
+    manager._health_interval = 0.01
+    manager._health_jitter = 0.5
+
+    manager.start_health_probe()
+    await asyncio.sleep(0.05)
+    await manager.stop_health_probe()
+
+    assert manager._health_checked_at is not None
+    assert manager.providers[SearchProvider.EXA].health_check.call_count >= 1
@@ -0,0 +1,84 @@
+"""Tests for static checks run before code reaches the kernel."""
+
+import ast
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.tools.code_preflight import check_names, check_syntax, imported_modules
+from app.tools.local_interpreter import LocalCodeInterpreter
+from app.tools.notebook_serializer import NotebookSerializer
+
+
+def _undefined(code, namespace=()):
+    return [issue.detail for issue in check_names(ast.parse(code), set(namespace))]
+
+
+def test_check_syntax_accepts_ipython_magics():
+    tree, issues = check_syntax("!pip install numpy\n%time x = 1")
+    assert tree is not None and issues == []
+
+    _, issues = check_syntax("x = 1\ndef f(:\n    pass")
+    assert issues[0].kind == "syntax" and issues[0].line == 2
+
+
+def test_check_names():
+    assert _undefined("print(df.head())") == ["NameError: name 'df' is not defined"]
+    assert _undefined("print(df.head())", ["df"]) == []
+    # Bound anywhere in the cell, or only used inside a function body
+    assert _undefined("for i in range(3):\n    total = i\nprint(total)") == []
+    assert _undefined("def f():\n    return later\n") == []
+    assert _undefined("try:\n    pass\nexcept ValueError as e:\n    print(e)") == []
+    assert _undefined("[y for y in range(3)]\ndisplay(1)") == []
+    # Dynamic name creation disables the check
+    assert _undefined("exec('z = 1')\nprint(z)") == []
+    assert _undefined("from math import *\nprint(pi)") == []
+    # Underscore names are not reported by the kernel, so they are never flagged
+    assert _undefined("print(_tmp)", ["df"]) == []
+    assert _undefined("print(_, _1)") == []
+
+
+def test_imported_modules_skips_guarded_imports():
+    tree = ast.parse(
+        "import numpy as np\n"
+        "from sklearn.linear_model import LinearRegression\n"
+        "from . import local\n"
+        "try:\n"
+        "    import xgboost\n"
+        "except ImportError:\n"
+        "    xgboost = None\n"
+    )
+    assert imported_modules(tree) == {"numpy": 1, "sklearn": 2}
+
+
+@pytest.mark.asyncio
+async def test_preflight_errors_skip_execution(tmp_path):
+    interp = LocalCodeInterpreter(
+        task_id="preflight-test",
+        work_dir=str(tmp_path),
+        notebook_serializer=NotebookSerializer(work_dir=str(tmp_path)),
+    )
+    with patch(
+        "app.services.redis_manager.redis_manager.publish_message",
+        new_callable=AsyncMock,
+    ):
+        await interp.initialize()
+        try:
+            text, error, message = await interp.execute_code(
+                "print('cell-executed')\nprint(undefined_df.shape)"
+            )
+            assert error and "cell-executed" not in text
+            assert '"kind": "undefined_name"' in message and "undefined_df" in message
+
+            _, error, message = await interp.execute_code(
+                "import json\nimport no_such_package_xyz"
+            )
+            assert error and "No module named 'no_such_package_xyz'" in message
+
+            # Names defined by earlier cells are reported back by the kernel
+            await interp.execute_code("import numpy as np\ndefined_df = 1")
+            assert "defined_df" in interp.kernel_names
+            assert "numpy" in interp.available_modules
+            text, error, _ = await interp.execute_code("print(defined_df, np.pi)")
+            assert not error and "3.14" in text
+            assert interp.preflight_failures == 2
+        finally:
+            await interp.cleanup()
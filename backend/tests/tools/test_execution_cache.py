@@ -0,0 +1,86 @@
+"""Tests for the opt-in cell execution cache."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.config.setting import settings
+from app.tools.execution_cache import ExecutionCache, analyze_cell
+from app.tools.local_interpreter import LocalCodeInterpreter
+from app.tools.notebook_serializer import NotebookSerializer
+
+
+def test_analyze_cell_detects_external_rebinding():
+    assert analyze_cell("import pandas as pd\ndf = pd.read_csv('a.csv')").pure
+    assert analyze_cell("x = 1\nx += 1").pure
+    assert analyze_cell("ys = [d * 2 for d in xs]").pure
+    assert not analyze_cell("df = df.dropna()").pure
+    assert not analyze_cell("df['c'] = 1").pure
+    assert not analyze_cell("df.dropna(inplace=True)").pure
+    assert not analyze_cell("items.append(1)").pure
+    assert analyze_cell("!pip install numpy") is None
+
+
+def test_prefix_hit_and_invalidation(tmp_path):
+    (tmp_path / "data.csv").write_text("a\n1\n")
+    cache = ExecutionCache(str(tmp_path))
+    load = "import pandas as pd\ndf = pd.read_csv('data.csv')"
+    cache.record(load, [("stdout", "loaded")])
+
+    assert cache.lookup(load) == ([("stdout", "loaded")], "")
+    assert cache.lookup(load + "\n\nprint(df)") == ([("stdout", "loaded")], "print(df)")
+    # Statements on the same line cannot be split
+    assert cache.lookup(load + "; print(df)") is None
+
+    # A later cell rebinding df invalidates the cell that defined it
+    cache.record("df = None", [])
+    assert cache.lookup(load) is None
+
+    cache.record(load, [("stdout", "loaded")])
+    (tmp_path / "data.csv").write_text("a\n1\n2\n")
+    assert cache.lookup(load) is None
+
+    cache.record("df.head()", [("error", "NameError")])
+    cache.record("total += 1", [])
+    assert len(cache._entries) == 1
+
+
+def test_rebinding_invalidates_cells_that_read_it(tmp_path):
+    cache = ExecutionCache(str(tmp_path))
+    cache.record("import pandas as pd\ndf = pd.DataFrame({'a': [1, None]})", [])
+    cache.record("print(df.describe())", [("stdout", "count 1")])
+    assert cache.lookup("print(df.describe())") is not None
+
+    cache.record("df = df.dropna()", [])
+    assert cache.lookup("print(df.describe())") is None
+    assert analyze_cell("print(df.describe())").reads >= {"df"}
+
+
+@pytest.mark.asyncio
+async def test_repeated_cells_skip_execution(tmp_path):
+    (tmp_path / "data.csv").write_text("a\n1\n")
+    with (
+        patch.object(settings, "KERNEL_EXECUTION_CACHE_ENABLED", True),
+        patch(
+            "app.services.redis_manager.redis_manager.publish_message",
+            new_callable=AsyncMock,
+        ),
+    ):
+        interp = LocalCodeInterpreter(
+            task_id="cache-test",
+            work_dir=str(tmp_path),
+            notebook_serializer=NotebookSerializer(work_dir=str(tmp_path)),
+        )
+        await interp.initialize()
+        try:
+            load = "import time\nloaded_at = time.time_ns()\nprint('loaded')"
+            text, _, _ = await interp.execute_code(load)
+            first, _, _ = await interp.execute_code("print(loaded_at)")
+
+            text, error, _ = await interp.execute_code(load + "\nprint(loaded_at)")
+            assert not error and "loaded" in text and first.split()[-1] in text
+            assert interp.execution_cache.hits == 1
+
+            interp.restart_jupyter_kernel()
+            text, error, _ = await interp.execute_code(load)
+            assert not error and interp.execution_cache.hits == 1
+        finally:
+            await interp.cleanup()
@@ -0,0 +1,82 @@
+"""Tests for checkpointing kernel variables across restarts."""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.tools.kernel_checkpoint import CHECKPOINT_DIR
+from app.tools.local_interpreter import LocalCodeInterpreter
+from app.tools.notebook_serializer import NotebookSerializer
+
+
+def _interpreter(work_dir):
+    return LocalCodeInterpreter(
+        task_id="checkpoint-test",
+        work_dir=str(work_dir),
+        notebook_serializer=NotebookSerializer(work_dir=str(work_dir)),
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_publish():
+    with patch(
+        "app.services.redis_manager.redis_manager.publish_message",
+        new_callable=AsyncMock,
+    ):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_variables_survive_kernel_death(tmp_path):
+    interp = _interpreter(tmp_path)
+    await interp.initialize()
+    try:
+        interp.begin_subtask("eda")
+        await interp.execute_code(
+            "import pandas as pd\n"
+            "import threading\n"
+            "df = pd.DataFrame({'a': [1, 2, 3]})\n"
+            "params = {'alpha': 0.5}\n"
+            "lock = threading.Lock()"
+        )
+        await interp.checkpoint()
+
+        manifest = json.loads((tmp_path / CHECKPOINT_DIR / "manifest.json").read_text())
+        assert manifest["section"] == "eda"
+        assert set(manifest["variables"]) >= {"df", "params"}
+        assert "lock" not in manifest["variables"]
+        assert manifest["modules"]["pd"] == "pandas"
+
+        # Computed after the checkpoint, so it is lost with the kernel
+        _, error, message = await interp.execute_code(
+            "later = 1\nimport os, signal\nos.kill(os.getpid(), signal.SIGKILL)"
+        )
+        assert error and '"kind": "killed"' in message
+        assert "Restored from checkpoint (after subtask eda)" in message
+
+        text, error, _ = await interp.execute_code(
+            "print(df['a'].sum(), params['alpha'], pd.__name__, 'later' in dir())"
+        )
+        assert not error and "6 0.5 pandas False" in text
+    finally:
+        await interp.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_new_kernel_restores_existing_checkpoint(tmp_path):
+    first = _interpreter(tmp_path)
+    await first.initialize()
+    try:
+        first.begin_subtask("ques1")
+        await first.execute_code("scores = [1, 2, 3]")
+        await first.checkpoint()
+    finally:
+        await first.cleanup()
+
+    # e.g. the task moved to another worker sharing the same work_dir
+    second = _interpreter(tmp_path)
+    await second.initialize()
+    try:
+        text, error, _ = await second.execute_code("print(sum(scores))")
+        assert not error and "6" in text
+    finally:
+        await second.cleanup()
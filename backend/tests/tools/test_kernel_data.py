@@ -0,0 +1,97 @@
+"""Tests for the kernel-side data loading helpers and their file cache."""
+
+import os
+import pandas as pd
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from app.tools import kernel_data
+from app.tools.kernel_data import CACHE_DIR, load_data, prepare_cache
+from app.tools.local_interpreter import LocalCodeInterpreter
+from app.tools.notebook_serializer import NotebookSerializer
+
+
+def test_csv_is_parsed_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data.csv").write_bytes(
+        "城市,人口\n北京,2189\n上海,2487\n".encode("gbk")
+    )
+    prepare_cache(".")
+    assert os.listdir(tmp_path / CACHE_DIR)
+
+    with patch.object(kernel_data, "_read_source") as read_source:
+        df = load_data("data.csv")
+    read_source.assert_not_called()
+    assert list(df.columns) == ["城市", "人口"] and df["人口"].sum() == 4676
+
+    # A changed source file is converted again
+    (tmp_path / "data.csv").write_text("a\n1\n2\n3\n")
+    assert load_data("data.csv")["a"].tolist() == [1, 2, 3]
+
+
+def test_excel_sheets_and_direct_reads(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pd.ExcelWriter(tmp_path / "data.xlsx") as writer:
+        pd.DataFrame({"x": [1, 2]}).to_excel(writer, sheet_name="first", index=False)
+        pd.DataFrame({"y": [3]}).to_excel(writer, sheet_name="second", index=False)
+    prepare_cache(".")
+
+    assert load_data("data.xlsx")["x"].tolist() == [1, 2]
+    assert load_data("data.xlsx", sheet_name="second")["y"].tolist() == [3]
+    assert set(load_data("data.xlsx", sheet_name=None)) == {"first", "second"}
+    with pytest.raises(ValueError):
+        load_data("data.xlsx", sheet_name="missing")
+    # pandas options bypass the cache
+    assert load_data("data.xlsx", usecols=["x"], nrows=1)["x"].tolist() == [1]
+
+
+def test_cached_frames_match_pandas(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    frame = pd.DataFrame({2010: [1, 2], "mixed": ["a", 3]})
+    frame.to_excel(tmp_path / "years.xlsx", index=False)
+    expected = pd.read_excel(tmp_path / "years.xlsx")
+
+    # Arrow cannot hold this sheet: non-string headers and a mixed-type column
+    def from_pandas(frame):
+        raise TypeError("Expected bytes, got a 'int' object")
+
+    arrow = SimpleNamespace(Table=SimpleNamespace(from_pandas=from_pandas))
+    monkeypatch.setattr(kernel_data, "_arrow", lambda: arrow)
+    prepare_cache(".")
+    df = load_data("years.xlsx")
+
+    pd.testing.assert_frame_equal(df, expected)
+    assert df[2010].tolist() == [1, 2]
+
+    pd.DataFrame({"label": ["x", "y"], "mixed": ["a", 3]}).to_excel(
+        tmp_path / "mixed.xlsx", index=False
+    )
+    pd.testing.assert_frame_equal(
+        load_data("mixed.xlsx"), pd.read_excel(tmp_path / "mixed.xlsx")
+    )
+    cached = os.listdir(tmp_path / CACHE_DIR)
+    assert not any(name.endswith(".arrow") for name in cached)
+
+
+@pytest.mark.asyncio
+async def test_load_data_is_available_in_kernel(tmp_path):
+    pd.DataFrame({"a": [1, 2, 3]}).to_csv(tmp_path / "data.csv", index=False)
+    interp = LocalCodeInterpreter(
+        task_id="kernel-data-test",
+        work_dir=str(tmp_path),
+        notebook_serializer=NotebookSerializer(work_dir=str(tmp_path)),
+    )
+    with patch(
+        "app.services.redis_manager.redis_manager.publish_message",
+        new_callable=AsyncMock,
+    ):
+        await interp.initialize()
+        try:
+            assert (tmp_path / CACHE_DIR).is_dir()
+            text, error, _ = await interp.execute_code(
+                "df = load_data('data.csv')\nprint(df['a'].sum())"
+            )
+            assert not error and "6" in text
+            assert "load_data" in interp.kernel_names
+        finally:
+            await interp.cleanup()
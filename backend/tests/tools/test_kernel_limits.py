@@ -0,0 +1,72 @@
+"""Tests for per-kernel resource limits."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.tools.kernel_limits import CgroupLimiter, ResourceLimits
+from app.tools.local_interpreter import LocalCodeInterpreter
+from app.tools.notebook_serializer import NotebookSerializer
+
+
+def test_cgroup_limiter_writes_limits(tmp_path):
+    (tmp_path / "cgroup.controllers").write_text("cpu memory")
+    limiter = CgroupLimiter(str(tmp_path))
+
+    path = limiter.attach("kernel-t", 1234, ResourceLimits(memory_mb=1, cpu_cores=0.5))
+
+    group = tmp_path / "kernel-t"
+    assert path == str(group)
+    assert (group / "memory.max").read_text() == str(1024 * 1024)
+    assert (group / "cpu.max").read_text() == "50000 100000"
+    assert (group / "cgroup.procs").read_text() == "1234"
+    (group / "memory.events").write_text("oom 1\noom_kill 1\n")
+    assert limiter.oom_killed("kernel-t")
+    assert CgroupLimiter(None).attach("kernel-t", 1, ResourceLimits()) is None
+
+
+@pytest.mark.asyncio
+async def test_violations_are_reported_as_structured_errors(tmp_path):
+    interp = LocalCodeInterpreter(
+        task_id="limits-test",
+        work_dir=str(tmp_path),
+        notebook_serializer=NotebookSerializer(work_dir=str(tmp_path)),
+        limits=ResourceLimits(
+            memory_mb=1024,
+            file_size_mb=1,
+            max_output_chars=1000,
+            max_output_bytes=200_000,
+        ),
+    )
+    with patch(
+        "app.services.redis_manager.redis_manager.publish_message",
+        new_callable=AsyncMock,
+    ):
+        await interp.initialize()
+        try:
+            _, error, message = await interp.execute_code("x = bytearray(2 * 1024**3)")
+            assert error and '"kind": "memory"' in message
+            assert interp.last_violation.limit == "1024 MB"
+
+            _, error, message = await interp.execute_code(
+                "open('big.bin', 'wb').write(b'0' * 2 * 1024**2)"
+            )
+            assert error and '"kind": "file_size"' in message
+
+            _, error, message = await interp.execute_code(
+                "while True:\n    print('z' * 1000)"
+            )
+            assert error and '"kind": "output"' in message
+
+            # The kernel survives and keeps running, with output capped
+            text, error, _ = await interp.execute_code("print('y' * 5000)")
+            assert not error and interp.last_violation is None
+            assert "输出已截断" in text
+        finally:
+            await interp.cleanup()
+
+
+def test_memory_rlimit_caps_data_not_address_space():
+    limits = ResourceLimits(memory_mb=512)
+    assert "'RLIMIT_DATA': 536870912" in limits.setup_code()
+    assert "RLIMIT_AS" not in limits.setup_code()
+    # memory.max already applies inside a cgroup
+    assert "'RLIMIT_DATA': None" in limits.setup_code(memory_in_cgroup=True)
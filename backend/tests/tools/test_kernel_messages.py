@@ -0,0 +1,104 @@
+"""Tests for streamed kernel output collection."""
+
+import base64
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.tools.kernel_messages import FILES_MIME, OutputCollector
+from app.tools.local_interpreter import LocalCodeInterpreter
+from app.tools.notebook_serializer import NotebookSerializer
+
+
+def _stream(text):
+    return {"msg_type": "stream", "content": {"name": "stdout", "text": text}}
+
+
+def _image(raw):
+    return {
+        "msg_type": "display_data",
+        "content": {"data": {"image/png": base64.b64encode(raw).decode()}},
+    }
+
+
+def test_text_keeps_head_and_ring_buffered_tail(tmp_path):
+    collector = OutputCollector(str(tmp_path), max_output_chars=20)
+
+    for i in range(1000):
+        collector.add(_stream(f"{i:04d}\n"))
+
+    outputs = collector.outputs()
+    assert outputs[0] == ("stdout", "0000\n0001\n")
+    assert "中间 4980 字符已丢弃" in outputs[1][1]
+    assert outputs[2] == ("stdout", "0998\n0999\n")
+
+
+def test_images_are_spilled_to_disk(tmp_path):
+    collector = OutputCollector(str(tmp_path))
+
+    collector.add(_image(b"png-bytes"))
+
+    [(mark, path)] = collector.outputs()
+    assert mark == "display_png"
+    assert (tmp_path / path).read_bytes() == b"png-bytes"
+
+
+def test_hard_budget_stops_capture(tmp_path):
+    collector = OutputCollector(str(tmp_path), max_output_bytes=100)
+
+    collector.add(_image(b"x" * 80))
+    collector.add(_image(b"y" * 80))
+    collector.add(_stream("after"))
+    collector.add(
+        {"msg_type": "error", "content": {"traceback": ["KeyboardInterrupt"]}}
+    )
+
+    outputs = collector.outputs()
+    assert collector.exceeded and len(collector.images) == 1
+    assert [mark for mark, _ in outputs] == ["display_png", "error", "error"]
+    assert outputs[1][1].startswith("OutputLimitExceeded")
+
+
+def test_reported_files_are_not_rendered(tmp_path):
+    collector = OutputCollector(str(tmp_path))
+
+    collector.add(
+        {
+            "msg_type": "display_data",
+            "content": {"data": {FILES_MIME: {"images": ["figs/a.png"]}}},
+        }
+    )
+
+    assert collector.outputs() == [("created_file", "figs/a.png")]
+
+
+@pytest.mark.asyncio
+async def test_kernel_reports_saved_images_per_section(tmp_path):
+    interp = LocalCodeInterpreter(
+        task_id="images-test",
+        work_dir=str(tmp_path),
+        notebook_serializer=NotebookSerializer(work_dir=str(tmp_path)),
+    )
+    with patch(
+        "app.services.redis_manager.redis_manager.publish_message",
+        new_callable=AsyncMock,
+    ):
+        await interp.initialize()
+        try:
+            interp.begin_subtask("eda")
+            await interp.execute_code(
+                "import os, matplotlib\n"
+                "matplotlib.use('Agg')\n"
+                "import matplotlib.pyplot as plt\n"
+                "os.makedirs('figs', exist_ok=True)\n"
+                "plt.plot([1, 2])\n"
+                "plt.savefig('figs/trend.png')\n"
+                "plt.savefig('figs/trend.png')"
+            )
+            interp.begin_subtask("ques1")
+            await interp.execute_code("plt.savefig('q1.jpg')")
+
+            assert await interp.get_created_images("eda") == ["figs/trend.png"]
+            assert await interp.get_created_images("eda") == []
+            assert await interp.get_created_images("ques1") == ["q1.jpg"]
+            assert interp.created_images["ques1"][0].cell == 2
+        finally:
+            await interp.cleanup()
@@ -2,6 +2,7 @@
 
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+from app.config.setting import settings
 from app.tools.local_interpreter import LocalCodeInterpreter
 from app.tools.notebook_serializer import NotebookSerializer
 import os
@@ -13,8 +14,15 @@ class TestLocalInterpreter:
 
     @pytest.fixture
     async def interpreter(self, sample_task_id, temp_work_dir):
-        """Create LocalCodeInterpreter instance."""
-        with patch("jupyter_client.manager.start_new_kernel") as mock_kernel:
+        """Create LocalCodeInterpreter instance.
+
+        Preflight checks are disabled: they query the kernel, which would
+        consume the scripted iopub messages below.
+        """
+        with (
+            patch("jupyter_client.manager.start_new_kernel") as mock_kernel,
+            patch.object(settings, "KERNEL_PREFLIGHT_ENABLED", False),
+        ):
             mock_km = MagicMock()
             mock_kc = MagicMock()
             mock_kernel.return_value = (mock_km, mock_kc)
@@ -27,7 +35,7 @@ class TestLocalInterpreter:
             )
             interpreter.km = mock_km
             interpreter.kc = mock_kc
-            return interpreter
+            yield interpreter
 
     async def test_interpreter_initialization(self, sample_task_id, temp_work_dir):
         """Test interpreter initialization."""
@@ -126,7 +134,7 @@ plt.savefig('plot.png')
         interpreter.kc.get_iopub_msg.side_effect = [
             {
                 "msg_type": "display_data",
-                "content": {"data": {"image/png": "base64_image_data"}},
+                "content": {"data": {"image/png": "iVBORw0KGgo="}},
             },
             {"msg_type": "status", "content": {"execution_state": "idle"}},
         ]
@@ -139,6 +147,8 @@ plt.savefig('plot.png')
 
         # Should handle plot generation
         assert "图片已生成" in result[0]
+        # The image is spilled to disk and referenced by path
+        assert ".outputs" in result[0]
 
     async def test_execute_code_timeout(self, interpreter):
         """Test code execution timeout."""
@@ -188,8 +198,13 @@ plt.savefig('plot.png')
                 assert isinstance(result, tuple)
 
     def test_kernel_restart(self, interpreter):
-        """Test kernel restart."""
-        with patch("jupyter_client.manager.start_new_kernel") as mock_kernel:
+        """Test kernel restart re-runs setup and restores the checkpoint."""
+        old_km = interpreter.km
+        with (
+            patch("jupyter_client.manager.start_new_kernel") as mock_kernel,
+            patch.object(interpreter, "_pre_execute_code") as pre_execute,
+            patch.object(interpreter, "execute_code_", return_value=[]) as execute,
+        ):
             mock_km = MagicMock()
             mock_kc = MagicMock()
             mock_kc.shutdown = MagicMock()
@@ -199,6 +214,9 @@ plt.savefig('plot.png')
 
             # Verify the kernel was restarted
             mock_kernel.assert_called_once_with(kernel_name="python3")
+            old_km.shutdown_kernel.assert_called_once_with(now=True)
+            pre_execute.assert_called_once()
+            assert "Restored from checkpoint" in execute.call_args.args[0]
             assert interpreter.interrupt_signal is False
 
     async def test_close_interpreter(self, interpreter):
@@ -0,0 +1,71 @@
+"""Tests for isolated execution namespaces sharing one kernel."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.tools.local_interpreter import LocalCodeInterpreter
+from app.tools.namespace_interpreter import NamespaceInterpreter
+from app.tools.notebook_serializer import NotebookSerializer
+
+
+@pytest.fixture
+async def interpreter(tmp_path):
+    interp = LocalCodeInterpreter(
+        task_id="namespace-test",
+        work_dir=str(tmp_path),
+        notebook_serializer=NotebookSerializer(work_dir=str(tmp_path)),
+    )
+    with patch(
+        "app.services.redis_manager.redis_manager.publish_message",
+        new_callable=AsyncMock,
+    ):
+        await interp.initialize()
+        yield interp
+        await interp.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_namespaces_are_isolated(interpreter):
+    await interpreter.execute_code("import numpy as np\nbase = np.arange(3)")
+    first = NamespaceInterpreter(interpreter, "ques1", inherit=True)
+    second = NamespaceInterpreter(interpreter, "ques2")
+    await first.initialize()
+    await second.initialize()
+
+    async def run(namespace, value):
+        for _ in range(3):
+            await namespace.execute_code(f"x = {value}")
+            text, error, _ = await namespace.execute_code("print('x =', x)")
+            assert not error and f"x = {value}" in text
+
+    await asyncio.gather(run(first, 1), run(second, 2))
+
+    # Inherited names are shared references; a fresh namespace has none
+    text, error, _ = await first.execute_code("print(base.sum(), np.pi > 3)")
+    assert not error and "3 True" in text
+    assert "base" not in second.kernel_names and "x" in second.kernel_names
+    text, _, _ = await interpreter.execute_code("print('x' in dir())")
+    assert "False" in text and "base" in interpreter.kernel_names
+
+    await first.cleanup()
+    _, error, message = await first.execute_code("print(x)")
+    assert error and "x" in message
+
+
+@pytest.mark.asyncio
+async def test_namespace_checkpoints_are_separate(interpreter, tmp_path):
+    namespace = NamespaceInterpreter(interpreter, "ques1")
+    await namespace.initialize()
+    namespace.begin_subtask("ques1")
+    await namespace.execute_code("result = 42")
+    await namespace.checkpoint()
+    assert (tmp_path / ".checkpoints-ques1" / "manifest.json").exists()
+    assert not (tmp_path / ".checkpoints").exists()
+
+    # The namespace is lost with the kernel and restored on next use
+    interpreter.restart_jupyter_kernel()
+    text, error, _ = await namespace.execute_code("print(result + 1)")
+    assert not error and "43" in text
+
+    with pytest.raises(ValueError):
+        NamespaceInterpreter(interpreter, "../escape")
@@ -0,0 +1,140 @@
+"""Tests for the local OpenAlex paper store."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.tools.openalex_scholar import OpenAlexScholar
+from app.tools.paper_store import PaperStore
+
+
+def _work(idx: int, title: str, abstract_words: list[str]) -> dict:
+    return {
+        "id": f"https://openalex.org/W{idx}",
+        "display_name": title,
+        "doi": f"https://doi.org/10.1000/{idx}",
+        "publication_year": 2020,
+        "cited_by_count": idx,
+        "authorships": [
+            {"author": {"display_name": f"Author {idx}"}, "author_position": "first"}
+        ],
+        "biblio": {},
+        "abstract_inverted_index": {w: [i] for i, w in enumerate(abstract_words)},
+    }
+
+
+WORKS = [
+    _work(1, "Linear programming for scheduling", ["simplex", "method", "study"]),
+    _work(2, "Integer programming in logistics", ["branch", "and", "bound"]),
+    _work(3, "Queueing models of hospitals", ["markov", "queue", "analysis"]),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PaperStore(db_path=str(tmp_path / "papers.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def api():
+    with patch(
+        "app.tools.openalex_scholar.openalex_client.get", new_callable=AsyncMock
+    ) as mock_get:
+        mock_get.return_value = {"results": WORKS}
+        yield mock_get
+
+
+@pytest.fixture
+def scholar(store):
+    return OpenAlexScholar(task_id="paper-store-test", email="a@b.com", store=store)
+
+
+@pytest.mark.asyncio
+class TestPaperStore:
+    """Test suite for PaperStore and its use by OpenAlexScholar."""
+
+    async def test_repeat_query_served_locally(self, scholar, api):
+        """A repeated (normalized) query does not hit the API again."""
+        first = await scholar.search_papers("Programming Models", limit=3)
+        second = await scholar.search_papers("  programming   models ", limit=3)
+
+        api.assert_awaited_once()
+        assert second == first
+        assert second[0]["abstract"] == "simplex method study"
+        assert second[0]["citation_format"].startswith("Author 1 (2020)")
+
+    async def test_smaller_limit_reuses_larger_result(self, scholar, api):
+        """A query cached with a larger limit answers smaller limits."""
+        await scholar.search_papers("operations research", limit=3)
+        papers = await scholar.search_papers("operations research", limit=2)
+
+        api.assert_awaited_once()
+        assert [p["id"] for p in papers] == [w["id"] for w in WORKS[:2]]
+
+    async def test_overlapping_query_uses_full_text_index(self, scholar, api, store):
+        """A new query matching enough cached papers is answered locally."""
+        await scholar.search_papers("operations research", limit=3)
+
+        papers = await scholar.search_papers("programming", limit=2)
+
+        api.assert_awaited_once()
+        assert {p["id"] for p in papers} == {WORKS[0]["id"], WORKS[1]["id"]}
+        assert store.fts_enabled
+
+    async def test_insufficient_local_matches_fall_back_to_api(self, scholar, api):
+        """Too few local matches means the API is queried."""
+        await scholar.search_papers("operations research", limit=3)
+        await scholar.search_papers("hospital queueing", limit=3)
+
+        assert api.await_count == 2
+
+    async def test_lookup_by_doi(self, scholar, api, store):
+        """Papers can be fetched by OpenAlex id or DOI."""
+        await scholar.search_papers("operations research", limit=3)
+
+        by_doi = await store.get_paper(WORKS[2]["doi"])
+        by_id = await store.get_paper(WORKS[2]["id"])
+
+        assert by_doi == by_id
+        assert by_doi["title"] == "Queueing models of hospitals"
+
+    async def test_store_persists_across_instances(self, tmp_path, api):
+        """Cached papers survive a new store instance on the same file."""
+        path = str(tmp_path / "papers.sqlite3")
+        first = PaperStore(db_path=path)
+        await OpenAlexScholar("t", email="a@b.com", store=first).search_papers(
+            "operations research", limit=3
+        )
+        first.close()
+
+        second = PaperStore(db_path=path)
+        papers = await OpenAlexScholar("t", email=None, store=second).search_papers(
+            "operations research", limit=3
+        )
+        second.close()
+
+        api.assert_awaited_once()
+        assert len(papers) == 3
+
+    async def test_empty_results_are_not_cached(self, scholar, api):
+        """A query that returned nothing asks the API again next time."""
+        api.return_value = {"results": []}
+        assert await scholar.search_papers("operations research", limit=3) == []
+
+        api.return_value = {"results": WORKS}
+        papers = await scholar.search_papers("operations research", limit=3)
+
+        assert api.await_count == 2
+        assert len(papers) == 3
+
+    async def test_overlapping_query_skips_expired_papers(self, tmp_path, api):
+        """The full-text branch only answers from papers within the TTL."""
+        store = PaperStore(db_path=str(tmp_path / "papers.sqlite3"))
+        scholar = OpenAlexScholar("t", email="a@b.com", store=store)
+        await scholar.search_papers("operations research", limit=3)
+
+        store.query_ttl_seconds = 0
+        await scholar.search_papers("programming", limit=2)
+        store.close()
+
+        assert api.await_count == 2
@@ -0,0 +1,98 @@
+"""Tests for token-budgeted result formatting."""
+
+import json
+from app.schemas.search import SearchResult
+from app.tools.result_formatter import (
+    ResultStore,
+    estimate_tokens,
+    format_papers,
+    format_web_results,
+    paper_id,
+    salient_text,
+    web_result_id,
+)
+from app.tools.web_search_tool import WebSearchTool
+from app.tools import web_search_tool
+
+
+FILLER = "Unrelated background sentence about something else entirely. " * 20
+
+
+def _paper(idx: int, authors: list[str]) -> dict:
+    return {
+        "id": f"https://openalex.org/W{idx}",
+        "title": f"Paper {idx}",
+        "abstract": FILLER + "Queueing models reduce hospital waiting times.",
+        "authors": [{"name": name} for name in authors],
+        "citations_count": idx,
+        "publication_year": 2020,
+        "doi": f"https://doi.org/10.1000/{idx}",
+        "citation_format": None,
+    }
+
+
+def test_salient_text_keeps_query_sentences():
+    text = salient_text(FILLER + "Queueing models reduce waiting.", "queueing", 20)
+
+    assert "Queueing models reduce waiting." in text
+    assert estimate_tokens(text) <= 30
+
+
+def test_web_results_fit_budget_and_dedupe():
+    results = [
+        SearchResult(
+            title=f"Result {i}",
+            url=f"https://example.com/{i}?utm_source=x",
+            content=FILLER,
+            score=1.0 - i / 100,
+        )
+        for i in range(20)
+    ]
+    results.append(results[0].model_copy(update={"url": "https://example.com/0"}))
+
+    text = format_web_results(results, "example", token_budget=300)
+
+    assert estimate_tokens(text) <= 300 + 40
+    assert text.count("Result 0 ") == 1
+    assert f"(id: {web_result_id(results[0])})" in text
+    # Entries that do not fit are listed by id
+    assert web_result_id(results[-2]) in text.splitlines()[-1]
+
+
+def test_papers_are_compact_with_ids():
+    authors = ["A", "B", "B", "C", "D"]
+    text = format_papers([_paper(1, authors), _paper(1, authors)], "queueing", 200)
+
+    assert text.count("[W1]") == 1
+    assert "A et al." in text
+    assert "Queueing models reduce hospital waiting times." in text
+    assert paper_id({"title": "No id"}).startswith("P")
+    assert format_papers([], "q", 100) == "未找到相关文献。"
+
+    # Papers without DOI or title are told apart by their id
+    untitled = [{**_paper(idx, authors), "doi": None, "title": None} for idx in (2, 3)]
+    text = format_papers(untitled, "queueing", 400)
+    assert "[W2]" in text and "[W3]" in text
+
+
+def test_writer_tool_schema_comes_from_web_search_tool():
+    from app.core.functions import writer_tools
+
+    schema = next(
+        t for t in writer_tools if t["function"]["name"] == "get_result_details"
+    )
+    assert schema is WebSearchTool.get_result_details._tool_schema
+
+
+async def test_full_results_are_retrievable_by_id(monkeypatch):
+    store = ResultStore(key_prefix="test_tool_result:")
+    monkeypatch.setattr(web_search_tool, "result_store", store)
+    result = SearchResult(title="T", url="https://example.com/a", content=FILLER)
+    await store.save_many({web_result_id(result): result.model_dump(mode="json")})
+
+    tool = WebSearchTool()
+    details = await tool.get_result_details(web_result_id(result))
+    missing = await tool.get_result_details("Rmissing")
+
+    assert json.loads(details.result)["content"] == FILLER
+    assert not missing.success and "Rmissing" in missing.error